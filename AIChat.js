@@ -1,13 +1,107 @@
 'use client'
+import { useEffect, useRef, useState } from 'react'
+import { PaperAirplaneIcon } from '@heroicons/react/24/outline'
+import { streamFunction } from '@/lib/functions'
+
 export default function AIChat() {
+  const [messages, setMessages] = useState([])
+  const [input, setInput] = useState('')
+  const [streaming, setStreaming] = useState(false)
+  const controllerRef = useRef(null)
+  const endRef = useRef(null)
+
+  useEffect(() => {
+    endRef.current?.scrollIntoView({ behavior: 'smooth' })
+  }, [messages])
+
+  useEffect(() => () => controllerRef.current?.abort(), [])
+
+  // Replace the text of the last (assistant) message
+  const updateReply = (update) => {
+    setMessages(prev => [...prev.slice(0, -1), { ...prev[prev.length - 1], ...update(prev[prev.length - 1]) }])
+  }
+
+  const handleSend = async (e) => {
+    e.preventDefault()
+    const message = input.trim()
+    if (!message || streaming) return
+
+    setInput('')
+    setStreaming(true)
+    setMessages(prev => [...prev, { role: 'user', text: message }, { role: 'assistant', text: '' }])
+
+    const controller = new AbortController()
+    controllerRef.current = controller
+    const started = performance.now()
+    let firstToken = true
+
+    try {
+      await streamFunction('chatWithAIStream', { message, context: 'AI Assistant chat' }, {
+        signal: controller.signal,
+        onEvent: (event) => {
+          if (event.token) {
+            if (firstToken) {
+              firstToken = false
+              console.debug('AI chat time to first token (ms):', Math.round(performance.now() - started))
+            }
+            updateReply(reply => ({ text: reply.text + event.token }))
+          } else if (event.done) {
+            updateReply(() => ({ text: event.response }))
+          }
+        }
+      })
+    } catch (error) {
+      if (error.name !== 'AbortError') {
+        console.error('AI chat error:', error)
+        updateReply(() => ({ text: 'Sorry, something went wrong. Please try again.' }))
+      }
+    } finally {
+      setStreaming(false)
+    }
+  }
+
   return (
     <div className="max-w-4xl mx-auto fade-in">
       <div className="mb-8">
         <h1 className="text-3xl font-bold text-gray-900">AI Assistant</h1>
         <p className="mt-2 text-gray-600">Get help from your personal AI</p>
       </div>
-      <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
-        <p className="text-gray-600">AI chat interface coming soon...</p>
+
+      <div className="bg-white rounded-lg shadow-sm border border-gray-200 flex flex-col h-[32rem]">
+        <div className="flex-1 overflow-y-auto p-6 space-y-4">
+          {messages.length === 0 && (
+            <p className="text-gray-600">Ask about resumes, coding, presentations or anything you are studying.</p>
+          )}
+          {messages.map((msg, index) => (
+            <div key={index} className={`flex ${msg.role === 'user' ? 'justify-end' : 'justify-start'}`}>
+              <div
+                className={`max-w-[80%] rounded-lg px-4 py-2 text-sm whitespace-pre-wrap ${
+                  msg.role === 'user' ? 'bg-blue-600 text-white' : 'bg-gray-100 text-gray-900'
+                }`}
+              >
+                {msg.text || (streaming && index === messages.length - 1 ? '…' : '')}
+              </div>
+            </div>
+          ))}
+          <div ref={endRef} />
+        </div>
+
+        <form onSubmit={handleSend} className="border-t border-gray-200 p-4 flex space-x-3">
+          <input
+            type="text"
+            value={input}
+            onChange={(e) => setInput(e.target.value)}
+            placeholder="Type your message..."
+            className="flex-1 rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+          />
+          <button
+            type="submit"
+            disabled={streaming || !input.trim()}
+            className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 disabled:opacity-50"
+          >
+            <PaperAirplaneIcon className="h-4 w-4" />
+          </button>
+        </form>
       </div>
     </div>
   )
@@ -1,6 +1,8 @@
 'use client'
 import { useState } from 'react'
 import { DocumentIcon, DownloadIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { runJob } from '@/lib/functions'
 
 const templates = [
   { id: 'report', name: 'Business Report', description: 'Professional business report template' },
@@ -9,6 +11,7 @@ const templates = [
 ]
 
 export default function DocumentDesigner() {
+  const { user } = useAuth()
   const [activeTab, setActiveTab] = useState('create')
   const [selectedTemplate, setSelectedTemplate] = useState('report')
   const [loading, setLoading] = useState(false)
@@ -19,31 +22,28 @@ export default function DocumentDesigner() {
     documentType: 'report'
   })
   const [generatedContent, setGeneratedContent] = useState('')
+  const [jobStatus, setJobStatus] = useState(null)
 
   const handleGenerate = async (e) => {
     e.preventDefault()
     setLoading(true)
 
-    // Simulate AI generation
-    setTimeout(() => {
-      setGeneratedContent(`# ${formData.title}
-
-## Executive Summary
-This document provides a comprehensive overview of ${formData.topic}.
-
-## Introduction
-[AI-generated introduction based on your outline]
-
-## Main Content
-${formData.outline.split('\n').map(point => point.trim() ? `### ${point}\n[Generated content for ${point}]` : '').join('\n\n')}
-
-## Conclusion
-[AI-generated conclusion summarizing key points]
-
-## Recommendations
-[AI-generated recommendations based on the content]`)
+    // Runs as a background job; the preview fills in when the job completes
+    try {
+      const result = await runJob('generateDocument', {
+        topic: formData.topic,
+        documentType: formData.documentType,
+        outline: formData.outline,
+        userId: user?.uid
+      }, { onStatus: setJobStatus })
+      setGeneratedContent(result.content)
+    } catch (error) {
+      console.error('Document generation error:', error)
+      alert('Failed to generate document. Please try again.')
+    } finally {
+      setJobStatus(null)
       setLoading(false)
-    }, 2000)
+    }
   }
 
   return (
@@ -131,7 +131,7 @@ ${formData.outline.split('\n').map(point => point.trim() ? `### ${point}\n[Gener
                     disabled={loading}
                     className="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50"
                   >
-                    {loading ? 'Generating Document...' : 'Generate with AI'}
+                    {loading ? (jobStatus === 'queued' ? 'Queued...' : 'Generating Document...') : 'Generate with AI'}
                   </button>
                 </form>
               </div>
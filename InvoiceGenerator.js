@@ -1,7 +1,9 @@
 'use client'
 import { useState } from 'react'
+import { downloadPdf } from '@/lib/functions'
 
 export default function InvoiceGenerator() {
+  const [exporting, setExporting] = useState(false)
   const [formData, setFormData] = useState({
     companyName: '',
     companyAddress: '',
@@ -45,8 +47,16 @@ export default function InvoiceGenerator() {
     return formData.items.reduce((total, item) => total + item.amount, 0).toFixed(2)
   }
 
-  const generateInvoice = () => {
-    alert('Invoice PDF would be generated and downloadable')
+  const generateInvoice = async () => {
+    setExporting(true)
+    try {
+      await downloadPdf('invoice', formData)
+    } catch (error) {
+      console.error('Invoice export error:', error)
+      alert('Failed to generate invoice PDF. Please try again.')
+    } finally {
+      setExporting(false)
+    }
   }
 
   return (
@@ -212,9 +222,10 @@ export default function InvoiceGenerator() {
           <div className="flex justify-center">
             <button
               onClick={generateInvoice}
-              className="bg-green-600 text-white px-8 py-3 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500"
+              disabled={exporting}
+              className="bg-green-600 text-white px-8 py-3 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500 disabled:opacity-50"
             >
-              Generate Invoice PDF
+              {exporting ? 'Generating PDF...' : 'Generate Invoice PDF'}
             </button>
           </div>
         </div>
@@ -1,14 +1,114 @@
 'use client'
+import { useState } from 'react'
+import { PresentationChartBarIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { runJob } from '@/lib/functions'
+
 export default function PresentationDesigner() {
+  const { user } = useAuth()
+  const [loading, setLoading] = useState(false)
+  const [jobStatus, setJobStatus] = useState(null)
+  const [formData, setFormData] = useState({
+    topic: '',
+    audience: 'students',
+    slideCount: 5
+  })
+  const [slides, setSlides] = useState([])
+
+  const handleGenerate = async (e) => {
+    e.preventDefault()
+    setLoading(true)
+
+    // Runs as a background job; slides appear when the job completes
+    try {
+      const result = await runJob('generatePresentation', {
+        ...formData,
+        userId: user?.uid
+      }, { onStatus: setJobStatus })
+      setSlides(result.slides)
+    } catch (error) {
+      console.error('Presentation generation error:', error)
+      alert('Failed to generate presentation. Please try again.')
+    } finally {
+      setJobStatus(null)
+      setLoading(false)
+    }
+  }
+
   return (
     <div className="max-w-4xl mx-auto fade-in">
       <div className="mb-8">
         <h1 className="text-3xl font-bold text-gray-900">Presentation Designer</h1>
         <p className="mt-2 text-gray-600">Create engaging presentations with AI</p>
       </div>
+
       <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
-        <p className="text-gray-600">Presentation designer interface coming soon...</p>
+        <form onSubmit={handleGenerate} className="grid grid-cols-1 md:grid-cols-3 gap-4">
+          <div className="md:col-span-3">
+            <label className="block text-sm font-medium text-gray-700">Topic</label>
+            <input
+              type="text"
+              value={formData.topic}
+              onChange={(e) => setFormData({...formData, topic: e.target.value})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+              required
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700">Audience</label>
+            <input
+              type="text"
+              value={formData.audience}
+              onChange={(e) => setFormData({...formData, audience: e.target.value})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700">Slides</label>
+            <input
+              type="number"
+              min={1}
+              max={20}
+              value={formData.slideCount}
+              onChange={(e) => setFormData({...formData, slideCount: Number(e.target.value)})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+            />
+          </div>
+
+          <div className="flex items-end">
+            <button
+              type="submit"
+              disabled={loading}
+              className="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50"
+            >
+              {loading ? (jobStatus === 'queued' ? 'Queued...' : 'Generating Slides...') : 'Generate with AI'}
+            </button>
+          </div>
+        </form>
       </div>
+
+      {slides.length > 0 ? (
+        <div className="mt-6 grid grid-cols-1 md:grid-cols-2 gap-4">
+          {slides.map((slide, index) => (
+            <div key={index} className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
+              <p className="text-xs text-gray-500 mb-1">Slide {index + 1}</p>
+              <h3 className="text-lg font-semibold text-gray-900 mb-3">{slide.title}</h3>
+              <ul className="list-disc list-inside space-y-1 text-sm text-gray-700">
+                {slide.content.map((point, i) => (
+                  <li key={i}>{point}</li>
+                ))}
+              </ul>
+            </div>
+          ))}
+        </div>
+      ) : (
+        <div className="mt-6 text-center text-gray-500">
+          <PresentationChartBarIcon className="w-12 h-12 mx-auto text-gray-300 mb-2" />
+          <p>Generated slides will appear here...</p>
+        </div>
+      )}
     </div>
   )
 }
\ No newline at end of file
@@ -1,6 +1,7 @@
 'use client'
 import { useState } from 'react'
 import { useAuth } from '@/contexts/AuthContext'
+import { downloadPdf } from '@/lib/functions'
 
 const templates = [
   { id: 'professional', name: 'Professional', description: 'Clean, modern design perfect for corporate roles' },
@@ -13,6 +14,7 @@ export default function ResumeBuilder() {
   const [activeTab, setActiveTab] = useState('create')
   const [selectedTemplate, setSelectedTemplate] = useState('professional')
   const [loading, setLoading] = useState(false)
+  const [exporting, setExporting] = useState(false)
   const [formData, setFormData] = useState({
     name: user?.displayName || '',
     email: user?.email || '',
@@ -36,6 +38,18 @@ export default function ResumeBuilder() {
     }, 2000)
   }
 
+  const handleExport = async () => {
+    setExporting(true)
+    try {
+      await downloadPdf(`resume-${selectedTemplate}`, formData)
+    } catch (error) {
+      console.error('Resume export error:', error)
+      alert('Failed to export resume. Please try again.')
+    } finally {
+      setExporting(false)
+    }
+  }
+
   return (
     <div className="max-w-6xl mx-auto fade-in">
       <div className="mb-8">
@@ -143,6 +157,15 @@ export default function ResumeBuilder() {
               >
                 {loading ? 'Generating Resume...' : 'Generate Resume with AI'}
               </button>
+
+              <button
+                type="button"
+                onClick={handleExport}
+                disabled={exporting || !formData.name}
+                className="w-full bg-white text-blue-600 border border-blue-600 py-2 px-4 rounded-md hover:bg-blue-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {exporting ? 'Exporting PDF...' : `Export PDF (${templates.find(t => t.id === selectedTemplate)?.name} template)`}
+              </button>
             </form>
           )}
 
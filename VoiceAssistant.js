@@ -1,15 +1,25 @@
 'use client'
 import { useState, useRef, useEffect } from 'react'
 import { MicrophoneIcon, StopIcon, PlayIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { callFunction } from '@/lib/functions'
+
+const SEGMENT_ATTEMPTS = 3
+const SEGMENT_RETRY_MS = 1000
+// Recognition errors that a restart cannot recover from
+const FATAL_RECOGNITION_ERRORS = ['not-allowed', 'service-not-allowed', 'audio-capture', 'network']
 
 export default function VoiceAssistant() {
+  const { user } = useAuth()
   const [isRecording, setIsRecording] = useState(false)
   const [transcript, setTranscript] = useState('')
+  const [liveAnalysis, setLiveAnalysis] = useState(null)
   const [analysis, setAnalysis] = useState(null)
   const [loading, setLoading] = useState(false)
   const [recordingTime, setRecordingTime] = useState(0)
   const recognitionRef = useRef(null)
   const timerRef = useRef(null)
+  const sessionRef = useRef(null)
 
   useEffect(() => {
     // Initialize speech recognition
@@ -18,6 +28,63 @@ export default function VoiceAssistant() {
       recognitionRef.current = new SpeechRecognition()
       recognitionRef.current.continuous = true
       recognitionRef.current.interimResults = true
+    }
+  }, [])
+
+  // Each final result is sent as one segment, in order; the server adds just
+  // the new text to the session's running counts and returns the analysis so far.
+  // A failed segment is retried with the same sequence, which the server counts
+  // once. If it still fails, the counts are missing text, so the session is
+  // marked incomplete and finished from the full transcript instead
+  const sendSegment = (session, text) => {
+    const sequence = ++session.sequence
+    const offsetSeconds = (Date.now() - session.startedAt) / 1000
+    session.segments = session.segments
+      .then(async () => {
+        if (session.incomplete) return
+        for (let attempt = 1; ; attempt++) {
+          try {
+            const result = await callFunction('analyzeVoiceSegment', {
+              sessionId: session.id,
+              userId: user?.uid,
+              text,
+              sequence,
+              offsetSeconds
+            })
+            setLiveAnalysis(result.analysis)
+            return
+          } catch (error) {
+            if (attempt >= SEGMENT_ATTEMPTS) {
+              console.error('Live analysis error:', error)
+              session.incomplete = true
+              return
+            }
+            await new Promise((resolve) => setTimeout(resolve, SEGMENT_RETRY_MS * attempt))
+          }
+        }
+      })
+  }
+
+  const startRecording = () => {
+    if (recognitionRef.current) {
+      // Named up front, so a retried first segment reuses the same document
+      const session = {
+        id: crypto.randomUUID(),
+        sequence: 0,
+        startedAt: Date.now(),
+        transcript: '',
+        segments: Promise.resolve(),
+        recording: true,
+        incomplete: false,
+        error: null,
+        ended: false
+      }
+      sessionRef.current = session
+      setIsRecording(true)
+      setTranscript('')
+      setLiveAnalysis(null)
+      setAnalysis(null)
+      setRecordingTime(0)
 
       recognitionRef.current.onresult = (event) => {
         let finalTranscript = ''
@@ -27,17 +94,29 @@ export default function VoiceAssistant() {
           }
         }
         if (finalTranscript) {
-          setTranscript(prev => prev + finalTranscript + ' ')
+          session.transcript += finalTranscript + ' '
+          setTranscript(session.transcript)
+          sendSegment(session, finalTranscript)
         }
       }
-    }
-  }, [])
-
-  const startRecording = () => {
-    if (recognitionRef.current) {
-      setIsRecording(true)
-      setTranscript('')
-      setRecordingTime(0)
+      recognitionRef.current.onerror = (event) => {
+        if (FATAL_RECOGNITION_ERRORS.includes(event.error)) {
+          session.error = event.error
+        }
+      }
+      // Chrome ends recognition by itself after a stretch of silence or when
+      // the connection drops; keep listening, or finish if it cannot go on
+      recognitionRef.current.onend = () => {
+        if (session.recording && !session.error) {
+          try {
+            recognitionRef.current.start()
+            return
+          } catch (error) {
+            console.error('Could not restart speech recognition:', error)
+          }
+        }
+        endSession(session)
+      }
       recognitionRef.current.start()
 
       // Start timer
@@ -48,57 +127,52 @@ export default function VoiceAssistant() {
   }
 
   const stopRecording = () => {
-    if (recognitionRef.current) {
+    const session = sessionRef.current
+    if (recognitionRef.current && session?.recording) {
+      // The last final result can arrive after stop(), so the session finishes once recognition ends
+      session.recording = false
       setIsRecording(false)
+      clearInterval(timerRef.current)
       recognitionRef.current.stop()
+    }
+  }
+
+  const endSession = (session) => {
+    if (session.ended) return
+    session.ended = true
+    session.recording = false
+    if (sessionRef.current === session) {
+      setIsRecording(false)
       clearInterval(timerRef.current)
-      analyzeTranscript()
     }
+    if (session.error) {
+      console.error('Speech recognition stopped:', session.error)
+    }
+    finishSession(session)
   }
 
-  const analyzeTranscript = async () => {
-    if (!transcript.trim()) return
+  const finishSession = async (session) => {
+    if (!session.transcript.trim()) return
 
     setLoading(true)
-
-    // Simulate analysis
-    setTimeout(() => {
-      const words = transcript.split(' ').length
-      const wpm = Math.round((words / recordingTime) * 60)
-      const fillerWords = (transcript.match(/\b(um|uh|like|you know|so|actually)\b/gi) || []).length
-      const fillerPercentage = Math.round((fillerWords / words) * 100)
-
-      setAnalysis({
-        wpm,
-        fillerWords,
-        fillerPercentage,
-        totalWords: words,
-        duration: recordingTime,
-        feedback: generateFeedback(wpm, fillerPercentage)
+    try {
+      // The session's counts are already up to date once its segments are in,
+      // unless one was lost and the transcript has to be analyzed in full
+      await session.segments
+      const result = await callFunction('analyzeVoice', {
+        sessionId: session.id,
+        incomplete: session.incomplete,
+        transcript: session.transcript.trim(),
+        duration: Math.max(1, Math.round((Date.now() - session.startedAt) / 1000)),
+        userId: user?.uid
       })
-
+      setAnalysis(result.analysis)
+    } catch (error) {
+      console.error('Voice analysis error:', error)
+      alert('Failed to analyze your speech. Please try again.')
+    } finally {
       setLoading(false)
-    }, 2000)
-  }
-
-  const generateFeedback = (wpm, fillerPercentage) => {
-    const feedback = []
-
-    if (wpm < 100) {
-      feedback.push("Try speaking a bit faster - aim for 120-150 WPM")
-    } else if (wpm > 180) {
-      feedback.push("Slow down slightly for better clarity")
-    } else {
-      feedback.push("Good speaking pace!")
-    }
-
-    if (fillerPercentage > 5) {
-      feedback.push("Try to reduce filler words - practice pausing instead")
-    } else {
-      feedback.push("Great job minimizing filler words!")
     }
-
-    return feedback
   }
 
   const formatTime = (seconds) => {
@@ -168,6 +242,38 @@ export default function VoiceAssistant() {
         </div>
 
         <div className="space-y-6">
+          {isRecording && liveAnalysis && (
+            <div className="bg-white rounded-lg shadow-sm border border-gray-200">
+              <div className="border-b border-gray-200 px-6 py-4">
+                <h3 className="text-lg font-medium text-gray-900">Live Feedback</h3>
+              </div>
+              <div className="p-6">
+                <div className="grid grid-cols-3 gap-4 mb-4">
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-blue-600">{liveAnalysis.currentWpm}</div>
+                    <div className="text-sm text-gray-600">WPM (last 30s)</div>
+                  </div>
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-orange-600">{liveAnalysis.fillerWords}</div>
+                    <div className="text-sm text-gray-600">Filler words</div>
+                  </div>
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-green-600">{liveAnalysis.totalWords}</div>
+                    <div className="text-sm text-gray-600">Total words</div>
+                  </div>
+                </div>
+                <ul className="space-y-1">
+                  {liveAnalysis.feedback.map((item, index) => (
+                    <li key={index} className="text-sm text-gray-600 flex items-start">
+                      <span className="text-blue-500 mr-2">•</span>
+                      {item}
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            </div>
+          )}
+
           {loading && (
             <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
               <div className="text-center">
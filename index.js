@@ -1,39 +1,183 @@
 const functions = require('firebase-functions');
-const admin = require('firebase-admin');
-const axios = require('axios');
 const cors = require('cors')({origin: true});
+const {BatchWriter} = require('./batchWriter');
+const {createInferenceClient} = require('./inference/httpClient');
+const {Histogram, LATENCY_BUCKETS_MS} = require('./inference/metrics');
+const {createMicroBatcher} = require('./inference/microBatcher');
+const {createResponseCache, cacheKey} = require('./inference/responseCache');
+const {CircuitBreaker, isModelLoading, isRetryable, retryDelayMs} = require('./inference/retryPolicy');
+const {createSingleFlight} = require('./inference/singleFlight');
+const {createSSEParser, formatSSE} = require('./inference/sse');
+const {createLocalJobQueue} = require('./jobQueue');
+const {lazyRequire} = require('./lazy');
+const {dataError} = require('./pdf/templates');
+const {SpeechAnalyzer, summarize} = require('./speech/analyzer');
+const {scanTranscript} = require('./speech/fillers');
+
+// Firebase Admin is loaded and initialized by the first route that needs it
+const firebaseAdmin = lazyRequire('firebase-admin', admin => admin.initializeApp());
+
+// Generated documents go through a shared batching writer. Handlers wait
+// for their write (at most PERSIST_WAIT_MS) before answering.
+// PERSIST_AFTER_RESPONSE=true answers first and waits afterwards, which is
+// only safe with CPU allocated outside requests: a throttled or reclaimed
+// instance would lose the queued writes.
+const PERSIST_AFTER_RESPONSE = process.env.PERSIST_AFTER_RESPONSE === 'true';
+const persistence = new BatchWriter({
+  firestore: () => firebaseAdmin().firestore(),
+  maxBatchSize: Number(process.env.PERSIST_BATCH_SIZE) || 100,
+  flushIntervalMs: Number(process.env.PERSIST_FLUSH_MS) || (PERSIST_AFTER_RESPONSE ? 200 : 20),
+  waitMs: Number(process.env.PERSIST_WAIT_MS) || 10000,
+});
 
-// Initialize Firebase Admin
-admin.initializeApp();
+// Answers with `body` once `written` settles, or right away in
+// after-response mode; either way the handler finishes after the wait
+async function respondPersisted(res, written, body) {
+  if (PERSIST_AFTER_RESPONSE) {
+    res.json(body);
+  }
+  await persistence.wait(written);
+  if (!PERSIST_AFTER_RESPONSE) {
+    res.json(body);
+  }
+}
 
 const HF_API_KEY = functions.config().huggingface?.api_key || process.env.HF_API_KEY;
-const HF_BASE_URL = 'https://api-inference.huggingface.co/models';
+// Overridable so load tests can point at a local stand-in (python -m loadtest hfstub)
+const HF_BASE_URL = process.env.HF_BASE_URL || 'https://api-inference.huggingface.co/models';
+
+// One keep-alive client per instance: warm invocations skip the TLS handshake
+const hfClient = createInferenceClient({
+  baseURL: HF_BASE_URL,
+  apiKey: HF_API_KEY,
+  maxSockets: Number(process.env.HF_MAX_SOCKETS) || 50,
+  maxFreeSockets: Number(process.env.HF_MAX_FREE_SOCKETS) || 10,
+});
 
-// Hugging Face API helper
-async function callHuggingFace(model, payload, retries = 3) {
-  try {
-    const response = await axios.post(`${HF_BASE_URL}/${model}`, payload, {
-      headers: {
-        'Authorization': `Bearer ${HF_API_KEY}`,
-        'Content-Type': 'application/json',
-      },
-      timeout: 30000,
-    });
-    return response.data;
-  } catch (error) {
-    if (retries > 0 && error.response?.status === 503) {
-      // Model loading, retry after delay
-      await new Promise(resolve => setTimeout(resolve, 2000));
-      return callHuggingFace(model, payload, retries - 1);
+// Identical (model, payload) calls are answered from cache; the optional
+// Firestore tier lets warm instances share results
+const HF_CACHE_FIRESTORE = (functions.config().huggingface?.cache_firestore ||
+  process.env.HF_CACHE_FIRESTORE) === 'true';
+const responseCache = createResponseCache({
+  maxEntries: Number(process.env.HF_CACHE_MAX_ENTRIES) || 500,
+  firestore: HF_CACHE_FIRESTORE ? () => firebaseAdmin().firestore() : null,
+});
+
+// Concurrent identical calls (e.g. a whole class pasting the same prompt)
+// share one upstream request
+const singleFlight = createSingleFlight();
+
+// Total time an endpoint may spend on one inference call, retries included
+const HF_DEADLINES_MS = {
+  generateResume: 20000,
+  generateDocument: 25000,
+  generatePresentation: 20000,
+  fixCode: 15000,
+  chatWithAI: 10000,
+  default: 20000,
+};
+const HF_MAX_ATTEMPTS = 4;
+
+// Concurrent prompts for the same model and parameters go upstream as one
+// batched `inputs` array (HF_BATCH_MAX_SIZE=1 turns batching off)
+const batcher = createMicroBatcher({
+  send: (model, payload, endpoint) => requestHuggingFace(model, payload, endpoint),
+  maxBatchSize: Number(process.env.HF_BATCH_MAX_SIZE) || 8,
+  maxDelayMs: Number(process.env.HF_BATCH_WINDOW_MS) || 20,
+});
+
+// Streaming latency: time to first token is what the user actually waits for
+const streamStats = {
+  streams: 0,
+  fallbacks: 0,
+  ttftMs: new Histogram(LATENCY_BUCKETS_MS),
+  totalMs: new Histogram(LATENCY_BUCKETS_MS),
+};
+
+// One breaker per model: while a model is known to be cold, handlers go
+// straight to their fallback content instead of waiting on retries
+const breakers = new Map();
+function breakerFor(model) {
+  if (!breakers.has(model)) {
+    breakers.set(model, new CircuitBreaker());
+  }
+  return breakers.get(model);
+}
+
+// Route handlers, exported below in the configured deployment layout
+const handlers = {};
+
+// Hugging Face API helper. Resolves to the generation (`{generated_text}`),
+// or to null when the model is cold, which handlers treat like an empty
+// generation and answer with fallback content.
+async function callHuggingFace(model, payload, {endpoint = 'default'} = {}) {
+  const key = cacheKey(model, payload);
+  const cached = await responseCache.get(endpoint, key);
+  if (cached !== undefined) {
+    return firstGeneration(cached);
+  }
+  return singleFlight.run(endpoint, key, async () => {
+    if (!breakerFor(model).allowRequest()) {
+      return null;
+    }
+    const data = firstGeneration(await batcher.submit(model, payload, endpoint));
+    if (data !== null) {
+      responseCache.set(endpoint, key, data);
+    }
+    return data;
+  });
+}
+
+// The API answers a single input with `[{generated_text}]`
+function firstGeneration(data) {
+  return Array.isArray(data) ? data[0] ?? null : data;
+}
+
+async function requestHuggingFace(model, payload, endpoint) {
+  const breaker = breakerFor(model);
+  const deadline = Date.now() + (HF_DEADLINES_MS[endpoint] ?? HF_DEADLINES_MS.default);
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const started = Date.now();
+      const response = await hfClient.post(`/${model}`, payload, {
+        timeout: Math.max(1, deadline - started),
+      });
+      console.log('HF call', JSON.stringify({
+        model,
+        attempt,
+        latencyMs: Date.now() - started,
+        reusedConnection: response.connection?.reused,
+        handshakeMs: response.connection?.handshakeMs,
+      }));
+      breaker.recordSuccess();
+      return response.data;
+    } catch (error) {
+      if (!isRetryable(error)) {
+        breaker.recordFailure();
+        throw error;
+      }
+      const delay = retryDelayMs(error, attempt);
+      const givingUp = attempt + 1 >= HF_MAX_ATTEMPTS || Date.now() + delay >= deadline;
+      // A rate limit we stop waiting on keeps the model unavailable like a cold
+      // start would, and ends a half-open probe
+      if (isModelLoading(error) || givingUp) {
+        breaker.recordColdModel(delay);
+      }
+      if (givingUp) {
+        // Still cold (or rate limited) past the deadline: fall back now
+        console.warn('HF call gave up', JSON.stringify({model, endpoint, attempt, delay}));
+        return null;
+      }
+      await new Promise(resolve => setTimeout(resolve, delay));
     }
-    throw error;
   }
 }
 
 // AI Resume Generation
-exports.generateResume = functions.https.onRequest((req, res) => {
+handlers.generateResume = (req, res) => {
   cors(req, res, async () => {
     try {
+      const admin = firebaseAdmin();
       if (req.method !== 'POST') {
         return res.status(405).json({error: 'Method not allowed'});
       }
@@ -66,7 +210,7 @@ Format as structured JSON with sections.`;
           temperature: 0.7,
           return_full_text: false
         }
-      });
+      }, {endpoint: 'generateResume'});
 
       // Fallback content if HF fails
       const fallbackContent = {
@@ -98,9 +242,9 @@ Format as structured JSON with sections.`;
         updatedAt: admin.firestore.FieldValue.serverTimestamp()
       };
 
-      const docRef = await admin.firestore().collection('resumes').add(resumeDoc);
+      const docRef = admin.firestore().collection('resumes').doc();
 
-      res.json({
+      await respondPersisted(res, persistence.set(docRef, resumeDoc), {
         success: true,
         resumeId: docRef.id,
         content: resumeData
@@ -111,10 +255,10 @@ Format as structured JSON with sections.`;
       res.status(500).json({error: 'Failed to generate resume'});
     }
   });
-});
+};
 
 // AI Document Generation
-exports.generateDocument = functions.https.onRequest((req, res) => {
+handlers.generateDocument = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -123,21 +267,44 @@ exports.generateDocument = functions.https.onRequest((req, res) => {
 
       const {topic, documentType, outline, userId} = req.body;
 
-      const prompt = `Write a ${documentType} about ${topic}.
+      // Async mode: answer with a job ID now, the worker writes the result
+      if (req.body.async) {
+        const jobId = await enqueueGenerationJob('document', {topic, documentType, outline, userId});
+        return res.status(202).json({success: true, jobId, status: 'queued'});
+      }
+
+      const {documentId, content, persisted} = await generateDocumentContent({topic, documentType, outline, userId});
+
+      await respondPersisted(res, persisted, {
+        success: true,
+        documentId: documentId,
+        content: content
+      });
+
+    } catch (error) {
+      console.error('Error generating document:', error);
+      res.status(500).json({error: 'Failed to generate document'});
+    }
+  });
+};
+
+async function generateDocumentContent({topic, documentType, outline, userId}) {
+  const admin = firebaseAdmin();
+  const prompt = `Write a ${documentType} about ${topic}.
 
 Outline: ${outline}
 
 Please write a well-structured document with proper headings and content.`;
 
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
-        inputs: prompt,
-        parameters: {
-          max_new_tokens: 800,
-          temperature: 0.7
-        }
-      });
+  const result = await callHuggingFace('microsoft/DialoGPT-large', {
+    inputs: prompt,
+    parameters: {
+      max_new_tokens: 800,
+      temperature: 0.7
+    }
+  }, {endpoint: 'generateDocument'});
 
-      const content = result?.generated_text || `# ${topic}
+  const content = result?.generated_text || `# ${topic}
 
 ## Introduction
 This document provides an overview of ${topic} and its key aspects.
@@ -148,34 +315,24 @@ This document provides an overview of ${topic} and its key aspects.
 ## Conclusion
 In summary, this ${documentType} covers the essential elements of ${topic}.`;
 
-      // Save to Firestore
-      const docData = {
-        userId: userId,
-        title: topic,
-        type: documentType,
-        content: content,
-        outline: outline,
-        createdAt: admin.firestore.FieldValue.serverTimestamp(),
-        updatedAt: admin.firestore.FieldValue.serverTimestamp()
-      };
-
-      const docRef = await admin.firestore().collection('documents').add(docData);
-
-      res.json({
-        success: true,
-        documentId: docRef.id,
-        content: content
-      });
+  // Save to Firestore
+  const docData = {
+    userId: userId,
+    title: topic,
+    type: documentType,
+    content: content,
+    outline: outline,
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  };
 
-    } catch (error) {
-      console.error('Error generating document:', error);
-      res.status(500).json({error: 'Failed to generate document'});
-    }
-  });
-});
+  const docRef = admin.firestore().collection('documents').doc();
+  const persisted = persistence.set(docRef, docData);
+  return {documentId: docRef.id, content, persisted};
+}
 
 // AI Presentation Generation
-exports.generatePresentation = functions.https.onRequest((req, res) => {
+handlers.generatePresentation = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -184,53 +341,16 @@ exports.generatePresentation = functions.https.onRequest((req, res) => {
 
       const {topic, slideCount, audience, userId} = req.body;
 
-      const prompt = `Create a presentation outline for "${topic}" with ${slideCount} slides for ${audience} audience.
-
-Format as JSON with slide titles and content points.`;
-
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
-        inputs: prompt,
-        parameters: {
-          max_new_tokens: 600,
-          temperature: 0.7
-        }
-      });
-
-      // Fallback presentation structure
-      const fallbackSlides = [
-        {
-          title: topic,
-          content: ["Introduction to the topic", "Overview of key points"]
-        },
-        {
-          title: "Main Points",
-          content: ["Key concept 1", "Key concept 2", "Key concept 3"]
-        },
-        {
-          title: "Conclusion",
-          content: ["Summary of findings", "Next steps", "Questions?"]
-        }
-      ];
-
-      const slides = result?.generated_text ? 
-        parsePresentationFromAI(result.generated_text) : fallbackSlides;
-
-      // Save to Firestore
-      const presentationData = {
-        userId: userId,
-        title: topic,
-        slides: slides,
-        audience: audience,
-        slideCount: slideCount,
-        createdAt: admin.firestore.FieldValue.serverTimestamp(),
-        updatedAt: admin.firestore.FieldValue.serverTimestamp()
-      };
+      if (req.body.async) {
+        const jobId = await enqueueGenerationJob('presentation', {topic, slideCount, audience, userId});
+        return res.status(202).json({success: true, jobId, status: 'queued'});
+      }
 
-      const docRef = await admin.firestore().collection('presentations').add(presentationData);
+      const {presentationId, slides, persisted} = await generatePresentationContent({topic, slideCount, audience, userId});
 
-      res.json({
+      await respondPersisted(res, persisted, {
         success: true,
-        presentationId: docRef.id,
+        presentationId: presentationId,
         slides: slides
       });
 
@@ -239,10 +359,122 @@ Format as JSON with slide titles and content points.`;
       res.status(500).json({error: 'Failed to generate presentation'});
     }
   });
-});
+};
+
+async function generatePresentationContent({topic, slideCount, audience, userId}) {
+  const admin = firebaseAdmin();
+  const prompt = `Create a presentation outline for "${topic}" with ${slideCount} slides for ${audience} audience.
+
+Format as JSON with slide titles and content points.`;
+
+  const result = await callHuggingFace('microsoft/DialoGPT-large', {
+    inputs: prompt,
+    parameters: {
+      max_new_tokens: 600,
+      temperature: 0.7
+    }
+  }, {endpoint: 'generatePresentation'});
+
+  // Fallback presentation structure
+  const fallbackSlides = [
+    {
+      title: topic,
+      content: ["Introduction to the topic", "Overview of key points"]
+    },
+    {
+      title: "Main Points",
+      content: ["Key concept 1", "Key concept 2", "Key concept 3"]
+    },
+    {
+      title: "Conclusion",
+      content: ["Summary of findings", "Next steps", "Questions?"]
+    }
+  ];
+
+  const slides = result?.generated_text ?
+    parsePresentationFromAI(result.generated_text) : fallbackSlides;
+
+  // Save to Firestore
+  const presentationData = {
+    userId: userId,
+    title: topic,
+    slides: slides,
+    audience: audience,
+    slideCount: slideCount,
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  };
+
+  const docRef = admin.firestore().collection('presentations').doc();
+  const persisted = persistence.set(docRef, presentationData);
+  return {presentationId: docRef.id, slides, persisted};
+}
+
+// Generation jobs: in async mode the request only creates a generationJobs
+// document; runGenerationJob (or the in-process queue when
+// GENERATION_JOBS=local, e.g. under the emulator) does the work and writes
+// the result or error back to the job for the client to pick up
+const GENERATION_JOBS = 'generationJobs';
+const jobGenerators = {
+  document: generateDocumentContent,
+  presentation: generatePresentationContent,
+};
+const localJobQueue = process.env.GENERATION_JOBS === 'local' ?
+  createLocalJobQueue({run: runGenerationJob}) : null;
+
+async function enqueueGenerationJob(type, input) {
+  const admin = firebaseAdmin();
+  const jobRef = admin.firestore().collection(GENERATION_JOBS).doc();
+  await jobRef.set({
+    type: type,
+    userId: input.userId ?? null,
+    // Firestore rejects undefined fields
+    input: Object.fromEntries(Object.entries(input).filter(([, value]) => value !== undefined)),
+    status: 'queued',
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  });
+  if (localJobQueue) {
+    localJobQueue.push(jobRef.id);
+  }
+  return jobRef.id;
+}
+
+async function runGenerationJob(jobId) {
+  const admin = firebaseAdmin();
+  const {FieldValue} = admin.firestore;
+  const jobRef = admin.firestore().collection(GENERATION_JOBS).doc(jobId);
+
+  // Claim the job so a redelivered trigger (or both workers) cannot run it twice
+  const job = await admin.firestore().runTransaction(async transaction => {
+    const snapshot = await transaction.get(jobRef);
+    if (!snapshot.exists || snapshot.data().status !== 'queued') {
+      return null;
+    }
+    transaction.update(jobRef, {status: 'running', updatedAt: FieldValue.serverTimestamp()});
+    return snapshot.data();
+  });
+  if (!job) {
+    return;
+  }
+
+  try {
+    const {persisted, ...result} = await jobGenerators[job.type](job.input);
+    // The worker's instance may be idle once it returns, so wait for the write
+    await persisted;
+    await jobRef.update({status: 'done', result, updatedAt: FieldValue.serverTimestamp()});
+  } catch (error) {
+    console.error('Generation job failed:', jobId, error);
+    await jobRef.update({status: 'failed', error: error.message, updatedAt: FieldValue.serverTimestamp()});
+  }
+}
+
+exports.runGenerationJob = functions.firestore
+  .document(`${GENERATION_JOBS}/{jobId}`)
+  .onCreate((snapshot, context) => runGenerationJob(context.params.jobId));
 
 // AI Code Fix
-exports.fixCode = functions.https.onRequest((req, res) => {
+handlers.fixCode = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -266,7 +498,7 @@ Provide the corrected code and explain the fix.`;
           max_new_tokens: 400,
           temperature: 0.3
         }
-      });
+      }, {endpoint: 'fixCode'});
 
       const response = {
         originalCode: code,
@@ -291,10 +523,10 @@ Provide the corrected code and explain the fix.`;
       res.status(500).json({error: 'Failed to fix code'});
     }
   });
-});
+};
 
 // AI Chat Response
-exports.chatWithAI = functions.https.onRequest((req, res) => {
+handlers.chatWithAI = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -302,13 +534,7 @@ exports.chatWithAI = functions.https.onRequest((req, res) => {
       }
 
       const {message, context} = req.body;
-
-      const prompt = `You are an AI assistant helping students with productivity and learning. 
-
-Context: ${context || 'General assistance'}
-User: ${message}
-
-Provide a helpful response.`;
+      const prompt = chatPrompt(message, context);
 
       const result = await callHuggingFace('microsoft/DialoGPT-large', {
         inputs: prompt,
@@ -316,10 +542,9 @@ Provide a helpful response.`;
           max_new_tokens: 300,
           temperature: 0.8
         }
-      });
+      }, {endpoint: 'chatWithAI'});
 
-      const response = result?.generated_text || 
-        "I'm here to help! Could you please provide more details about what you need assistance with?";
+      const response = result?.generated_text || CHAT_FALLBACK;
 
       res.json({
         success: true,
@@ -332,20 +557,132 @@ Provide a helpful response.`;
       res.status(500).json({error: 'Failed to get AI response'});
     }
   });
-});
+};
+
+// Streaming AI Chatbot: relays tokens as server-sent events while the model
+// generates them, then sends a final `done` event with the full response
+handlers.chatWithAIStream = (req, res) => {
+  cors(req, res, async () => {
+    if (req.method !== 'POST') {
+      return res.status(405).json({error: 'Method not allowed'});
+    }
+
+    const {message, context} = req.body;
+    const model = 'microsoft/DialoGPT-large';
+    const breaker = breakerFor(model);
+    const controller = new AbortController();
+    res.on('close', () => controller.abort());
+
+    res.set({
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    });
+    res.flushHeaders();
+
+    const started = Date.now();
+    let ttftMs = null;
+    let tokens = 0;
+    let response = '';
+
+    try {
+      if (breaker.allowRequest()) {
+        const upstream = await hfClient.stream(`/${model}`, {
+          inputs: chatPrompt(message, context),
+          parameters: {
+            max_new_tokens: 300,
+            temperature: 0.8,
+            return_full_text: false
+          },
+          stream: true
+        }, {timeout: HF_DEADLINES_MS.chatWithAI, signal: controller.signal});
+
+        const parser = createSSEParser(data => {
+          const event = JSON.parse(data);
+          if (event.error) {
+            throw new Error(event.error);
+          }
+          if (!event.token || event.token.special) {
+            return;
+          }
+          if (ttftMs === null) {
+            ttftMs = Date.now() - started;
+          }
+          tokens += 1;
+          response += event.token.text;
+          res.write(formatSSE({token: event.token.text}));
+        });
+        for await (const chunk of upstream.data) {
+          parser.push(chunk);
+        }
+        parser.end();
+        breaker.recordSuccess();
+      }
+    } catch (error) {
+      if (controller.signal.aborted) {
+        // The client left before the model answered: no outcome to record
+        breaker.releaseProbe();
+        return;
+      }
+      if (isRetryable(error)) {
+        breaker.recordColdModel(retryDelayMs(error, 0));
+      } else {
+        breaker.recordFailure();
+      }
+      console.error('Error in AI chat stream:', error.message);
+    }
+
+    if (!response) {
+      // Cold model, open breaker or upstream error: answer like chatWithAI
+      streamStats.fallbacks += 1;
+      response = CHAT_FALLBACK;
+      res.write(formatSSE({token: response}));
+    }
+
+    const totalMs = Date.now() - started;
+    streamStats.streams += 1;
+    streamStats.totalMs.observe(totalMs);
+    if (ttftMs !== null) {
+      streamStats.ttftMs.observe(ttftMs);
+    }
+    console.log('HF stream', JSON.stringify({model, ttftMs, totalMs, tokens}));
+
+    res.write(formatSSE({done: true, response, timestamp: new Date().toISOString()}));
+    res.end();
+  });
+};
+
+// Client-generated voice session IDs (crypto.randomUUID() in the browser)
+function isSessionId(value) {
+  return typeof value === 'string' && /^[A-Za-z0-9_-]{16,64}$/.test(value);
+}
 
 // Voice Analysis
-exports.analyzeVoice = functions.https.onRequest((req, res) => {
+handlers.analyzeVoice = (req, res) => {
   cors(req, res, async () => {
     try {
+      const admin = firebaseAdmin();
       if (req.method !== 'POST') {
         return res.status(405).json({error: 'Method not allowed'});
       }
 
-      const {transcript, duration, userId} = req.body;
+      const {transcript, duration, userId, sessionId, incomplete} = req.body;
+      const sessions = admin.firestore().collection('voiceSessions');
 
-      // Analyze speech patterns
-      const analysis = analyzeTranscript(transcript, duration);
+      // A live session already has running counts from analyzeVoiceSegment,
+      // so the transcript is stored without being analyzed again. The client
+      // marks a session incomplete when a segment never reached the server;
+      // its transcript is analyzed in full and replaces the partial counts
+      if (sessionId != null && !isSessionId(sessionId)) {
+        return res.status(400).json({error: 'Invalid sessionId'});
+      }
+      const session = sessionId ? (await sessions.doc(sessionId).get()).data() : null;
+      const owned = Boolean(session) && session.userId === userId;
+      const live = owned && !incomplete ? session.live : null;
+      const analysis = live ?
+        new SpeechAnalyzer(live).analysis(duration) :
+        analyzeTranscript(transcript, duration);
 
       // Save to Firestore
       const sessionData = {
@@ -356,9 +693,10 @@ exports.analyzeVoice = functions.https.onRequest((req, res) => {
         createdAt: admin.firestore.FieldValue.serverTimestamp()
       };
 
-      const docRef = await admin.firestore().collection('voiceSessions').add(sessionData);
+      // The client's session ID names the document unless another user has it
+      const docRef = sessionId && (owned || !session) ? sessions.doc(sessionId) : sessions.doc();
 
-      res.json({
+      await respondPersisted(res, persistence.set(docRef, sessionData), {
         success: true,
         sessionId: docRef.id,
         analysis: analysis
@@ -369,9 +707,164 @@ exports.analyzeVoice = functions.https.onRequest((req, res) => {
       res.status(500).json({error: 'Failed to analyze voice'});
     }
   });
-});
+};
+
+// Live voice sessions: the client posts each final recognition result as it
+// arrives and gets the running analysis back. The counts are kept on the
+// voiceSessions document, so each update only analyzes the new text and
+// analyzeVoice can finish the session without re-reading the transcript
+handlers.analyzeVoiceSegment = (req, res) => {
+  cors(req, res, async () => {
+    try {
+      const admin = firebaseAdmin();
+      if (req.method !== 'POST') {
+        return res.status(405).json({error: 'Method not allowed'});
+      }
+
+      const {sessionId, userId, text, sequence, offsetSeconds} = req.body;
+      if (typeof text !== 'string' || !Number.isInteger(sequence) || !(offsetSeconds >= 0)) {
+        return res.status(400).json({error: 'text, sequence and offsetSeconds are required'});
+      }
+      // The client names the session before its first segment, so a retried
+      // first segment lands on the same document instead of a new one
+      if (!isSessionId(sessionId)) {
+        return res.status(400).json({error: 'sessionId is required'});
+      }
+
+      const sessions = admin.firestore().collection('voiceSessions');
+      const sessionRef = sessions.doc(sessionId);
+      const result = await admin.firestore().runTransaction(async transaction => {
+        const snapshot = await transaction.get(sessionRef);
+        const session = snapshot.data();
+        if (session && (session.userId !== userId || !session.live)) {
+          return null;
+        }
+        const analyzer = new SpeechAnalyzer(session?.live);
+        // A retried segment is answered without being counted twice
+        if (!session || sequence > session.sequence) {
+          analyzer.push(text, offsetSeconds);
+          transaction.set(sessionRef, {
+            userId: userId,
+            live: analyzer.state,
+            sequence: sequence,
+            updatedAt: admin.firestore.FieldValue.serverTimestamp()
+          });
+        }
+        return {...analyzer.analysis(offsetSeconds), currentWpm: analyzer.currentWpm()};
+      });
+      if (!result) {
+        return res.status(409).json({error: 'Session is not live'});
+      }
+
+      res.json({
+        success: true,
+        sessionId: sessionRef.id,
+        analysis: result
+      });
+
+    } catch (error) {
+      console.error('Error analyzing voice segment:', error);
+      res.status(500).json({error: 'Failed to analyze voice segment'});
+    }
+  });
+};
+
+// PDF export: renders a precompiled template (invoice, resume-*) on a pool
+// of warm browser pages. The renderer and puppeteer load with the first render.
+let pdfRenderer = null;
+function getPdfRenderer() {
+  if (!pdfRenderer) {
+    pdfRenderer = require('./pdf/renderer').createPdfRenderer({
+      poolSize: Number(process.env.PDF_POOL_SIZE) || 4
+    });
+  }
+  return pdfRenderer;
+}
+
+handlers.renderPdf = (req, res) => {
+  cors(req, res, async () => {
+    try {
+      if (req.method !== 'POST') {
+        return res.status(405).json({error: 'Method not allowed'});
+      }
+
+      const {template, data} = req.body;
+      const renderer = getPdfRenderer();
+      if (!renderer.templates.includes(template)) {
+        return res.status(400).json({error: `Unknown template, expected one of: ${renderer.templates.join(', ')}`});
+      }
+
+      const problem = dataError(data ?? {});
+      if (problem) {
+        return res.status(400).json({error: problem});
+      }
+
+      const {pdf, filename} = await renderer.render(template, data ?? {});
+
+      res.set({
+        'Content-Type': 'application/pdf',
+        'Content-Disposition': `attachment; filename="${filename.replace(/["\\\r\n]/g, '')}"`
+      });
+      res.send(Buffer.from(pdf));
+
+    } catch (error) {
+      console.error('Error rendering PDF:', error);
+      res.status(500).json({error: 'Failed to render PDF'});
+    }
+  });
+};
+
+// Inference cache counters for this instance
+handlers.inferenceStats = (req, res) => {
+  cors(req, res, () => {
+    res.json({
+      cache: responseCache.stats(),
+      singleFlight: singleFlight.stats(),
+      connections: hfClient.stats(),
+      batching: batcher.stats(),
+      persistence: persistence.stats(),
+      pdf: pdfRenderer ? pdfRenderer.stats() : null,
+      breakers: Object.fromEntries([...breakers].map(([model, breaker]) => [model, breaker.stats()])),
+      streaming: {
+        streams: streamStats.streams,
+        fallbacks: streamStats.fallbacks,
+        ttftMs: streamStats.ttftMs.snapshot(),
+        totalMs: streamStats.totalMs.snapshot()
+      },
+      timestamp: new Date().toISOString()
+    });
+  });
+};
+
+// Per-route runtime options: PDF rendering needs room for Chromium
+const RUNTIME_OPTIONS = {
+  renderPdf: {memory: '2GB', timeoutSeconds: 60}
+};
+
+// Deployment layout: one function per route (default), or a single `api`
+// function that routes /<name> to the same handlers (FUNCTIONS_LAYOUT=router)
+if (process.env.FUNCTIONS_LAYOUT === 'router') {
+  // Serves every route, so it is sized for the heaviest one
+  exports.api = functions.runWith(RUNTIME_OPTIONS.renderPdf).https
+    .onRequest(require('./router').createRouter(handlers));
+} else {
+  for (const [name, handler] of Object.entries(handlers)) {
+    exports[name] = functions.runWith(RUNTIME_OPTIONS[name] || {}).https.onRequest(handler);
+  }
+}
 
 // Helper Functions
+const CHAT_FALLBACK = "I'm here to help! Could you please provide more details about what you need assistance with?";
+
+function chatPrompt(message, context) {
+  return `You are an AI assistant helping students with productivity and learning. 
+
+Context: ${context || 'General assistance'}
+User: ${message}
+
+Provide a helpful response.`;
+}
+
 function parseResumeFromAI(text) {
   // Simple parsing logic - in production, use more sophisticated NLP
   return {
@@ -397,46 +890,6 @@ function parsePresentationFromAI(text) {
 }
 
 function analyzeTranscript(transcript, duration) {
-  const words = transcript.split(' ');
-  const wpm = Math.round((words.length / duration) * 60);
-
-  // Count filler words
-  const fillerWords = ['um', 'uh', 'like', 'you know', 'so', 'actually'];
-  const fillerCount = words.filter(word => 
-    fillerWords.includes(word.toLowerCase())).length;
-
-  // Calculate pause detection (simplified)
-  const sentences = transcript.split(/[.!?]+/).length;
-  const avgWordsPerSentence = words.length / sentences;
-
-  return {
-    wpm: wpm,
-    fillerWords: fillerCount,
-    fillerPercentage: Math.round((fillerCount / words.length) * 100),
-    totalWords: words.length,
-    avgWordsPerSentence: Math.round(avgWordsPerSentence),
-    duration: duration,
-    feedback: generateFeedback(wpm, fillerCount, words.length)
-  };
-}
-
-function generateFeedback(wpm, fillerCount, totalWords) {
-  let feedback = [];
-
-  if (wpm < 100) {
-    feedback.push("Try speaking a bit faster - aim for 120-150 WPM");
-  } else if (wpm > 180) {
-    feedback.push("Slow down slightly for better clarity");
-  } else {
-    feedback.push("Good speaking pace!");
-  }
-
-  const fillerPercentage = (fillerCount / totalWords) * 100;
-  if (fillerPercentage > 5) {
-    feedback.push("Try to reduce filler words - practice pausing instead");
-  } else {
-    feedback.push("Great job minimizing filler words!");
-  }
-
-  return feedback;
+  // Words, fillers (including multi-word ones) and sentences in one pass
+  return summarize(scanTranscript(transcript), duration);
 }
\ No newline at end of file
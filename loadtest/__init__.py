@@ -0,0 +1 @@
+"""Load-testing tools for the generated Cloud Functions"""
@@ -0,0 +1,31 @@
+"""Command-line entry point: ``python -m loadtest <command> ...``"""
+import sys
+
+USAGE = """usage: python -m loadtest <command> [options]
+
+commands:
+  hfstub     serve a local stand-in for the Hugging Face inference API
+  run        open-loop load test of the function endpoints, checked against SLOs
+"""
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE, end='')
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command == 'hfstub':
+        from loadtest.hfstub import main as hfstub_main
+        hfstub_main(rest)
+    elif command == 'run':
+        from loadtest.harness import main as harness_main
+        harness_main(rest)
+    else:
+        print(f'unknown command {command!r}\n\n{USAGE}', end='', file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
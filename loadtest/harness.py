@@ -0,0 +1,334 @@
+"""Open-loop load test of the six function endpoints.
+
+Requests arrive at a fixed average rate per endpoint (Poisson by default),
+whether or not earlier ones have finished, so a slow backend shows up as
+queueing latency instead of a lower request rate. Payloads are built from
+the fields each handler reads. For every endpoint the run reports
+p50/p95/p99 latency, the error rate and the rate of fallback answers, which
+the handlers give when inference is unavailable. The run fails when an SLO
+is missed:
+
+    python -m loadtest run --base-url http://127.0.0.1:5001/demo-orbit/us-central1 \\
+        --rate 4 --rate chatWithAI=10 --duration 60 \\
+        --slo '*.p95=3000' --slo '*.error_rate=0.01' --slo chatWithAI.fallback_rate=0.05
+
+SLOs are upper bounds, written ``ENDPOINT.METRIC=VALUE``, where ``*`` means
+every endpoint. The metrics are p50, p95 and p99 (ms), error_rate and
+fallback_rate; analyzeVoice never calls the model and has no fallback_rate.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:5001/demo-orbit/us-central1'
+METRICS = ('p50', 'p95', 'p99', 'error_rate', 'fallback_rate')
+
+JOBS = (
+    'Frontend developer intern building React dashboards with a focus on accessibility and performance',
+    'Data analyst working with SQL, Python and Tableau to report on marketing campaigns',
+    'Research assistant in a machine learning lab, preprocessing datasets and running experiments',
+    'Junior backend engineer maintaining Node.js services and PostgreSQL databases',
+    'Teaching assistant for introductory programming, grading assignments and running labs',
+)
+PEOPLE = (
+    ('Aisha Khan', 'Chicago, IL'), ('Mateo Rossi', 'Austin, TX'), ('Priya Natarajan', 'Seattle, WA'),
+    ('Sam Okafor', 'Toronto, ON'), ('Lena Fischer', 'Boston, MA'),
+)
+TOPICS = (
+    'Renewable energy adoption in developing countries', 'The impact of social media on study habits',
+    'Introduction to neural networks', 'Supply chain resilience after the pandemic',
+    'Designing accessible user interfaces',
+)
+OUTLINE_POINTS = (
+    'Background and motivation', 'Key definitions', 'Current state of research', 'Case study',
+    'Challenges and risks', 'Cost analysis', 'Recommendations', 'Future work',
+)
+CODE_SAMPLES = (
+    ('javascript', 'function total(items) {\n  return items.reduce((sum, item) => sum + item.price)\n}',
+     'TypeError: Cannot read properties of undefined'),
+    ('python', 'def average(values):\n    return sum(values) / len(value)', "NameError: name 'value' is not defined"),
+    ('javascript', 'const user = await fetchUser(id)\nconsole.log(user.name', 'SyntaxError: missing ) after argument list'),
+    ('python', 'for i in range(10)\n    print(i)', "SyntaxError: expected ':'"),
+)
+QUESTIONS = (
+    'How do I write a strong summary for my resume?', 'Can you explain recursion with an example?',
+    'What should I put on the first slide of my presentation?', 'How do I prepare for a behavioral interview?',
+    'What is the difference between let and const in JavaScript?',
+)
+SPEECH = ('so', 'today', 'I', 'want', 'to', 'talk', 'about', 'my', 'project', 'and', 'how', 'we',
+          'built', 'it', 'the', 'main', 'goal', 'was', 'to', 'help', 'students', 'learn', 'faster')
+FILLERS = ('um', 'uh', 'like', 'actually', 'you know')
+
+
+def resume_payload(rng):
+    name, location = rng.choice(PEOPLE)
+    return {
+        'jobDescription': rng.choice(JOBS),
+        'personalInfo': {
+            'name': name,
+            'email': name.lower().replace(' ', '.') + '@example.edu',
+            'phone': f'555-{rng.randrange(1000, 9999)}',
+            'location': location,
+        },
+        'template': rng.choice(('professional', 'creative', 'academic')),
+        'userId': f'loadtest-{rng.randrange(100)}',
+    }
+
+
+def document_payload(rng):
+    return {
+        'topic': rng.choice(TOPICS),
+        'documentType': rng.choice(('report', 'essay', 'proposal')),
+        'outline': '\n'.join(rng.sample(OUTLINE_POINTS, rng.randint(3, 6))),
+        'userId': f'loadtest-{rng.randrange(100)}',
+    }
+
+
+def presentation_payload(rng):
+    return {
+        'topic': rng.choice(TOPICS),
+        'slideCount': rng.randint(5, 12),
+        'audience': rng.choice(('classmates', 'professors', 'investors', 'high school students')),
+        'userId': f'loadtest-{rng.randrange(100)}',
+    }
+
+
+def fix_code_payload(rng):
+    language, code, error = rng.choice(CODE_SAMPLES)
+    return {'code': code, 'language': language, 'error': error}
+
+
+def chat_payload(rng):
+    return {'message': rng.choice(QUESTIONS), 'context': rng.choice(('Resume help', 'Coding', None))}
+
+
+def voice_payload(rng):
+    """A 30-120 s practice answer at 110-170 WPM with a few percent of fillers"""
+    duration = rng.randint(30, 120)
+    words = [rng.choice(FILLERS) if rng.random() < rng.uniform(0.01, 0.08) else rng.choice(SPEECH)
+             for _ in range(duration * rng.randint(110, 170) // 60)]
+    return {'transcript': ' '.join(words), 'duration': duration, 'userId': f'loadtest-{rng.randrange(100)}'}
+
+
+# Each handler's answer when inference was unavailable (see functions/index.js);
+# analyzeVoice never calls the model, so it has no fallback to detect
+ENDPOINTS = {
+    'generateResume': (resume_payload, lambda body: ((body.get('content') or {}).get('skills') or [None])[-1] == 'Technical Skills'),
+    'generateDocument': (document_payload, lambda body: '[Generated content would appear here' in body.get('content', '')),
+    'generatePresentation': (presentation_payload, lambda body: any(slide.get('title') == 'Main Points' for slide in body.get('slides', []))),
+    'fixCode': (fix_code_payload, lambda body: body.get('explanation', '').startswith('Unable to process fix')),
+    'chatWithAI': (chat_payload, lambda body: body.get('response', '').startswith("I'm here to help! Could you please")),
+    'analyzeVoice': (voice_payload, None),
+}
+
+
+async def post_json(url, payload, timeout):
+    """POST ``payload`` on a fresh connection -> (status, parsed JSON body or None)"""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    body = json.dumps(payload).encode()
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == 'https')
+        try:
+            writer.write(f'POST {parts.path or "/"} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+                         f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, raw = response.partition(b'\r\n\r\n')
+        status = int(head.split(b' ', 2)[1])
+        if b'transfer-encoding: chunked' in head.lower():
+            raw = dechunk(raw)
+        try:
+            return status, json.loads(raw)
+        except ValueError:
+            return status, None
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+def dechunk(raw):
+    body = b''
+    while raw:
+        size_line, _, raw = raw.partition(b'\r\n')
+        size = int(size_line.split(b';')[0] or b'0', 16)
+        if not size:
+            break
+        body, raw = body + raw[:size], raw[size + 2:]
+    return body
+
+
+class EndpointStats:
+    def __init__(self, has_fallback=True):
+        self.has_fallback = has_fallback
+        self.latencies_ms = []
+        self.sent = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.dropped = 0
+
+    def summary(self, duration):
+        ok = len(self.latencies_ms)
+        ordered = sorted(self.latencies_ms)
+        return {
+            'sent': self.sent,
+            'rate': self.sent / duration,
+            'completed': ok,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'p50': percentile(ordered, 0.50),
+            'p95': percentile(ordered, 0.95),
+            'p99': percentile(ordered, 0.99),
+            'error_rate': (self.errors + self.dropped) / self.sent if self.sent else 0.0,
+            'fallback_rate': (self.fallbacks / ok if ok else 0.0) if self.has_fallback else None,
+        }
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of a sorted list, None when empty"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+async def drive(base_url, name, rate, duration, rng, stats, in_flight, args):
+    """Fire requests at ``rate`` per second for ``duration`` seconds, open loop"""
+    build, is_fallback = ENDPOINTS[name]
+    url = f'{base_url.rstrip("/")}/{name}'
+    tasks = []
+
+    async def one(payload):
+        started = time.perf_counter()
+        try:
+            status, body = await post_json(url, payload, args.timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            stats.errors += 1
+            return
+        finally:
+            in_flight.release()
+        if status >= 400 or not isinstance(body, dict):
+            stats.errors += 1
+            return
+        stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+        if is_fallback and is_fallback(body):
+            stats.fallbacks += 1
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    next_at = loop.time()
+    while True:
+        gap = rng.expovariate(rate) if args.arrivals == 'poisson' else 1 / rate
+        next_at += gap
+        if next_at >= deadline:
+            break
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        stats.sent += 1
+        if in_flight.locked():
+            # Open loop: never wait for capacity, count the arrival as failed
+            stats.dropped += 1
+            continue
+        await in_flight.acquire()
+        tasks.append(asyncio.ensure_future(one(build(rng))))
+    await asyncio.gather(*tasks)
+
+
+def parse_rates(specs, default):
+    """``--rate N`` sets every endpoint, ``--rate NAME=N`` one of them"""
+    rates = dict.fromkeys(ENDPOINTS, default)
+    for spec in specs:
+        name, _, value = spec.rpartition('=')
+        if name and name not in ENDPOINTS:
+            raise SystemExit(f'unknown endpoint {name!r}, expected one of {", ".join(ENDPOINTS)}')
+        for endpoint in ([name] if name else ENDPOINTS):
+            rates[endpoint] = float(value)
+    return {name: rate for name, rate in rates.items() if rate > 0}
+
+
+def parse_slos(specs):
+    slos = []
+    for spec in specs:
+        target, _, bound = spec.partition('=')
+        endpoint, _, metric = target.rpartition('.')
+        if metric not in METRICS or (endpoint != '*' and endpoint not in ENDPOINTS) or not bound:
+            raise SystemExit(f'invalid SLO {spec!r}, expected ENDPOINT.METRIC=VALUE with METRIC in {METRICS}')
+        if metric == 'fallback_rate' and endpoint != '*' and ENDPOINTS[endpoint][1] is None:
+            raise SystemExit(f'invalid SLO {spec!r}: {endpoint} has no fallback answer')
+        slos.append((endpoint, metric, float(bound)))
+    return slos
+
+
+def check_slos(results, slos):
+    violations = []
+    for endpoint, metric, bound in slos:
+        for name in (results if endpoint == '*' else [endpoint]):
+            if metric == 'fallback_rate' and ENDPOINTS[name][1] is None:
+                continue
+            value = results.get(name, {}).get(metric)
+            if value is None or value > bound:
+                violations.append(f'{name}.{metric} = {value:.4g} > {bound:g}' if value is not None
+                                  else f'{name}.{metric}: no successful requests')
+    return violations
+
+
+async def run(args, rates):
+    rng = random.Random(args.seed)
+    in_flight = asyncio.Semaphore(args.max_in_flight)
+    stats = {name: EndpointStats(ENDPOINTS[name][1] is not None) for name in rates}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        drive(args.base_url, name, rate, args.duration, random.Random(rng.random()), stats[name], in_flight, args)
+        for name, rate in rates.items()))
+    elapsed = time.perf_counter() - started
+    return {name: stats[name].summary(args.duration) for name in rates}, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL,
+                        help='functions base URL, e.g. the emulator or .../us-central1/api for the router layout')
+    parser.add_argument('--rate', action='append', default=[], metavar='[ENDPOINT=]RPS',
+                        help='arrivals per second for every endpoint, or one of them (repeatable, default 1)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of arrivals (default 30)')
+    parser.add_argument('--arrivals', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--timeout', type=float, default=60, help='per-request timeout in seconds')
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help='arrivals beyond this many open requests are dropped and count as errors')
+    parser.add_argument('--slo', action='append', default=[], metavar='ENDPOINT.METRIC=MAX')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write the results as JSON')
+    args = parser.parse_args(argv)
+    rates = parse_rates(args.rate, 1.0)
+    slos = parse_slos(args.slo)
+
+    results, elapsed = asyncio.run(run(args, rates))
+
+    print(f'{"endpoint":<22}{"rps":>6}{"sent":>7}{"p50":>9}{"p95":>9}{"p99":>9}{"errors":>9}{"fallback":>10}')
+    for name, result in results.items():
+        cells = [f'{result[key]:9.0f}' if result[key] is not None else f'{"-":>9}' for key in ('p50', 'p95', 'p99')]
+        fallback = f'{result["fallback_rate"]:10.1%}' if result['fallback_rate'] is not None else f'{"-":>10}'
+        print(f'{name:<22}{result["rate"]:6.1f}{result["sent"]:7d}{"".join(cells)}'
+              f'{result["error_rate"]:9.1%}{fallback}')
+    print(f'⏱️  {elapsed:.1f}s wall clock (latencies in ms)')
+
+    violations = check_slos(results, slos)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'base_url': args.base_url, 'duration': args.duration, 'rates': rates,
+                       'results': results, 'slo_violations': violations}, f, indent=2)
+    for violation in violations:
+        print(f'❌ SLO missed: {violation}', file=sys.stderr)
+    if violations:
+        sys.exit(1)
+    if slos:
+        print(f'✅ All {len(slos)} SLOs met')
+
+
+if __name__ == '__main__':
+    main()
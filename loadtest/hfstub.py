@@ -0,0 +1,315 @@
+"""Local stand-in for the Hugging Face inference API, for offline load tests.
+
+Point the generated functions at it and every ``callHuggingFace`` request is
+answered locally, with deterministic text and controllable timing:
+
+    python -m loadtest hfstub --port 8765 --latency lognormal:600,0.4 \\
+        --token-rate 40 --loading 30:45 --rate-limit 60:70 --log hf-requests.jsonl
+    HF_BASE_URL=http://127.0.0.1:8765/models firebase emulators:start --only functions
+
+Requests are answered after a sampled latency plus one token time per
+generated token. ``"stream": true`` requests get TGI-style server-sent events
+paced at ``--token-rate``. A list of ``inputs`` is answered per input, as the
+real API does for batches. During each ``--loading START:END`` window (seconds
+since startup) every request gets a 503 with ``estimated_time``, and during
+each ``--rate-limit START:END`` window a 429 with ``Retry-After``. Every request
+is logged as one JSON line, including which keep-alive connection served it,
+and ``GET /stats`` returns the running counters.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import random
+import sys
+import time
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_NEW_TOKENS = 50
+WORDS = ('the', 'student', 'project', 'team', 'skills', 'learning', 'design', 'data',
+         'research', 'clear', 'results', 'experience', 'practice', 'growth', 'code',
+         'strong', 'communication', 'analysis', 'goal', 'impact')
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 429: 'Too Many Requests',
+           503: 'Service Unavailable'}
+
+
+def parse_latency(spec):
+    """``fixed:MS``, ``uniform:LO,HI``, ``normal:MEAN,SD``, ``lognormal:MEDIAN,SIGMA``
+    or ``exp:MEAN`` (milliseconds) -> function returning a delay in seconds"""
+    kind, _, args = spec.partition(':')
+    try:
+        values = [float(value) for value in args.split(',')] if args else []
+        samplers = {
+            'fixed': lambda ms: lambda: ms,
+            'uniform': lambda lo, hi: lambda: random.uniform(lo, hi),
+            'normal': lambda mean, sd: lambda: random.gauss(mean, sd),
+            'lognormal': lambda median, sigma: lambda: random.lognormvariate(math.log(median), sigma),
+            'exp': lambda mean: lambda: random.expovariate(1 / mean),
+        }
+        sample_ms = samplers[kind](*values)
+    except (KeyError, TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f'invalid latency distribution {spec!r}') from None
+    return lambda: max(0.0, sample_ms()) / 1000
+
+
+def parse_phase(spec):
+    """``START:END[:SECONDS]`` in seconds -> (start, end, seconds or None)"""
+    try:
+        parts = [float(part) for part in spec.split(':')]
+        start, end = parts[:2]
+        seconds = parts[2] if len(parts) > 2 else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid phase {spec!r}') from None
+    if len(parts) not in (2, 3) or end <= start:
+        raise argparse.ArgumentTypeError(f'invalid phase {spec!r}')
+    return start, end, seconds
+
+
+def generate_tokens(prompt, count):
+    """Deterministic pseudo-text for ``prompt``: same prompt, same tokens"""
+    seed = int.from_bytes(hashlib.blake2b(prompt.encode(), digest_size=8).digest(), 'big')
+    rng = random.Random(seed)
+    return [' ' + rng.choice(WORDS) for _ in range(count)]
+
+
+class StubServer:
+    def __init__(self, latency, token_rate, loading=(), max_tokens=None, log=None, rate_limits=()):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.loading = list(loading)
+        self.rate_limits = list(rate_limits)
+        self.max_tokens = max_tokens
+        self.log = log
+        self.started = time.monotonic()
+        self.connection_ids = itertools.count(1)
+        self.counters = {'requests': 0, 'connections': 0, 'batched_inputs': 0, 'streams': 0,
+                         'status': {}}
+
+    def phase_seconds(self, phases):
+        """The current phase's SECONDS (default: time left in it), or None outside them"""
+        elapsed = time.monotonic() - self.started
+        for start, end, seconds in phases:
+            if start <= elapsed < end:
+                return seconds if seconds is not None else end - elapsed
+        return None
+
+    def loading_estimate(self):
+        """Seconds left in the current loading phase, or None when the model is up"""
+        return self.phase_seconds(self.loading)
+
+    def retry_after(self):
+        """Retry-After seconds in the current rate-limit phase, or None when not limited"""
+        seconds = self.phase_seconds(self.rate_limits)
+        return None if seconds is None else max(1, math.ceil(seconds))
+
+    def token_count(self, payload):
+        requested = (payload.get('parameters') or {}).get('max_new_tokens', DEFAULT_MAX_NEW_TOKENS)
+        return min(requested, self.max_tokens) if self.max_tokens else requested
+
+    def token_delay(self):
+        return 1 / self.token_rate if self.token_rate else 0
+
+    def record(self, entry):
+        self.counters['requests'] += 1
+        status = str(entry['status'])
+        self.counters['status'][status] = self.counters['status'].get(status, 0) + 1
+        if self.log:
+            self.log.write(json.dumps(entry) + '\n')
+            self.log.flush()
+
+    async def handle_connection(self, reader, writer):
+        connection = next(self.connection_ids)
+        self.counters['connections'] += 1
+        try:
+            for sequence in itertools.count(1):
+                try:
+                    request = await read_request(reader)
+                except ValueError:
+                    # Malformed request line, header or chunk size
+                    await send_json(writer, 400, {'error': 'Malformed HTTP request'}, keep_alive=False)
+                    self.record({'ts': time.time(), 'connection': connection, 'sequence': sequence,
+                                 'status': 400, 'latency_ms': 0})
+                    break
+                if request is None:
+                    break
+                keep_alive = await self.handle_request(request, writer, connection, sequence)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request, writer, connection, sequence):
+        method, path, headers, body = request
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        received = time.monotonic()
+        entry = {
+            'ts': time.time(),
+            'connection': connection,
+            'sequence': sequence,
+            'method': method,
+            'path': path,
+            'authorized': headers.get('authorization', '').startswith('Bearer '),
+        }
+
+        if method == 'GET' and path == '/stats':
+            await send_json(writer, 200, {**self.counters, 'uptime_s': received - self.started}, keep_alive)
+            return keep_alive
+        try:
+            payload = json.loads(body or b'{}')
+            inputs = payload['inputs']
+        except (ValueError, KeyError, TypeError):
+            await send_json(writer, 400, {'error': 'Expected a JSON body with "inputs"'}, keep_alive)
+            self.record({**entry, 'status': 400, 'latency_ms': 0})
+            return keep_alive
+
+        model = path.removeprefix('/models').lstrip('/')
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        stream = bool(payload.get('stream'))
+        tokens = self.token_count(payload)
+        entry.update(model=model, batch=len(batch), stream=stream, tokens=tokens,
+                     max_new_tokens=(payload.get('parameters') or {}).get('max_new_tokens'))
+
+        retry_after = self.retry_after()
+        if retry_after is not None:
+            await send_json(writer, 429, {'error': 'Rate limit reached. Please retry later.'}, keep_alive,
+                            headers={'Retry-After': retry_after})
+            self.record({**entry, 'status': 429, 'retry_after': retry_after,
+                         'latency_ms': (time.monotonic() - received) * 1000})
+            return keep_alive
+
+        estimated = self.loading_estimate()
+        if estimated is not None:
+            await asyncio.sleep(self.latency())
+            await send_json(writer, 503, {'error': f'Model {model} is currently loading',
+                                          'estimated_time': round(estimated, 1)}, keep_alive)
+            self.record({**entry, 'status': 503, 'estimated_time': estimated,
+                         'latency_ms': (time.monotonic() - received) * 1000})
+            return keep_alive
+
+        await asyncio.sleep(self.latency())
+        full_text = (payload.get('parameters') or {}).get('return_full_text', True)
+        if stream:
+            self.counters['streams'] += 1
+            entry['first_token_ms'] = await self.stream(writer, batch[0], tokens, full_text)
+        else:
+            await asyncio.sleep(tokens * self.token_delay())
+            outputs = [[{'generated_text': (prompt if full_text else '')
+                         + ''.join(generate_tokens(str(prompt), tokens))}] for prompt in batch]
+            if isinstance(inputs, list):
+                self.counters['batched_inputs'] += len(batch)
+            await send_json(writer, 200, outputs if isinstance(inputs, list) else outputs[0], keep_alive)
+        self.record({**entry, 'status': 200, 'latency_ms': (time.monotonic() - received) * 1000})
+        return keep_alive
+
+    async def stream(self, writer, prompt, count, full_text):
+        """Send tokens as TGI server-sent events; returns ms to the first token"""
+        started = time.monotonic()
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n')
+        tokens = generate_tokens(str(prompt), count)
+        first_token_ms = None
+        for index, text in enumerate(tokens):
+            last = index == len(tokens) - 1
+            event = {
+                'token': {'id': index, 'text': text, 'logprob': 0.0, 'special': False},
+                'generated_text': ((prompt if full_text else '') + ''.join(tokens)) if last else None,
+                'details': None,
+            }
+            await write_chunk(writer, f'data:{json.dumps(event)}\n\n'.encode())
+            if first_token_ms is None:
+                first_token_ms = (time.monotonic() - started) * 1000
+            if not last:
+                await asyncio.sleep(self.token_delay())
+        await write_chunk(writer, b'')
+        return first_token_ms
+
+
+async def read_request(reader):
+    """One HTTP/1.1 request -> (method, path, headers, body), or None at EOF"""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode('latin-1').split(' ', 2)  # ValueError when malformed
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.readexactly(int(headers.get('content-length') or 0))
+    return method, path.split('?')[0], headers, body
+
+
+async def send_json(writer, status, payload, keep_alive, headers=None):
+    body = json.dumps(payload).encode()
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in (headers or {}).items())
+    writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n{extra}'
+                 f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + body)
+    await writer.drain()
+
+
+async def write_chunk(writer, data):
+    writer.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+    await writer.drain()
+
+
+async def serve(stub, host, port):
+    server = await asyncio.start_server(stub.handle_connection, host, port)
+    print(f'🤖 HF stand-in on http://{host}:{port}/models  (HF_BASE_URL)')
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=parse_latency, default=parse_latency('lognormal:400,0.5'),
+                        metavar='DIST', help='delay before the first token, e.g. fixed:200, '
+                        'uniform:100,900, normal:500,100, lognormal:400,0.5, exp:300 (ms)')
+    parser.add_argument('--token-rate', type=float, default=50,
+                        help='generated tokens per second, 0 for instant (default 50)')
+    parser.add_argument('--max-tokens', type=int,
+                        help='cap on generated tokens, whatever max_new_tokens asks for')
+    parser.add_argument('--loading', type=parse_phase, action='append', default=[],
+                        metavar='START:END[:EST]', help='answer 503 "model loading" from START to END '
+                        'seconds after startup, with estimated_time EST (default: time left); repeatable')
+    parser.add_argument('--rate-limit', type=parse_phase, action='append', default=[],
+                        metavar='START:END[:RETRY]', help='answer 429 "rate limit reached" from START to END '
+                        'seconds after startup, with Retry-After RETRY (default: time left); repeatable')
+    parser.add_argument('--log', help='append one JSON line per request to this file')
+    parser.add_argument('--seed', type=int, help='seed the latency sampler')
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    log = open(args.log, 'a') if args.log else None
+    stub = StubServer(args.latency, args.token_rate, args.loading, args.max_tokens, log, args.rate_limit)
+    try:
+        asyncio.run(serve(stub, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log:
+            log.close()
+        print(f"📊 {stub.counters['requests']} requests on {stub.counters['connections']} connections, "
+              f"status {stub.counters['status']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""Shared emission engine for the ORBIT AI generator scripts"""
+from orbitgen.emit import HashIndex, emit, render
+
+__all__ = ['HashIndex', 'emit', 'generate', 'render']
+
+
+def __getattr__(name):
+    # Imported on first use: the planner pulls in the thread pool machinery
+    if name == 'generate':
+        from orbitgen.api import generate
+
+        return generate
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,78 @@
+"""Command-line entry point: ``python -m orbitgen <command> ...``
+
+Subcommand modules are imported only once the command is known, which keeps
+startup down to the interpreter plus this file.
+"""
+import sys
+
+USAGE = """usage: python -m orbitgen <command> [options]
+
+commands:
+  generate   emit the tree, optionally only --only GLOB entries
+  plan       emit all seven dicts, or stream them into an archive
+  tenants    batch-generate one tree per tenant
+  watch      re-emit changed entries as the scripts are edited
+  pack       rebuild the content pack from the scripts
+  bench      benchmark the emission path on synthetic trees
+"""
+
+
+def generate_main(argv):
+    import argparse
+
+    from orbitgen.plan import DEFAULT_WORKERS, parse_overrides, report
+
+    parser = argparse.ArgumentParser(prog='python -m orbitgen generate')
+    parser.add_argument('target', nargs='?', default='.')
+    parser.add_argument('--only', action='append', metavar='GLOB',
+                        help="emit only entries matching GLOB, e.g. 'functions/**' (repeatable)")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a declared template parameter (repeatable)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+    overrides = parse_overrides(parser, args.param)
+
+    from orbitgen.api import generate
+
+    result = generate(args.target, args.only, overrides, args.workers)
+    print(f'✅ Emitted {report(result)}')
+
+
+def pack_main(argv):
+    from orbitgen.pack import build
+    from orbitgen.plan import SCRIPTS_DIR
+
+    build(SCRIPTS_DIR)
+    print('✅ Content pack rebuilt')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE, end='')
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command == 'generate':
+        generate_main(rest)
+    elif command == 'pack':
+        pack_main(rest)
+    elif command == 'plan':
+        from orbitgen.plan import main as plan_main
+        plan_main(rest)
+    elif command == 'tenants':
+        from orbitgen.tenants import main as tenants_main
+        tenants_main(rest)
+    elif command == 'watch':
+        from orbitgen.watch import main as watch_main
+        watch_main(rest)
+    elif command == 'bench':
+        from orbitgen.bench import main as bench_main
+        bench_main(rest)
+    else:
+        print(f'unknown command {command!r}\n\n{USAGE}', end='', file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
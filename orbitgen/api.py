@@ -0,0 +1,48 @@
+"""Library entry point: generate all or part of the ORBIT AI tree.
+
+    from orbitgen import generate
+    generate('build/app', only=['functions/**'])
+"""
+import fnmatch
+import os
+import re
+
+from orbitgen.pack import ContentPack
+from orbitgen.plan import DEFAULT_WORKERS, SCRIPTS_DIR, Plan, load_script, run
+from orbitgen.templates import render_text, resolve
+
+
+def _matcher(patterns):
+    # fnmatch's '*' already crosses '/', so 'functions/**' selects the subtree
+    regex = re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+    return lambda relpath: regex.match(relpath) is not None
+
+
+def generate(target='.', only=None, params=None, workers=DEFAULT_WORKERS, store=None,
+             scripts_dir=SCRIPTS_DIR):
+    """Emit the generated tree (or the entries matching the ``only`` globs)
+
+    ``params`` overrides declared template parameters. Only the selected
+    entries are read from the content pack. The project manifest is refreshed
+    for full generations only. Returns the :class:`orbitgen.emit.EmitResult`.
+    """
+    values = resolve(params)
+    pack = ContentPack(scripts_dir)
+    try:
+        selected = list(pack.entries)
+        if only:
+            selected = list(filter(_matcher(only), selected))
+        plan = Plan()
+        for relpath in selected:
+            text, json_escape = pack.source(relpath)
+            plan.add({relpath: render_text(text, values, json_escape).encode('utf-8')})
+        if not only:
+            plan.directories.update(pack.directories)
+    finally:
+        pack.close()
+
+    os.makedirs(target, exist_ok=True)
+    result = run(plan, target, workers, store)
+    if not only:
+        load_script('script_6', scripts_dir).write_manifest(target, store)
+    return result
@@ -0,0 +1,111 @@
+"""Stream the generated tree straight into a zip or tar.gz archive.
+
+Nothing touches the filesystem besides the archive itself (or stdout). Entries
+are written in sorted order with fixed timestamps, owners and permissions so
+the same plan always yields a byte-identical, cacheable archive.
+"""
+import gzip
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+from orbitgen.emit import digest, render
+from orbitgen.plan import SCRIPTS_DIR, load_script
+
+FORMATS = ('zip', 'tar.gz')
+MANIFEST_NAME = 'project-manifest.json'
+
+# zip cannot represent anything before 1980
+ZIP_EPOCH = 315532800
+
+
+def source_date_epoch():
+    """Archive timestamp, overridable through SOURCE_DATE_EPOCH"""
+    return max(int(os.environ.get('SOURCE_DATE_EPOCH', ZIP_EPOCH)), ZIP_EPOCH)
+
+
+def guess_format(path):
+    if path.endswith('.zip'):
+        return 'zip'
+    if path.endswith(('.tar.gz', '.tgz')):
+        return 'tar.gz'
+    raise ValueError(f'cannot infer archive format from {path!r}; pass one of {FORMATS}')
+
+
+def _listed(relpath):
+    # Mirrors the skip rules of get_all_files() in script_6
+    parts = relpath.split('/')
+    if any(p.startswith('.') or p == 'node_modules' for p in parts[:-1]):
+        return False
+    return not parts[-1].startswith('.') and not parts[-1].endswith('.pyc')
+
+
+def archive_entries(plan, scripts_dir=SCRIPTS_DIR, params=None):
+    """Rendered ``relpath -> bytes`` for the plan, manifest included, sorted"""
+    files = {relpath: render(content, params) for relpath, content in plan.entries.items()}
+    # As on disk, the manifest does not list itself
+    listed = sorted(p for p in files if _listed(p) and p != MANIFEST_NAME)
+    # No inode or mtime inside an archive: details carry size and digest only
+    details = {p: {'size': len(files[p]), 'blake2b': digest(files[p])} for p in listed}
+    manifest = load_script('script_6', scripts_dir).build_manifest(listed, details)
+    files[MANIFEST_NAME] = render(manifest)
+    return dict(sorted(files.items()))
+
+
+def _directories(plan, files):
+    dirs = set(plan.directories)
+    for relpath in files:
+        parent = os.path.dirname(relpath)
+        while parent:
+            dirs.add(parent)
+            parent = os.path.dirname(parent)
+    return sorted(dirs)
+
+
+def write_zip(fileobj, plan, files):
+    date_time = time.gmtime(source_date_epoch())[:6]
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for directory in _directories(plan, files):
+            info = zipfile.ZipInfo(directory + '/', date_time)
+            info.create_system = 3
+            info.external_attr = (0o40755 << 16) | 0x10
+            zf.writestr(info, b'')
+        for relpath, data in files.items():
+            info = zipfile.ZipInfo(relpath, date_time)
+            info.create_system = 3
+            info.external_attr = 0o100644 << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+
+
+def write_tar_gz(fileobj, plan, files):
+    mtime = source_date_epoch()
+    # gzip header: no file name and a fixed mtime, otherwise output drifts
+    with gzip.GzipFile(filename='', mode='wb', fileobj=fileobj, mtime=mtime) as gz:
+        with tarfile.open(fileobj=gz, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            for directory in _directories(plan, files):
+                info = tarfile.TarInfo(directory)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = mtime
+                tar.addfile(info)
+            for relpath, data in files.items():
+                info = tarfile.TarInfo(relpath)
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = mtime
+                tar.addfile(info, io.BytesIO(data))
+
+
+def write_archive(plan, fileobj, fmt, scripts_dir=SCRIPTS_DIR, params=None):
+    """Stream ``plan`` into ``fileobj`` as ``fmt``; returns the entry count"""
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown archive format {fmt!r}; expected one of {FORMATS}')
+    files = archive_entries(plan, scripts_dir, params)
+    if fmt == 'zip':
+        write_zip(fileobj, plan, files)
+    else:
+        write_tar_gz(fileobj, plan, files)
+    return len(files)
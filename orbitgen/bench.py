@@ -0,0 +1,274 @@
+"""Benchmark and profile the emission path at scale.
+
+The real plan (all seven generator dicts) is replicated under
+``synthetic/<n>/`` prefixes until it reaches the requested entry count, then
+generated into a scratch directory on tmpfs and/or a real disk. Each phase
+(render, mkdir, write, rewrite with no changes, manifest walk) is timed and
+annotated with its read and write syscall counts (``syscr``/``syscw`` from
+/proc/self/io; open, stat and rename are not counted) and with the RSS
+sampled during the phase. Results are written as JSON plus a Chrome trace
+(chrome://tracing, Perfetto).
+
+The disk case runs in ``--disk-root``, which is skipped with a warning when
+it turns out to be on tmpfs, as the default temp directory often is.
+
+    python -m orbitgen.bench --sizes 10000 100000 --fs tmpfs disk \\
+        --out bench-results.json --trace bench-trace.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from orbitgen.emit import HashIndex, emit_one, render
+from orbitgen.manifest import scan
+from orbitgen.plan import DEFAULT_WORKERS, Plan
+
+DEFAULT_SIZES = (10_000, 100_000)
+TMPFS_ROOT = '/dev/shm'
+MEMORY_FILESYSTEMS = ('tmpfs', 'ramfs')
+RSS_SAMPLE_SECONDS = 0.005
+
+
+def synthetic_plan(size):
+    """The real plan, replicated under synthetic/<n>/ up to ``size`` entries"""
+    base = Plan.collect()
+    plan = Plan()
+    plan.add(base.entries, base.directories)
+    copy = 0
+    while len(plan) < size:
+        prefix = f'synthetic/{copy}'
+        room = size - len(plan)
+        batch = dict(list(base.entries.items())[:room])
+        plan.add({f'{prefix}/{relpath}': content for relpath, content in batch.items()},
+                 [f'{prefix}/{d}' for d in base.directories])
+        copy += 1
+    return plan
+
+
+def io_counters():
+    """read(2)- and write(2)-family syscall counts of this process (Linux only)"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return {'syscr': int(fields['syscr']), 'syscw': int(fields['syscw'])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+def process_peak_rss_bytes():
+    """Highest RSS since the process started, not of the current phase"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """Samples the RSS from /proc/self/statm until stopped (Linux only)
+
+    The file stays open and is re-read with one pread per sample, so the
+    phase's read syscall count can be corrected by ``samples``.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.stopped = threading.Event()
+        try:
+            self.fd = os.open('/proc/self/statm', os.O_RDONLY)
+        except OSError:
+            self.fd = None
+        self.last = self.peak = None
+        self.first = self.sample()
+
+    def sample(self):
+        if self.fd is None:
+            return None
+        self.samples += 1
+        rss = int(os.pread(self.fd, 128, 0).split()[1]) * resource.getpagesize()
+        self.last = rss
+        self.peak = max(self.peak or 0, rss)
+        return rss
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+        self.sample()
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class Recorder:
+    """Collects phase measurements and the matching Chrome trace events"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self.phases = []
+
+    def phase(self, name, **args):
+        return _Phase(self, name, args)
+
+
+class _Phase:
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.rss = RssSampler()
+        self.rss.start()
+        self.io = io_counters()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.rss.stop()
+        io = io_counters()
+        record = {
+            'phase': self.name,
+            **self.args,
+            'seconds': end - self.start,
+            # The sampler's own preads are not part of the phase
+            'read_syscalls': max(0, io.get('syscr', 0) - self.io.get('syscr', 0) - (self.rss.samples - 1)),
+            'write_syscalls': io.get('syscw', 0) - self.io.get('syscw', 0),
+            'rss_start_bytes': self.rss.first,
+            'rss_end_bytes': self.rss.last,
+            'peak_rss_bytes': self.rss.peak,
+            'process_peak_rss_bytes': process_peak_rss_bytes(),
+        }
+        self.recorder.phases.append(record)
+        self.recorder.events.append({
+            'name': self.name,
+            'cat': self.args.get('fs', ''),
+            'ph': 'X',
+            'ts': (self.start - self.recorder.origin) * 1e6,
+            'dur': (end - self.start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': {k: v for k, v in record.items() if k != 'phase'},
+        })
+        return False
+
+
+def _write(target, index, rendered, workers):
+    def one(item):
+        return emit_one(item[0], item[1], target, index, make_parents=False)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(size or 0 for size in pool.map(one, rendered.items()))
+
+
+def run_case(recorder, plan, root, fs, workers):
+    labels = {'fs': fs, 'mount_type': filesystem_type(root), 'entries': len(plan), 'workers': workers}
+    target = tempfile.mkdtemp(prefix='orbitgen-bench-', dir=root)
+    try:
+        with recorder.phase('render', **labels):
+            rendered = {relpath: render(content) for relpath, content in plan.entries.items()}
+        with recorder.phase('mkdir', **labels):
+            for directory in sorted(plan.directories):
+                os.makedirs(os.path.join(target, directory), exist_ok=True)
+        index = HashIndex(target)
+        with recorder.phase('write', **labels) as phase:
+            phase.args['bytes'] = _write(target, index, rendered, workers)
+        index.save()
+        with recorder.phase('rewrite_unchanged', **labels):
+            _write(target, HashIndex(target), rendered, workers)
+        with recorder.phase('manifest_walk', **labels):
+            previous = scan(target, workers=workers)
+        with recorder.phase('manifest_rewalk', **labels):
+            scan(target, previous, workers=workers)
+    finally:
+        shutil.rmtree(target, ignore_errors=True)
+
+
+def filesystem_type(path):
+    """Type of the filesystem ``path`` is on, from /proc/mounts (Linux only)"""
+    path = os.path.realpath(path)
+    mount_point, fstype = '', None
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                fields = line.split()
+                mount = fields[1].replace('\\040', ' ')
+                inside = path == mount or path.startswith(mount.rstrip('/') + '/')
+                # Later mounts on the same point hide earlier ones
+                if inside and len(mount) >= len(mount_point):
+                    mount_point, fstype = mount, fields[2]
+    except (OSError, IndexError):
+        return None
+    return fstype
+
+
+def filesystems(names, disk_root):
+    roots = {}
+    for name in names:
+        if name == 'tmpfs':
+            if not os.path.isdir(TMPFS_ROOT):
+                print(f'⚠️  {TMPFS_ROOT} not available, skipping tmpfs', file=sys.stderr)
+                continue
+            roots[name] = TMPFS_ROOT
+        else:
+            fstype = filesystem_type(disk_root)
+            if fstype in MEMORY_FILESYSTEMS:
+                print(f'⚠️  --disk-root {disk_root} is on {fstype}, not a disk; '
+                      f'skipping disk (pass --disk-root DIR on a real disk)', file=sys.stderr)
+                continue
+            roots[name] = disk_root
+    return roots
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--fs', nargs='+', choices=('tmpfs', 'disk'), default=['tmpfs', 'disk'])
+    parser.add_argument('--disk-root', default=tempfile.gettempdir(),
+                        help='directory on the real disk to benchmark in (default: the temp '
+                             'directory; skipped if it is on tmpfs)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--out', default='bench-results.json')
+    parser.add_argument('--trace', default='bench-trace.json')
+    args = parser.parse_args(argv)
+
+    recorder = Recorder()
+    roots = filesystems(args.fs, args.disk_root)
+    for size in args.sizes:
+        with recorder.phase('plan', entries=size):
+            plan = synthetic_plan(size)
+        for fs, root in roots.items():
+            run_case(recorder, plan, root, fs, args.workers)
+            for record in recorder.phases[-6:]:
+                print(f"{fs:>5} {size:>7} {record['phase']:<18} {record['seconds'] * 1000:9.1f}ms "
+                      f"syscr={record['read_syscalls']:<7} syscw={record['write_syscalls']:<7}")
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'phases': recorder.phases,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    with open(args.trace, 'w') as f:
+        json.dump({'traceEvents': recorder.events, 'displayTimeUnit': 'ms'}, f)
+    print(f'📊 Results: {args.out}  Trace: {args.trace}')
+
+
+if __name__ == '__main__':
+    main()
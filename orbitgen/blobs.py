@@ -0,0 +1,122 @@
+"""Content-addressed blob store for deduplicating generated outputs.
+
+Each distinct rendered body is stored once under ``<root>/<ab>/<digest>``
+and every output with that body is materialized from it: as a reflink where
+the filesystem supports copy-on-write clones, otherwise as a hardlink, and as
+a plain copy when neither works (e.g. the store lives on another device).
+Generating hundreds of tenant trees side by side then costs one copy of each
+shared file instead of one per tree.
+
+Blobs are read-only. Hardlinked outputs share the blob's inode, so they must
+be replaced (as :func:`orbitgen.emit.write_atomic` does) rather than edited
+in place.
+"""
+import errno
+import os
+import shutil
+import threading
+
+LINK_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def reflink(src, dst):
+    """Clone ``src`` into a new file ``dst`` sharing its extents"""
+    import fcntl
+
+    with open(src, 'rb') as fsrc:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, fsrc.fileno())
+        except OSError:
+            os.close(fd)
+            os.unlink(dst)
+            raise
+        os.close(fd)
+
+
+class BlobStore:
+    """Blobs keyed by the same digest the hash index uses"""
+
+    def __init__(self, root, mode='auto'):
+        if mode not in LINK_MODES:
+            raise ValueError(f'unknown link mode {mode!r}; expected one of {LINK_MODES}')
+        self.root = root
+        self.mode = mode
+        self._lock = threading.Lock()
+        # Methods that failed once are not retried for the rest of the run
+        self._unsupported = set()
+        self.stats = {'blobs_written': 0, 'reflink': 0, 'hardlink': 0, 'copy': 0}
+        os.makedirs(root, exist_ok=True)
+
+    def blob_path(self, value):
+        return os.path.join(self.root, value[:2], value)
+
+    def put(self, value, data):
+        """Store ``data`` under its digest unless it is already present"""
+        path = self.blob_path(value)
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats['blobs_written'] += 1
+        return path
+
+    def _methods(self):
+        if self.mode == 'auto':
+            return [m for m in ('reflink', 'hardlink', 'copy') if m not in self._unsupported]
+        return [self.mode]
+
+    def materialize(self, value, data, path):
+        """Atomically place the blob for ``value`` at ``path``"""
+        blob = self.put(value, data)
+        tmp = f'{path}.orbit-tmp'
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        for method in self._methods():
+            try:
+                if method == 'reflink':
+                    reflink(blob, tmp)
+                    os.chmod(tmp, 0o644)
+                elif method == 'hardlink':
+                    os.link(blob, tmp)
+                else:
+                    shutil.copyfile(blob, tmp)
+            except OSError as exc:
+                if self.mode != 'auto' or exc.errno not in (
+                        errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY,
+                        errno.EINVAL, errno.EMLINK):
+                    raise
+                with self._lock:
+                    self._unsupported.add(method)
+                continue
+            os.replace(tmp, path)
+            with self._lock:
+                self.stats[method] += 1
+            return method
+        raise OSError(f'could not materialize {path} from the blob store')
+
+    def prune(self):
+        """Remove blobs no hardlinked output refers to any more
+
+        Reflinked and copied outputs never pin a blob; they are simply
+        stored again the next time they are emitted.
+        """
+        removed = 0
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if os.stat(path).st_nlink == 1 and not name.endswith('.tmp'):
+                    os.unlink(path)
+                    removed += 1
+        return removed
@@ -0,0 +1,171 @@
+"""Content-hash incremental emission of generator entries.
+
+Every generator script hands its ``path -> content`` dict to :func:`emit`.
+Entries are rendered to bytes and hashed; files whose digest matches the hash
+index persisted in the target tree are skipped, so re-running the generators
+on an unchanged tree performs no writes and leaves mtimes (and the Next.js,
+Jest and Firebase caches keyed on them) untouched.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from orbitgen.templates import render_text, resolve
+
+INDEX_NAME = '.orbit-emit-index.json'
+
+
+def template_source(content):
+    """Template text of a dict entry and whether its values need JSON escaping"""
+    if isinstance(content, (dict, list)):
+        return json.dumps(content, indent=2), True
+    return content, False
+
+
+def render(content, params=None):
+    """Render a dict entry to the bytes that end up on disk
+
+    ``params`` are resolved template parameters (see
+    :func:`orbitgen.templates.resolve`); the declared defaults otherwise.
+    """
+    if isinstance(content, bytes):
+        return content
+    if params is None:
+        params = resolve()
+    text, json_escape = template_source(content)
+    return render_text(text, params, json_escape).encode('utf-8')
+
+
+def digest(data):
+    """BLAKE2b digest used for every content comparison"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def file_digest(path, chunk_size=1 << 16):
+    """Digest a file on disk without reading it into memory at once"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_atomic(path, data):
+    """Write ``data`` to ``path`` through a temp file and an atomic rename"""
+    tmp = f'{path}.orbit-tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HashIndex:
+    """Persisted ``relpath -> {digest, size, mtime_ns}`` index of a target tree"""
+
+    def __init__(self, target='.'):
+        self.target = target
+        self.path = os.path.join(target, INDEX_NAME)
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, relpath, expected, size):
+        """True when the file on disk already holds content with ``expected`` digest"""
+        try:
+            st = os.stat(os.path.join(self.target, relpath))
+        except FileNotFoundError:
+            return False
+        if st.st_size != size:
+            return False
+        record = self.entries.get(relpath)
+        if (record is not None and record['digest'] == expected
+                and st.st_size == record['size']
+                and st.st_mtime_ns == record['mtime_ns']):
+            return True
+        # Unindexed, or touched outside the generator: fall back to hashing it
+        if file_digest(os.path.join(self.target, relpath)) != expected:
+            return False
+        self.record(relpath, expected, st)
+        return True
+
+    def record(self, relpath, value, st=None):
+        if st is None:
+            st = os.stat(os.path.join(self.target, relpath))
+        with self._lock:
+            self.entries[relpath] = {
+                'digest': value,
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+            }
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = json.dumps({'version': 1, 'entries': self.entries},
+                          indent=2, sort_keys=True).encode('utf-8')
+        write_atomic(self.path, data)
+        self.dirty = False
+
+
+class EmitResult:
+    """Paths written and skipped by a single :func:`emit` call"""
+
+    def __init__(self):
+        self.written = []
+        self.skipped = []
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_written / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (f'EmitResult(written={len(self.written)}, '
+                f'skipped={len(self.skipped)}, bytes={self.bytes_written})')
+
+
+def emit_one(relpath, content, target, index, make_parents=True, store=None, params=None):
+    """Emit a single entry; returns the bytes written, or None when skipped
+
+    With a :class:`orbitgen.blobs.BlobStore` the file is materialized from
+    the store (reflink/hardlink) instead of being written out again.
+    """
+    data = render(content, params)
+    value = digest(data)
+    if index.is_current(relpath, value, len(data)):
+        return None
+    path = os.path.join(target, relpath)
+    parent = os.path.dirname(path)
+    if make_parents and parent:
+        os.makedirs(parent, exist_ok=True)
+    if store is not None:
+        store.materialize(value, data, path)
+    else:
+        write_atomic(path, data)
+    index.record(relpath, value)
+    return len(data)
+
+
+def emit(entries, target='.', index=None, store=None, params=None):
+    """Write the changed entries of a generator dict into ``target``"""
+    own_index = index is None
+    if own_index:
+        index = HashIndex(target)
+    result = EmitResult()
+    for relpath, content in entries.items():
+        size = emit_one(relpath, content, target, index, store=store, params=params)
+        if size is None:
+            result.skipped.append(relpath)
+        else:
+            result.written.append(relpath)
+            result.bytes_written += size
+    if own_index:
+        index.save()
+    return result
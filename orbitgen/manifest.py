@@ -0,0 +1,101 @@
+"""Parallel ``os.scandir`` walker producing a hashed file manifest.
+
+Subdirectories are fanned out to a thread pool as they are discovered. Each
+file gets its size, mtime, inode and BLAKE2b digest. The records of the last
+scan are kept in a cache file next to the manifest; when a file's (inode,
+size, mtime) are unchanged its digest is reused, so re-manifesting a large,
+mostly unchanged tree costs only a stat sweep. Only size and digest are
+published in the manifest itself.
+"""
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from orbitgen.emit import file_digest, write_atomic
+
+DEFAULT_WORKERS = 8
+CACHE_NAME = '.orbit-manifest-cache.json'
+# What a manifest publishes per file; the rest of a record is machine-local
+PUBLISHED_FIELDS = ('size', 'blake2b')
+
+
+def skipped(name, is_dir):
+    """Skip rules shared with the original os.walk-based listing"""
+    if name.startswith('.'):
+        return True
+    if is_dir:
+        return name == 'node_modules'
+    return name.endswith('.pyc')
+
+
+def load_previous(cache_path):
+    """``relpath -> record`` from an earlier scan cache, or {} if there is none"""
+    try:
+        with open(cache_path) as f:
+            return json.load(f).get('file_details', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_cache(cache_path, file_details):
+    """Keep ``file_details`` for the next :func:`scan`; an unchanged cache is not rewritten"""
+    data = json.dumps({'version': 1, 'file_details': file_details},
+                      indent=2, sort_keys=True).encode('utf-8')
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    write_atomic(cache_path, data)
+
+
+def published(file_details):
+    """``file_details`` without the inode and mtime that only the cache needs"""
+    return {relpath: {k: record[k] for k in PUBLISHED_FIELDS if k in record}
+            for relpath, record in file_details.items()}
+
+
+def _scan_dir(root, reldir, previous, hash_files):
+    files = {}
+    subdirs = []
+    with os.scandir(os.path.join(root, reldir) if reldir else root) as it:
+        for entry in it:
+            relpath = f'{reldir}/{entry.name}' if reldir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not skipped(entry.name, True):
+                    subdirs.append(relpath)
+                continue
+            if skipped(entry.name, False) or not entry.is_file():
+                continue
+            st = entry.stat()
+            record = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'inode': st.st_ino,
+            }
+            if hash_files:
+                old = previous.get(relpath)
+                if old is not None and all(old.get(k) == record[k] for k in record):
+                    record['blake2b'] = old['blake2b']
+                else:
+                    record['blake2b'] = file_digest(entry.path)
+            files[relpath] = record
+    return files, subdirs
+
+
+def scan(root='.', previous=None, hash_files=True, workers=DEFAULT_WORKERS):
+    """Walk ``root`` and return ``relpath -> {size, mtime_ns, inode, blake2b}``"""
+    previous = previous or {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir, root, '', previous, hash_files)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                results.update(files)
+                pending.update(
+                    pool.submit(_scan_dir, root, sub, previous, hash_files)
+                    for sub in subdirs)
+    return dict(sorted(results.items()))
@@ -0,0 +1,117 @@
+"""Content pack: every generator entry as a lazily read resource.
+
+The scripts stay the source of truth, but importing them executes every
+literal. The pack is built from them once: template sources are concatenated
+into one resource file and a small JSON index maps each path to its slice.
+Readers memory-map the resource and decode only the slices they ask for, so
+generating ``functions/**`` never touches the pages holding UI components.
+
+The pack is rebuilt whenever a script's size or mtime differs from the ones
+recorded in its index.
+"""
+import json
+import mmap
+import os
+
+from orbitgen.templates import CACHE_DIR
+
+PACK_VERSION = 1
+DATA_NAME = f'content-v{PACK_VERSION}.pack'
+INDEX_NAME = f'content-v{PACK_VERSION}.json'
+
+
+def _script_stats(scripts_dir, names):
+    stats = {}
+    for name in names:
+        st = os.stat(os.path.join(scripts_dir, f'{name}.py'))
+        stats[name] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def build(scripts_dir, cache_dir=CACHE_DIR):
+    """Import every script once and write the pack into ``cache_dir``"""
+    from orbitgen.emit import template_source
+    from orbitgen.plan import GENERATORS, Plan
+
+    names = [name for name, _ in GENERATORS]
+    stats = _script_stats(scripts_dir, names)
+    plan = Plan.collect(scripts_dir)
+    entries = {}
+    chunks = []
+    offset = 0
+    for relpath, content in plan.entries.items():
+        text, json_escape = template_source(content)
+        data = text.encode('utf-8')
+        entries[relpath] = [offset, len(data), json_escape]
+        chunks.append(data)
+        offset += len(data)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    pid = os.getpid()
+    data_path = os.path.join(cache_dir, DATA_NAME)
+    index_path = os.path.join(cache_dir, INDEX_NAME)
+    with open(f'{data_path}.{pid}.tmp', 'wb') as f:
+        f.write(b''.join(chunks))
+    with open(f'{index_path}.{pid}.tmp', 'w') as f:
+        json.dump({
+            'version': PACK_VERSION,
+            'scripts_dir': os.path.abspath(scripts_dir),
+            'scripts': stats,
+            'directories': sorted(plan.directories),
+            'entries': entries,
+        }, f)
+    # Data first: an index never points into a pack it was not built with
+    os.replace(f'{data_path}.{pid}.tmp', data_path)
+    os.replace(f'{index_path}.{pid}.tmp', index_path)
+
+
+class ContentPack:
+    """Read-only view over a built pack; slices are decoded on demand"""
+
+    def __init__(self, scripts_dir, cache_dir=CACHE_DIR):
+        self.data_path = os.path.join(cache_dir, DATA_NAME)
+        index_path = os.path.join(cache_dir, INDEX_NAME)
+        index = self._load_index(index_path)
+        if not self._current(index, scripts_dir):
+            build(scripts_dir, cache_dir)
+            index = self._load_index(index_path)
+        self.entries = index['entries']
+        self.directories = index['directories']
+        self._map = None
+
+    @staticmethod
+    def _load_index(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _current(index, scripts_dir):
+        if not index or index.get('version') != PACK_VERSION:
+            return False
+        if index.get('scripts_dir') != os.path.abspath(scripts_dir):
+            return False
+        try:
+            return _script_stats(scripts_dir, index['scripts']) == index['scripts']
+        except OSError:
+            return False
+
+    def _mapped(self):
+        if self._map is None:
+            with open(self.data_path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                    if os.fstat(f.fileno()).st_size else b''
+        return self._map
+
+    def source(self, relpath):
+        """Template source of ``relpath`` and whether it needs JSON escaping"""
+        offset, length, json_escape = self.entries[relpath]
+        data = self._mapped()[offset:offset + length]
+        return data.decode('utf-8'), json_escape
+
+    def close(self):
+        if self._map is not None and not isinstance(self._map, bytes):
+            self._map.close()
+        self._map = None
@@ -0,0 +1,186 @@
+"""Single emission plan across all seven generator dicts.
+
+The generator scripts only define their dicts when imported; this module
+collects every ``(path, content)`` pair from them, creates the directory set
+once and writes the files through a bounded thread pool. On network-mounted
+build volumes per-file latency dominates, so overlapping the writes is what
+brings the wall time down.
+
+    python -m orbitgen.plan [target] [--workers N] [--store DIR [--link MODE]]
+                            [--param NAME=VALUE ...]
+    python -m orbitgen.plan --archive out.zip|out.tar.gz|- [--format zip|tar.gz]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from orbitgen.blobs import LINK_MODES, BlobStore
+from orbitgen.emit import EmitResult, HashIndex, emit_one
+from orbitgen.templates import resolve
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (script module, dict attribute) in the order the scripts are meant to run
+GENERATORS = [
+    ('script', 'project_structure'),
+    ('script_1', 'functions_code'),
+    ('script_2', 'nextjs_structure'),
+    ('script_3', 'module_components'),
+    ('script_4', 'remaining_components'),
+    ('script_5', 'final_files'),
+    ('script_6', 'summary_files'),
+]
+
+# Module-level lists of directories some scripts create even when empty
+DIRECTORY_LISTS = ('directories', 'additional_dirs')
+
+DEFAULT_WORKERS = 8
+
+
+def load_script(name, scripts_dir=SCRIPTS_DIR):
+    """Import a generator script by file path without running its write step"""
+    path = os.path.join(scripts_dir, f'{name}.py')
+    spec = importlib.util.spec_from_file_location(f'orbitgen_scripts.{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Plan:
+    """Every entry and directory the generators produce, keyed by relative path"""
+
+    def __init__(self):
+        self.entries = {}
+        self.directories = set()
+        # Each script's own entries by script name, as collected
+        self.scripts = {}
+
+    def add(self, entries, directories=()):
+        self.entries.update(entries)
+        self.directories.update(d for d in directories if d)
+        self.directories.update(
+            d for d in (os.path.dirname(p) for p in entries) if d)
+
+    @classmethod
+    def collect(cls, scripts_dir=SCRIPTS_DIR):
+        plan = cls()
+        for name, attr in GENERATORS:
+            module = load_script(name, scripts_dir)
+            directories = []
+            for list_name in DIRECTORY_LISTS:
+                directories.extend(getattr(module, list_name, ()))
+            plan.scripts[name] = getattr(module, attr)
+            plan.add(plan.scripts[name], directories)
+        return plan
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def run(plan, target='.', workers=DEFAULT_WORKERS, store=None, params=None):
+    """Write ``plan`` into ``target``; unchanged files are skipped"""
+    start = time.perf_counter()
+    index = HashIndex(target)
+    for directory in sorted(plan.directories):
+        os.makedirs(os.path.join(target, directory), exist_ok=True)
+
+    def write(item):
+        relpath, content = item
+        return emit_one(relpath, content, target, index, make_parents=False,
+                        store=store, params=params)
+
+    result = EmitResult()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for relpath, size in zip(plan.entries, pool.map(write, plan.entries.items())):
+            if size is None:
+                result.skipped.append(relpath)
+            else:
+                result.written.append(relpath)
+                result.bytes_written += size
+    index.save()
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def report(result):
+    return (f'{len(result.written) + len(result.skipped)} files '
+            f'({len(result.written)} written, {len(result.skipped)} unchanged) '
+            f'in {result.seconds:.3f}s, '
+            f'{result.bytes_per_second / 1e6:.2f} MB/s')
+
+
+def generate_all(target='.', workers=DEFAULT_WORKERS, scripts_dir=SCRIPTS_DIR, store=None,
+                 params=None):
+    """Emit all seven dicts in one pass, then refresh the project manifest"""
+    plan = Plan.collect(scripts_dir)
+    result = run(plan, target, workers, store, params)
+    load_script('script_6', scripts_dir).write_manifest(target, store)
+    return result
+
+
+def parse_overrides(parser, items):
+    """Validated ``NAME=VALUE`` command-line items as a parameter dict"""
+    overrides = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f'--param expects NAME=VALUE, got {item!r}')
+        overrides[name] = value
+    try:
+        resolve(overrides)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return overrides
+
+
+def parse_params(parser, items):
+    """Resolve ``NAME=VALUE`` command-line items into template parameters"""
+    return resolve(parse_overrides(parser, items))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('target', nargs='?', default='.')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a declared template parameter (repeatable)')
+    parser.add_argument('--store', metavar='DIR',
+                        help='content-addressed blob store to link outputs from')
+    parser.add_argument('--link', choices=LINK_MODES, default='auto',
+                        help='how outputs are materialized from --store (default: auto)')
+    parser.add_argument('--archive', metavar='PATH',
+                        help="stream into a zip/tar.gz instead of writing files ('-' for stdout)")
+    parser.add_argument('--format', choices=('zip', 'tar.gz'),
+                        help='archive format (default: from the --archive extension)')
+    args = parser.parse_args(argv)
+    params = parse_params(parser, args.param)
+
+    if args.archive:
+        from orbitgen.archive import guess_format, write_archive
+
+        start = time.perf_counter()
+        fmt = args.format or ('zip' if args.archive == '-' else guess_format(args.archive))
+        plan = Plan.collect()
+        if args.archive == '-':
+            count = write_archive(plan, sys.stdout.buffer, fmt, params=params)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.archive, 'wb') as f:
+                count = write_archive(plan, f, fmt, params=params)
+        print(f'✅ Archived {count} files into {args.archive} ({fmt}) '
+              f'in {time.perf_counter() - start:.3f}s', file=sys.stderr)
+        return
+
+    os.makedirs(args.target, exist_ok=True)
+    store = BlobStore(args.store, args.link) if args.store else None
+    result = generate_all(args.target, args.workers, store=store, params=params)
+    print(f'✅ Emitted {report(result)}')
+    if store is not None:
+        print('🔗 Store: ' + ', '.join(f'{k}={v}' for k, v in store.stats.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Batch generation of one ORBIT AI tree per tenant across a process pool.
+
+Tenant trees differ only in their template parameters (Firebase project
+config, model names, ...). The plan is compiled once in the parent: entries
+without placeholders are rendered to bytes once and shared verbatim, and only
+the compiled templates of the remaining entries are rendered per tenant inside
+the workers.
+
+    python -m orbitgen.tenants tenants.json --out build/tenants [--processes N]
+
+The tenants file is a JSON list (or ``{"tenants": [...]}``) of objects with a
+``name`` and any of the parameters declared in
+:data:`orbitgen.templates.PARAMETERS`.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from orbitgen.blobs import LINK_MODES, BlobStore
+from orbitgen.emit import EmitResult, HashIndex, emit_one, template_source
+from orbitgen.plan import SCRIPTS_DIR, Plan, load_script
+from orbitgen.templates import PARAMETERS, default_cache, render_template, resolve
+
+TENANT_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+
+def load_tenants(path):
+    with open(path) as f:
+        data = json.load(f)
+    tenants = data['tenants'] if isinstance(data, dict) else data
+    seen = set()
+    for tenant in tenants:
+        name = tenant.get('name', '')
+        if not TENANT_NAME.match(name):
+            raise ValueError(f'invalid tenant name {name!r}')
+        if name in seen:
+            raise ValueError(f'duplicate tenant name {name!r}')
+        seen.add(name)
+        unknown = set(tenant) - set(PARAMETERS) - {'name'}
+        if unknown:
+            raise ValueError(f'tenant {name!r}: unknown fields {sorted(unknown)}')
+    return tenants
+
+
+def tenant_values(tenant):
+    return resolve({k: v for k, v in tenant.items() if k != 'name'})
+
+
+class SharedRender:
+    """The plan compiled once, split into shared bytes and per-tenant templates"""
+
+    def __init__(self, plan):
+        cache = default_cache()
+        self.files = {}
+        self.templates = {}
+        for relpath, content in plan.entries.items():
+            text, json_escape = template_source(content)
+            template = cache.get(text)
+            if template.names:
+                self.templates[relpath] = (template, json_escape)
+            else:
+                self.files[relpath] = text.encode('utf-8')
+        self.directories = sorted(plan.directories)
+
+    def substitute(self, values):
+        """Tenant-specific entries rendered with ``values``"""
+        return {relpath: render_template(template, values, json_escape).encode('utf-8')
+                for relpath, (template, json_escape) in self.templates.items()}
+
+
+_worker = {}
+
+
+def _init_worker(shared, store_root, link_mode, scripts_dir):
+    _worker['shared'] = shared
+    _worker['store'] = BlobStore(store_root, link_mode) if store_root else None
+    _worker['script_6'] = load_script('script_6', scripts_dir)
+
+
+def _generate_tenant(tenant, out_root):
+    shared = _worker['shared']
+    store = _worker['store']
+    target = os.path.join(out_root, tenant['name'])
+    files = dict(shared.files)
+    files.update(shared.substitute(tenant_values(tenant)))
+
+    start = time.perf_counter()
+    index = HashIndex(target)
+    for directory in shared.directories:
+        os.makedirs(os.path.join(target, directory), exist_ok=True)
+    result = EmitResult()
+    for relpath, data in files.items():
+        size = emit_one(relpath, data, target, index, make_parents=False, store=store)
+        if size is None:
+            result.skipped.append(relpath)
+        else:
+            result.written.append(relpath)
+            result.bytes_written += size
+    index.save()
+    _worker['script_6'].write_manifest(target, store)
+    result.seconds = time.perf_counter() - start
+    return tenant['name'], result
+
+
+def generate_tenants(tenants, out_root, processes=None, store_root=None,
+                     link_mode='auto', scripts_dir=SCRIPTS_DIR):
+    """Render one tree per tenant under ``out_root``; returns (results, seconds)"""
+    start = time.perf_counter()
+    shared = SharedRender(Plan.collect(scripts_dir))
+    os.makedirs(out_root, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(shared, store_root, link_mode, scripts_dir)) as pool:
+        futures = [pool.submit(_generate_tenant, tenant, out_root) for tenant in tenants]
+        for future in futures:
+            name, result = future.result()
+            results[name] = result
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tenants', help='JSON file listing the tenants')
+    parser.add_argument('--out', default='tenants', help='directory receiving one tree per tenant')
+    parser.add_argument('--processes', '-p', type=int, default=None)
+    parser.add_argument('--store', metavar='DIR',
+                        help='blob store shared by all tenant trees')
+    parser.add_argument('--link', choices=LINK_MODES, default='auto')
+    args = parser.parse_args(argv)
+
+    tenants = load_tenants(args.tenants)
+    if not tenants:
+        print('No tenants to generate', file=sys.stderr)
+        return
+    results, seconds = generate_tenants(tenants, args.out, args.processes,
+                                        args.store, args.link)
+    written = sum(len(r.written) for r in results.values())
+    skipped = sum(len(r.skipped) for r in results.values())
+    print(f'✅ Generated {len(results)} tenant trees in {seconds:.2f}s '
+          f'({len(results) / seconds * 60:.0f} trees/minute; '
+          f'{written} files written, {skipped} unchanged)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Watch the generator scripts and re-emit only the entries that changed.
+
+On Linux the scripts directory is watched through inotify; elsewhere the
+scripts are polled by mtime. When a script is saved only that script is
+re-imported, its entries are rendered and diffed against the previous render,
+and just the changed output files are rewritten, so a dev server watching the
+target tree hot-reloads immediately.
+
+    python -m orbitgen.watch [target] [--param NAME=VALUE ...]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from orbitgen.emit import HashIndex, digest, emit_one, render
+from orbitgen.plan import GENERATORS, SCRIPTS_DIR, Plan, load_script, parse_params, run
+
+# linux/inotify.h
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+EVENT_HEADER = struct.Struct('iIII')
+
+# Editors tend to save in bursts (truncate, write, rename); collect them first
+DEBOUNCE_SECONDS = 0.02
+POLL_SECONDS = 0.1
+
+
+class InotifyWatcher:
+    """Yields batches of changed file names in one directory"""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+
+    def _read(self, names):
+        buf = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(buf):
+            _, _, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+
+    def __iter__(self):
+        while True:
+            names = set()
+            select.select([self.fd], [], [])
+            self._read(names)
+            while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+                self._read(names)
+            yield names
+
+
+class PollingWatcher:
+    """mtime-polling stand-in where inotify is unavailable"""
+
+    def __init__(self, directory, names):
+        self.paths = {name: os.path.join(directory, name) for name in names}
+        self.mtimes = {name: self._mtime(path) for name, path in self.paths.items()}
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __iter__(self):
+        while True:
+            time.sleep(POLL_SECONDS)
+            changed = set()
+            for name, path in self.paths.items():
+                mtime = self._mtime(path)
+                if mtime != self.mtimes[name]:
+                    self.mtimes[name] = mtime
+                    changed.add(name)
+            if changed:
+                yield changed
+
+
+class Watcher:
+    """Keeps the last render of every script and re-emits per-script diffs"""
+
+    def __init__(self, target='.', params=None, scripts_dir=SCRIPTS_DIR):
+        self.target = target
+        self.params = params
+        self.scripts_dir = scripts_dir
+        self.attrs = dict(GENERATORS)
+        self.rendered = {}
+
+    def initial(self):
+        """Full incremental emission; remembers each script's digests
+
+        Entries are rendered once here and emitted as bytes, so the digests
+        kept for :meth:`refresh` are those of what was written.
+        """
+        plan = Plan.collect(self.scripts_dir)
+        data = {}
+        for name, entries in plan.scripts.items():
+            rendered = {relpath: render(content, self.params) for relpath, content in entries.items()}
+            self.rendered[name] = {relpath: digest(value) for relpath, value in rendered.items()}
+            data.update(rendered)
+        plan.entries = {relpath: data[relpath] for relpath in plan.entries}
+        result = run(plan, self.target)
+        load_script('script_6', self.scripts_dir).write_manifest(self.target)
+        return result
+
+    def refresh(self, name):
+        """Re-import ``name`` and write only its changed entries"""
+        entries = getattr(load_script(name, self.scripts_dir), self.attrs[name])
+        previous = self.rendered.get(name, {})
+        index = HashIndex(self.target)
+        changed = []
+        current = {}
+        for relpath, content in entries.items():
+            data = render(content, self.params)
+            current[relpath] = value = digest(data)
+            if previous.get(relpath) == value:
+                continue
+            if emit_one(relpath, data, self.target, index) is not None:
+                changed.append(relpath)
+        index.save()
+        self.rendered[name] = current
+        added = set(current) - set(previous)
+        removed = sorted(set(previous) - set(current))
+        if added or removed:
+            load_script('script_6', self.scripts_dir).write_manifest(self.target)
+        return changed, removed
+
+
+def watcher_for(directory, names):
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory, names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('target', nargs='?', default='.')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a declared template parameter (repeatable)')
+    args = parser.parse_args(argv)
+    params = parse_params(parser, args.param)
+
+    os.makedirs(args.target, exist_ok=True)
+    watcher = Watcher(args.target, params)
+    result = watcher.initial()
+    print(f'👀 Watching {SCRIPTS_DIR} ({len(result.written)} files written on start)')
+
+    scripts = {f'{name}.py': name for name, _ in GENERATORS}
+    try:
+        for names in watcher_for(SCRIPTS_DIR, scripts):
+            for filename in sorted(names & set(scripts)):
+                start = time.perf_counter()
+                try:
+                    changed, removed = watcher.refresh(scripts[filename])
+                except Exception as exc:  # keep watching through syntax errors
+                    print(f'❌ {filename}: {exc!r}', file=sys.stderr)
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f'🔄 {filename}: {len(changed)} file(s) rewritten in {elapsed:.1f}ms'
+                      + ''.join(f'\n   {relpath}' for relpath in changed))
+                for relpath in removed:
+                    print(f'   {relpath} is no longer generated (left in place)')
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
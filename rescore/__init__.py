@@ -0,0 +1 @@
+"""Bulk re-scoring of stored voice-session analyses"""
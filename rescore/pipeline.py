@@ -0,0 +1,116 @@
+"""Stream sessions through a process pool of scorers and commit what changed.
+
+The parent reads pages from the store and groups them into batches. Each
+batch is scored in a worker process, one NumPy pass per batch when NumPy is
+installed. Analyses that differ from the stored ones are written back in
+commits of ``commit_size`` on a few writer threads, so reading, scoring and
+writing overlap. In-flight batches and commits are bounded, which keeps
+memory flat however many sessions there are.
+"""
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from rescore import scoring
+
+PROGRESS_SECONDS = 5
+
+
+@dataclass
+class RescoreResult:
+    sessions: int = 0
+    changed: int = 0
+    written: int = 0
+    commits: int = 0
+    seconds: float = 0.0
+    backend: str = 'numpy' if scoring.HAVE_NUMPY else 'python'
+    processes: int = 0
+    rates: list = field(default_factory=list)
+
+    @property
+    def sessions_per_second(self):
+        return self.sessions / self.seconds if self.seconds else 0.0
+
+
+_worker = {}
+
+
+def _init_worker(thresholds, fillers):
+    _worker['thresholds'] = thresholds
+    _worker['matcher'] = scoring.FillerMatcher(fillers)
+
+
+def _score(transcripts, durations):
+    return scoring.score(transcripts, durations, _worker['thresholds'], _worker['matcher'])
+
+
+def batches(pages, batch_size):
+    batch = []
+    for page in pages:
+        batch.extend(page)
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def rescore(store, thresholds=scoring.DEFAULT_THRESHOLDS, fillers=scoring.FILLER_WORDS,
+            processes=None, batch_size=2000, page_size=1000, commit_size=500, dry_run=False,
+            progress=True):
+    """Re-score every session in ``store``; returns a RescoreResult"""
+    processes = processes or os.cpu_count() or 1
+    result = RescoreResult(processes=processes)
+    start = last_report = time.perf_counter()
+    scoring_queue = deque()
+    commit_queue = deque()
+    updates = []
+
+    def commit(pending):
+        result.written += len(pending)
+        result.commits += 1
+        commit_queue.append(writers.submit(store.commit, pending))
+        while len(commit_queue) > store.writer_threads * 2:
+            commit_queue.popleft().result()
+
+    def collect():
+        nonlocal last_report
+        future, batch = scoring_queue.popleft()
+        for session, analysis in zip(batch, future.result()):
+            if analysis != session.analysis:
+                result.changed += 1
+                if not dry_run:
+                    updates.append((session, analysis))
+        result.sessions += len(batch)
+        while len(updates) >= commit_size:
+            commit(updates[:commit_size])
+            del updates[:commit_size]
+        now = time.perf_counter()
+        if progress and now - last_report >= PROGRESS_SECONDS:
+            rate = result.sessions / (now - start)
+            result.rates.append(rate)
+            print(f'  {result.sessions:,} sessions, {rate:,.0f}/s', file=sys.stderr)
+            last_report = now
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(thresholds, tuple(fillers))) as pool, \
+            ThreadPoolExecutor(max_workers=store.writer_threads) as writers:
+        for batch in batches(store.pages(page_size), batch_size):
+            transcripts = [session.transcript for session in batch]
+            durations = [session.duration for session in batch]
+            scoring_queue.append((pool.submit(_score, transcripts, durations), batch))
+            # Two batches per worker keep every process busy without reading ahead further
+            while len(scoring_queue) >= processes * 2:
+                collect()
+        while scoring_queue:
+            collect()
+        if updates:
+            commit(list(updates))
+        while commit_queue:
+            commit_queue.popleft().result()
+
+    result.seconds = time.perf_counter() - start
+    return result
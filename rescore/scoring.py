@@ -0,0 +1,255 @@
+"""Speech metrics of ``analyzeTranscript``, computed for many sessions at once.
+
+The results match ``summarize(scanTranscript(transcript), duration)`` in
+``functions/speech/`` for the same filler list and thresholds: the same
+tokens (lower-cased words and runs of sentence-ending punctuation), the same
+longest-match filler counting and JavaScript's ``Math.round``.
+
+With NumPy, a batch of sessions is scored as one array: the batch is
+tokenized in one pass over its code points, every token becomes an integer id
+(0 for words that cannot be part of a filler, negative for sentence ends),
+filler matches are found by comparing shifted id arrays, and the per-session
+counts, WPM, percentages and feedback are reduced with ``bincount`` and
+``select``. Without NumPy the same numbers are computed session by session.
+"""
+import math
+import re
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Keep in sync with FILLER_WORDS in functions/speech/fillers.js
+FILLER_WORDS = ('um', 'uh', 'like', 'you know', 'so', 'actually')
+
+# Python's [^\W_] is the letters-and-digits class of the JS \p{L}\p{N} pattern
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*|[.!?]+")
+
+SENTENCE_BREAK = -1
+
+Thresholds = namedtuple('Thresholds', 'slow_wpm fast_wpm max_filler_percentage')
+DEFAULT_THRESHOLDS = Thresholds(100, 180, 5)
+
+PACE_FEEDBACK = (
+    'Try speaking a bit faster - aim for 120-150 WPM',
+    'Slow down slightly for better clarity',
+    'Good speaking pace!',
+)
+FILLER_FEEDBACK = (
+    'Try to reduce filler words - practice pausing instead',
+    'Great job minimizing filler words!',
+)
+
+
+def js_round(value):
+    """``Math.round``: halves round up, not to even"""
+    return math.floor(value + 0.5)
+
+
+class FillerMatcher:
+    """Fillers as tuples of word ids, plus what the vectorized path needs"""
+
+    def __init__(self, phrases=FILLER_WORDS):
+        self.vocabulary = {}
+        self.phrases = []
+        for phrase in phrases:
+            words = phrase.lower().split()
+            self.phrases.append(tuple(self.vocabulary.setdefault(word, len(self.vocabulary) + 1)
+                                      for word in words))
+        self.phrases = sorted(set(self.phrases), key=len, reverse=True)
+        self.trie = {}
+        for ids in self.phrases:
+            node = self.trie
+            for word_id in ids:
+                node = node.setdefault(word_id, {})
+            node[None] = len(ids)
+        self.chain_free = not any(
+            a[k:] == b[:len(a) - k]
+            for a in self.phrases for b in self.phrases
+            for k in range(1, len(a)) if len(b) > len(a) - k)
+
+    def token_ids(self, text):
+        tokens = TOKEN_PATTERN.findall(str(text or '').lower())
+        vocabulary = self.vocabulary
+        return [SENTENCE_BREAK if token[0] in '.!?' else vocabulary.get(token, 0) for token in tokens]
+
+    def count(self, ids):
+        """(words, fillers, sentences) of one session's token ids, scanned in order"""
+        words = fillers = breaks = 0
+        matched_until = 0
+        for i, word_id in enumerate(ids):
+            if word_id == SENTENCE_BREAK:
+                breaks += 1
+                continue
+            words += 1
+            if i < matched_until or word_id not in self.trie:
+                continue
+            node, matched = self.trie, 0
+            for j in range(i, len(ids)):
+                node = node.get(ids[j])
+                if node is None:
+                    break
+                matched = node.get(None, matched)
+            if matched:
+                fillers += 1
+                matched_until = i + matched
+        return words, fillers, breaks + 1
+
+
+def feedback(wpm, fillers, words, thresholds):
+    if wpm < thresholds.slow_wpm:
+        pace = PACE_FEEDBACK[0]
+    elif wpm > thresholds.fast_wpm:
+        pace = PACE_FEEDBACK[1]
+    else:
+        pace = PACE_FEEDBACK[2]
+    too_many = words > 0 and fillers / words * 100 > thresholds.max_filler_percentage
+    return [pace, FILLER_FEEDBACK[0] if too_many else FILLER_FEEDBACK[1]]
+
+
+def analysis(words, fillers, sentences, duration, thresholds):
+    wpm = js_round(words / duration * 60) if duration > 0 else 0
+    return {
+        'wpm': wpm,
+        'fillerWords': fillers,
+        'fillerPercentage': js_round(fillers / words * 100) if words else 0,
+        'totalWords': words,
+        'avgWordsPerSentence': js_round(words / sentences),
+        'duration': duration,
+        'feedback': feedback(wpm, fillers, words, thresholds),
+    }
+
+
+def score_python(transcripts, durations, thresholds=DEFAULT_THRESHOLDS, matcher=None):
+    matcher = matcher or FillerMatcher()
+    return [analysis(*matcher.count(matcher.token_ids(text)), duration, thresholds)
+            for text, duration in zip(transcripts, durations)]
+
+
+# Character classes for the vectorized tokenizer
+OTHER, WORD, STOP, APOSTROPHE = 0, 1, 2, 3
+APOSTROPHES = ("'", '’')
+
+
+def _ascii_classes():
+    table = np.zeros(128, dtype=np.uint8)
+    for code in range(128):
+        if chr(code).isalnum():
+            table[code] = WORD
+    for char in '.!?':
+        table[ord(char)] = STOP
+    table[ord("'")] = APOSTROPHE
+    return table
+
+
+ASCII_CLASSES = _ascii_classes() if HAVE_NUMPY else None
+
+
+def tokenize_batch(transcripts, matcher):
+    """Tokens of all transcripts at once -> (token ids, owning session per token)
+
+    The lower-cased transcripts are joined into one code point array and each
+    character is classified (word, sentence end, apostrophe, other). Tokens are
+    the runs of word or sentence-end characters, with apostrophes inside words
+    joining them, as in TOKEN_PATTERN. Word tokens get their filler vocabulary
+    id by comparing characters at the token offsets.
+    """
+    texts = [str(text or '').lower() for text in transcripts]
+    text = '\n'.join(texts)
+    if text.isascii():
+        points = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        classes = ASCII_CLASSES[points]
+    else:
+        points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        classes = np.zeros(len(points), dtype=np.uint8)
+        ascii_chars = points < 128
+        classes[ascii_chars] = ASCII_CLASSES[points[ascii_chars]]
+        other, inverse = np.unique(points[~ascii_chars], return_inverse=True)
+        table = np.array([WORD if chr(code).isalnum() else APOSTROPHE if chr(code) in APOSTROPHES else OTHER
+                          for code in other.tolist()], dtype=np.uint8)
+        classes[~ascii_chars] = table[inverse.ravel()]
+
+    apostrophes = np.flatnonzero(classes == APOSTROPHE)
+    inner = apostrophes[(apostrophes > 0) & (apostrophes < len(classes) - 1)]
+    inner = inner[(classes[inner - 1] == WORD) & (classes[inner + 1] == WORD)]
+    classes[apostrophes] = OTHER
+    classes[inner] = WORD
+
+    before = np.concatenate(([OTHER], classes[:-1]))
+    after = np.concatenate((classes[1:], [OTHER]))
+    starts = np.flatnonzero((classes != OTHER) & (classes != before))
+    lengths = np.flatnonzero((classes != OTHER) & (classes != after)) + 1 - starts
+    offsets = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+    owner = np.searchsorted(offsets, starts, side='right') - 1
+
+    ids = np.where(classes[starts] == STOP, SENTENCE_BREAK, 0).astype(np.int32)
+    for word, word_id in matcher.vocabulary.items():
+        if points.dtype == np.uint8 and not word.isascii():
+            continue
+        candidates = np.flatnonzero((lengths == len(word)) & (ids == 0))
+        for index, char in enumerate(word):
+            candidates = candidates[points[starts[candidates] + index] == ord(char)]
+        ids[candidates] = word_id
+    return ids, owner
+
+
+def score_numpy(transcripts, durations, thresholds=DEFAULT_THRESHOLDS, matcher=None):
+    matcher = matcher or FillerMatcher()
+    sessions = len(transcripts)
+    ids, owner = tokenize_batch(transcripts, matcher)
+
+    words = np.bincount(owner[ids >= 0], minlength=sessions)
+    sentences = np.bincount(owner[ids == SENTENCE_BREAK], minlength=sessions) + 1
+
+    if matcher.chain_free:
+        # Longest phrases first: a match is counted unless a longer one starts
+        # at the same word or an earlier one still covers it
+        size = len(ids)
+        started = np.zeros(size, dtype=bool)
+        covered = np.zeros(size, dtype=bool)
+        counted = np.zeros(size, dtype=bool)
+        for phrase in matcher.phrases:
+            span = len(phrase)
+            match = np.zeros(size, dtype=bool)
+            if size >= span:
+                last = size - span + 1
+                hit = (ids[:last] == phrase[0]) & (owner[:last] == owner[span - 1:])
+                for offset in range(1, span):
+                    hit &= ids[offset:last + offset] == phrase[offset]
+                match[:last] = hit
+            counted |= match & ~started
+            started |= match
+            for offset in range(1, span):
+                covered[offset:] |= match[:size - offset]
+        fillers = np.bincount(owner[counted & ~covered], minlength=sessions)
+    else:
+        # Overlapping fillers need the sequential scan to pick matches
+        per_session = np.split(ids, np.searchsorted(owner, np.arange(1, sessions)))
+        fillers = np.fromiter((matcher.count(session.tolist())[1] for session in per_session),
+                              dtype=np.int64, count=sessions)
+
+    duration = np.asarray(durations, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wpm = np.where(duration > 0, np.floor(words / duration * 60 + 0.5), 0).astype(np.int64)
+        ratio = np.where(words > 0, fillers / words * 100, 0.0)
+    percentage = np.where(words > 0, np.floor(ratio + 0.5), 0).astype(np.int64)
+    average = np.floor(words / sentences + 0.5).astype(np.int64)
+    pace = np.select([wpm < thresholds.slow_wpm, wpm > thresholds.fast_wpm], [0, 1], 2)
+    filler_note = np.where((words > 0) & (ratio > thresholds.max_filler_percentage), 0, 1)
+
+    return [{
+        'wpm': int(wpm[i]),
+        'fillerWords': int(fillers[i]),
+        'fillerPercentage': int(percentage[i]),
+        'totalWords': int(words[i]),
+        'avgWordsPerSentence': int(average[i]),
+        'duration': durations[i],
+        'feedback': [PACE_FEEDBACK[pace[i]], FILLER_FEEDBACK[filler_note[i]]],
+    } for i in range(sessions)]
+
+
+score = score_numpy if HAVE_NUMPY else score_python
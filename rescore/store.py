@@ -0,0 +1,208 @@
+"""Where voice sessions are read from and re-scored analyses are written to.
+
+Every source yields ``Session`` records in pages. Sessions are read either
+through the Firestore REST API, which serves both the emulator and
+production, or from a JSON Lines export with one document per line. A line
+is either a REST document (``{"name": ..., "fields": {...}}``) or a plain
+object with an ``id``.
+"""
+import json
+import os
+import random
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+
+COLLECTION = 'voiceSessions'
+FIELDS = ('transcript', 'duration', 'analysis')
+MAX_COMMIT_WRITES = 500
+
+# key_field is the field the key came from: ``name`` for REST documents, ``id`` for plain objects
+Session = namedtuple('Session', 'key transcript duration analysis key_field', defaults=('name',))
+
+
+def decode_value(value):
+    """Firestore REST value -> Python value"""
+    kind, raw = next(iter(value.items()))
+    if kind == 'integerValue':
+        return int(raw)
+    if kind == 'mapValue':
+        return decode_fields(raw.get('fields', {}))
+    if kind == 'arrayValue':
+        return [decode_value(item) for item in raw.get('values', [])]
+    if kind == 'nullValue':
+        return None
+    return raw
+
+
+def decode_fields(fields):
+    return {name: decode_value(value) for name, value in fields.items()}
+
+
+def encode_value(value):
+    if value is None:
+        return {'nullValue': None}
+    if isinstance(value, bool):
+        return {'booleanValue': value}
+    if isinstance(value, int):
+        return {'integerValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, dict):
+        return {'mapValue': {'fields': {name: encode_value(item) for name, item in value.items()}}}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [encode_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def session_from(key, data, key_field='name'):
+    """A Session for a decoded document, or None if it has no transcript to score"""
+    transcript = data.get('transcript')
+    if not isinstance(transcript, str):
+        return None
+    duration = data.get('duration')
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)):
+        duration = 0
+    return Session(key, transcript, duration, data.get('analysis'), key_field)
+
+
+class FirestoreStore:
+    """voiceSessions through the REST API of the emulator or of production"""
+
+    writer_threads = 4
+
+    def __init__(self, project, emulator=None, token=None, database='(default)', timeout=60):
+        base = f'http://{emulator}/v1' if emulator else 'https://firestore.googleapis.com/v1'
+        self.root = f'{base}/projects/{project}/databases/{database}/documents'
+        # The emulator treats the "owner" token as an admin and skips security rules
+        self.token = token or ('owner' if emulator else None)
+        self.timeout = timeout
+
+    def request(self, url, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(url, data=data, method='POST' if data else 'GET')
+        request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as error:
+            raise RuntimeError(f'Firestore request failed ({error.code}): {error.read()[:500]!r}') from None
+
+    def pages(self, page_size=1000):
+        """Sessions, one page at a time, with only the fields that are scored"""
+        query = [('pageSize', page_size)] + [('mask.fieldPaths', field) for field in FIELDS]
+        token = None
+        while True:
+            params = query + ([('pageToken', token)] if token else [])
+            page = self.request(f'{self.root}/{COLLECTION}?{urllib.parse.urlencode(params)}')
+            sessions = (session_from(document['name'], decode_fields(document.get('fields', {})))
+                        for document in page.get('documents', []))
+            yield [session for session in sessions if session]
+            token = page.get('nextPageToken')
+            if not token:
+                return
+
+    def commit(self, updates):
+        """Write ``(session, analysis)`` pairs; existing documents only, other fields untouched"""
+        for start in range(0, len(updates), MAX_COMMIT_WRITES):
+            writes = [{
+                'update': {'name': session.key, 'fields': {'analysis': encode_value(analysis)}},
+                'updateMask': {'fieldPaths': ['analysis']},
+                'updateTransforms': [{'fieldPath': 'rescoredAt', 'setToServerValue': 'REQUEST_TIME'}],
+                'currentDocument': {'exists': True},
+            } for session, analysis in updates[start:start + MAX_COMMIT_WRITES]]
+            self.request(f'{self.root}:commit', {'writes': writes})
+
+    def close(self):
+        pass
+
+
+class JsonlStore:
+    """A JSON Lines export in, ``{"name" or "id", "analysis"}`` lines out, keyed like the input line"""
+
+    # One writer keeps output lines whole
+    writer_threads = 1
+
+    def __init__(self, path, output=None):
+        self.path = path
+        self.output = open(output, 'a') if output else None
+
+    def pages(self, page_size=1000):
+        page = []
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                document = json.loads(line)
+                if 'fields' in document:
+                    session = session_from(document['name'], decode_fields(document['fields']))
+                else:
+                    session = session_from(document.get('id'), document, 'id')
+                if session:
+                    page.append(session)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+    def commit(self, updates):
+        if self.output:
+            self.output.writelines(json.dumps({session.key_field: session.key, 'analysis': analysis}) + '\n'
+                                   for session, analysis in updates)
+            self.output.flush()
+
+    def close(self):
+        if self.output:
+            self.output.close()
+
+
+class SyntheticStore:
+    """``count`` generated sessions, for measuring throughput without a database.
+
+    A pool of distinct transcripts is generated once and cycled, so producing
+    sessions costs next to nothing next to scoring them.
+    """
+
+    WORDS = ('so', 'today', 'I', 'want', 'to', 'talk', 'about', 'my', 'project', 'and', 'how',
+             'we', 'built', 'it', 'the', 'main', 'goal', 'was', 'helping', 'students', 'learn')
+    FILLERS = ('um', 'uh', 'like', 'you know', 'actually')
+    POOL_SIZE = 1000
+    writer_threads = 1
+
+    def __init__(self, count, seed=0):
+        self.count = count
+        rng = random.Random(seed)
+        self.pool = []
+        for _ in range(min(count, self.POOL_SIZE)):
+            duration = rng.randint(30, 600)
+            words = [rng.choice(self.FILLERS) if rng.random() < 0.05 else rng.choice(self.WORDS)
+                     for _ in range(duration * rng.randint(100, 180) // 60)]
+            for i in range(rng.randrange(8), len(words), rng.randint(8, 20)):
+                words[i] += '.'
+            self.pool.append((' '.join(words), duration))
+
+    def pages(self, page_size=1000):
+        for start in range(0, self.count, page_size):
+            yield [Session(f'synthetic-{index}', *self.pool[index % len(self.pool)], None)
+                   for index in range(start, min(start + page_size, self.count))]
+
+    def commit(self, updates):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_store(args):
+    if args.synthetic:
+        return SyntheticStore(args.synthetic, args.seed)
+    if args.input:
+        return JsonlStore(args.input, args.output)
+    emulator = args.emulator or os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if not args.project:
+        raise SystemExit('--project is required to read from Firestore')
+    return FirestoreStore(args.project, emulator, args.token or os.environ.get('FIRESTORE_TOKEN'))
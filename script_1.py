@@ -10,7 +10,9 @@ functions_code = {
             "shell": "firebase functions:shell",
             "start": "npm run shell",
             "deploy": "firebase deploy --only functions",
-            "logs": "firebase functions:log"
+            "logs": "firebase functions:log",
+            "bench:cold-start": "node bench/coldStart.js",
+            "bench:fillers": "node bench/fillers.js"
         },
         "engines": {
             "node": "18"
@@ -33,41 +35,185 @@ functions_code = {
     },
     
     "functions/index.js": """const functions = require('firebase-functions');
-const admin = require('firebase-admin');
-const axios = require('axios');
 const cors = require('cors')({origin: true});
+const {BatchWriter} = require('./batchWriter');
+const {createInferenceClient} = require('./inference/httpClient');
+const {Histogram, LATENCY_BUCKETS_MS} = require('./inference/metrics');
+const {createMicroBatcher} = require('./inference/microBatcher');
+const {createResponseCache, cacheKey} = require('./inference/responseCache');
+const {CircuitBreaker, isModelLoading, isRetryable, retryDelayMs} = require('./inference/retryPolicy');
+const {createSingleFlight} = require('./inference/singleFlight');
+const {createSSEParser, formatSSE} = require('./inference/sse');
+const {createLocalJobQueue} = require('./jobQueue');
+const {lazyRequire} = require('./lazy');
+const {dataError} = require('./pdf/templates');
+const {SpeechAnalyzer, summarize} = require('./speech/analyzer');
+const {scanTranscript} = require('./speech/fillers');
 
-// Initialize Firebase Admin
-admin.initializeApp();
+// Firebase Admin is loaded and initialized by the first route that needs it
+const firebaseAdmin = lazyRequire('firebase-admin', admin => admin.initializeApp());
+
+// Generated documents go through a shared batching writer. Handlers wait
+// for their write (at most PERSIST_WAIT_MS) before answering.
+// PERSIST_AFTER_RESPONSE=true answers first and waits afterwards, which is
+// only safe with CPU allocated outside requests: a throttled or reclaimed
+// instance would lose the queued writes.
+const PERSIST_AFTER_RESPONSE = process.env.PERSIST_AFTER_RESPONSE === 'true';
+const persistence = new BatchWriter({
+  firestore: () => firebaseAdmin().firestore(),
+  maxBatchSize: Number(process.env.PERSIST_BATCH_SIZE) || 100,
+  flushIntervalMs: Number(process.env.PERSIST_FLUSH_MS) || (PERSIST_AFTER_RESPONSE ? 200 : 20),
+  waitMs: Number(process.env.PERSIST_WAIT_MS) || 10000,
+});
+
+// Answers with `body` once `written` settles, or right away in
+// after-response mode; either way the handler finishes after the wait
+async function respondPersisted(res, written, body) {
+  if (PERSIST_AFTER_RESPONSE) {
+    res.json(body);
+  }
+  await persistence.wait(written);
+  if (!PERSIST_AFTER_RESPONSE) {
+    res.json(body);
+  }
+}
 
 const HF_API_KEY = functions.config().huggingface?.api_key || process.env.HF_API_KEY;
-const HF_BASE_URL = 'https://api-inference.huggingface.co/models';
+// Overridable so load tests can point at a local stand-in (python -m loadtest hfstub)
+const HF_BASE_URL = process.env.HF_BASE_URL || 'https://api-inference.huggingface.co/models';
 
-// Hugging Face API helper
-async function callHuggingFace(model, payload, retries = 3) {
-  try {
-    const response = await axios.post(`${HF_BASE_URL}/${model}`, payload, {
-      headers: {
-        'Authorization': `Bearer ${HF_API_KEY}`,
-        'Content-Type': 'application/json',
-      },
-      timeout: 30000,
-    });
-    return response.data;
-  } catch (error) {
-    if (retries > 0 && error.response?.status === 503) {
-      // Model loading, retry after delay
-      await new Promise(resolve => setTimeout(resolve, 2000));
-      return callHuggingFace(model, payload, retries - 1);
+// One keep-alive client per instance: warm invocations skip the TLS handshake
+const hfClient = createInferenceClient({
+  baseURL: HF_BASE_URL,
+  apiKey: HF_API_KEY,
+  maxSockets: Number(process.env.HF_MAX_SOCKETS) || 50,
+  maxFreeSockets: Number(process.env.HF_MAX_FREE_SOCKETS) || 10,
+});
+
+// Identical (model, payload) calls are answered from cache; the optional
+// Firestore tier lets warm instances share results
+const HF_CACHE_FIRESTORE = (functions.config().huggingface?.cache_firestore ||
+  process.env.HF_CACHE_FIRESTORE) === 'true';
+const responseCache = createResponseCache({
+  maxEntries: Number(process.env.HF_CACHE_MAX_ENTRIES) || 500,
+  firestore: HF_CACHE_FIRESTORE ? () => firebaseAdmin().firestore() : null,
+});
+
+// Concurrent identical calls (e.g. a whole class pasting the same prompt)
+// share one upstream request
+const singleFlight = createSingleFlight();
+
+// Total time an endpoint may spend on one inference call, retries included
+const HF_DEADLINES_MS = {
+  generateResume: 20000,
+  generateDocument: 25000,
+  generatePresentation: 20000,
+  fixCode: 15000,
+  chatWithAI: 10000,
+  default: 20000,
+};
+const HF_MAX_ATTEMPTS = 4;
+
+// Concurrent prompts for the same model and parameters go upstream as one
+// batched `inputs` array (HF_BATCH_MAX_SIZE=1 turns batching off)
+const batcher = createMicroBatcher({
+  send: (model, payload, endpoint) => requestHuggingFace(model, payload, endpoint),
+  maxBatchSize: Number(process.env.HF_BATCH_MAX_SIZE) || 8,
+  maxDelayMs: Number(process.env.HF_BATCH_WINDOW_MS) || 20,
+});
+
+// Streaming latency: time to first token is what the user actually waits for
+const streamStats = {
+  streams: 0,
+  fallbacks: 0,
+  ttftMs: new Histogram(LATENCY_BUCKETS_MS),
+  totalMs: new Histogram(LATENCY_BUCKETS_MS),
+};
+
+// One breaker per model: while a model is known to be cold, handlers go
+// straight to their fallback content instead of waiting on retries
+const breakers = new Map();
+function breakerFor(model) {
+  if (!breakers.has(model)) {
+    breakers.set(model, new CircuitBreaker());
+  }
+  return breakers.get(model);
+}
+
+// Route handlers, exported below in the configured deployment layout
+const handlers = {};
+
+// Hugging Face API helper. Resolves to the generation (`{generated_text}`),
+// or to null when the model is cold, which handlers treat like an empty
+// generation and answer with fallback content.
+async function callHuggingFace(model, payload, {endpoint = 'default'} = {}) {
+  const key = cacheKey(model, payload);
+  const cached = await responseCache.get(endpoint, key);
+  if (cached !== undefined) {
+    return firstGeneration(cached);
+  }
+  return singleFlight.run(endpoint, key, async () => {
+    if (!breakerFor(model).allowRequest()) {
+      return null;
+    }
+    const data = firstGeneration(await batcher.submit(model, payload, endpoint));
+    if (data !== null) {
+      responseCache.set(endpoint, key, data);
+    }
+    return data;
+  });
+}
+
+// The API answers a single input with `[{generated_text}]`
+function firstGeneration(data) {
+  return Array.isArray(data) ? data[0] ?? null : data;
+}
+
+async function requestHuggingFace(model, payload, endpoint) {
+  const breaker = breakerFor(model);
+  const deadline = Date.now() + (HF_DEADLINES_MS[endpoint] ?? HF_DEADLINES_MS.default);
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const started = Date.now();
+      const response = await hfClient.post(`/${model}`, payload, {
+        timeout: Math.max(1, deadline - started),
+      });
+      console.log('HF call', JSON.stringify({
+        model,
+        attempt,
+        latencyMs: Date.now() - started,
+        reusedConnection: response.connection?.reused,
+        handshakeMs: response.connection?.handshakeMs,
+      }));
+      breaker.recordSuccess();
+      return response.data;
+    } catch (error) {
+      if (!isRetryable(error)) {
+        breaker.recordFailure();
+        throw error;
+      }
+      const delay = retryDelayMs(error, attempt);
+      const givingUp = attempt + 1 >= HF_MAX_ATTEMPTS || Date.now() + delay >= deadline;
+      // A rate limit we stop waiting on keeps the model unavailable like a cold
+      // start would, and ends a half-open probe
+      if (isModelLoading(error) || givingUp) {
+        breaker.recordColdModel(delay);
+      }
+      if (givingUp) {
+        // Still cold (or rate limited) past the deadline: fall back now
+        console.warn('HF call gave up', JSON.stringify({model, endpoint, attempt, delay}));
+        return null;
+      }
+      await new Promise(resolve => setTimeout(resolve, delay));
     }
-    throw error;
   }
 }
 
 // AI Resume Generation
-exports.generateResume = functions.https.onRequest((req, res) => {
+handlers.generateResume = (req, res) => {
   cors(req, res, async () => {
     try {
+      const admin = firebaseAdmin();
       if (req.method !== 'POST') {
         return res.status(405).json({error: 'Method not allowed'});
       }
@@ -93,14 +239,14 @@ Please generate appropriate sections including:
 
 Format as structured JSON with sections.`;
 
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
+      const result = await callHuggingFace('{{ hf_model }}', {
         inputs: prompt,
         parameters: {
-          max_new_tokens: 500,
+          max_new_tokens: {{ resume_max_tokens }},
           temperature: 0.7,
           return_full_text: false
         }
-      });
+      }, {endpoint: 'generateResume'});
 
       // Fallback content if HF fails
       const fallbackContent = {
@@ -132,9 +278,9 @@ Format as structured JSON with sections.`;
         updatedAt: admin.firestore.FieldValue.serverTimestamp()
       };
 
-      const docRef = await admin.firestore().collection('resumes').add(resumeDoc);
+      const docRef = admin.firestore().collection('resumes').doc();
       
-      res.json({
+      await respondPersisted(res, persistence.set(docRef, resumeDoc), {
         success: true,
         resumeId: docRef.id,
         content: resumeData
@@ -145,10 +291,10 @@ Format as structured JSON with sections.`;
       res.status(500).json({error: 'Failed to generate resume'});
     }
   });
-});
+};
 
 // AI Document Generation
-exports.generateDocument = functions.https.onRequest((req, res) => {
+handlers.generateDocument = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -156,22 +302,45 @@ exports.generateDocument = functions.https.onRequest((req, res) => {
       }
 
       const {topic, documentType, outline, userId} = req.body;
-      
-      const prompt = `Write a ${documentType} about ${topic}.
+
+      // Async mode: answer with a job ID now, the worker writes the result
+      if (req.body.async) {
+        const jobId = await enqueueGenerationJob('document', {topic, documentType, outline, userId});
+        return res.status(202).json({success: true, jobId, status: 'queued'});
+      }
+
+      const {documentId, content, persisted} = await generateDocumentContent({topic, documentType, outline, userId});
+
+      await respondPersisted(res, persisted, {
+        success: true,
+        documentId: documentId,
+        content: content
+      });
+
+    } catch (error) {
+      console.error('Error generating document:', error);
+      res.status(500).json({error: 'Failed to generate document'});
+    }
+  });
+};
+
+async function generateDocumentContent({topic, documentType, outline, userId}) {
+  const admin = firebaseAdmin();
+  const prompt = `Write a ${documentType} about ${topic}.
       
 Outline: ${outline}
 
 Please write a well-structured document with proper headings and content.`;
 
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
-        inputs: prompt,
-        parameters: {
-          max_new_tokens: 800,
-          temperature: 0.7
-        }
-      });
+  const result = await callHuggingFace('{{ hf_model }}', {
+    inputs: prompt,
+    parameters: {
+      max_new_tokens: {{ document_max_tokens }},
+      temperature: 0.7
+    }
+  }, {endpoint: 'generateDocument'});
 
-      const content = result?.generated_text || `# ${topic}
+  const content = result?.generated_text || `# ${topic}
 
 ## Introduction
 This document provides an overview of ${topic} and its key aspects.
@@ -182,34 +351,24 @@ This document provides an overview of ${topic} and its key aspects.
 ## Conclusion
 In summary, this ${documentType} covers the essential elements of ${topic}.`;
 
-      // Save to Firestore
-      const docData = {
-        userId: userId,
-        title: topic,
-        type: documentType,
-        content: content,
-        outline: outline,
-        createdAt: admin.firestore.FieldValue.serverTimestamp(),
-        updatedAt: admin.firestore.FieldValue.serverTimestamp()
-      };
-
-      const docRef = await admin.firestore().collection('documents').add(docData);
-      
-      res.json({
-        success: true,
-        documentId: docRef.id,
-        content: content
-      });
+  // Save to Firestore
+  const docData = {
+    userId: userId,
+    title: topic,
+    type: documentType,
+    content: content,
+    outline: outline,
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  };
 
-    } catch (error) {
-      console.error('Error generating document:', error);
-      res.status(500).json({error: 'Failed to generate document'});
-    }
-  });
-});
+  const docRef = admin.firestore().collection('documents').doc();
+  const persisted = persistence.set(docRef, docData);
+  return {documentId: docRef.id, content, persisted};
+}
 
 // AI Presentation Generation
-exports.generatePresentation = functions.https.onRequest((req, res) => {
+handlers.generatePresentation = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -217,54 +376,17 @@ exports.generatePresentation = functions.https.onRequest((req, res) => {
       }
 
       const {topic, slideCount, audience, userId} = req.body;
-      
-      const prompt = `Create a presentation outline for "${topic}" with ${slideCount} slides for ${audience} audience.
-      
-Format as JSON with slide titles and content points.`;
-
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
-        inputs: prompt,
-        parameters: {
-          max_new_tokens: 600,
-          temperature: 0.7
-        }
-      });
-
-      // Fallback presentation structure
-      const fallbackSlides = [
-        {
-          title: topic,
-          content: ["Introduction to the topic", "Overview of key points"]
-        },
-        {
-          title: "Main Points",
-          content: ["Key concept 1", "Key concept 2", "Key concept 3"]
-        },
-        {
-          title: "Conclusion",
-          content: ["Summary of findings", "Next steps", "Questions?"]
-        }
-      ];
 
-      const slides = result?.generated_text ? 
-        parsePresentationFromAI(result.generated_text) : fallbackSlides;
+      if (req.body.async) {
+        const jobId = await enqueueGenerationJob('presentation', {topic, slideCount, audience, userId});
+        return res.status(202).json({success: true, jobId, status: 'queued'});
+      }
 
-      // Save to Firestore
-      const presentationData = {
-        userId: userId,
-        title: topic,
-        slides: slides,
-        audience: audience,
-        slideCount: slideCount,
-        createdAt: admin.firestore.FieldValue.serverTimestamp(),
-        updatedAt: admin.firestore.FieldValue.serverTimestamp()
-      };
+      const {presentationId, slides, persisted} = await generatePresentationContent({topic, slideCount, audience, userId});
 
-      const docRef = await admin.firestore().collection('presentations').add(presentationData);
-      
-      res.json({
+      await respondPersisted(res, persisted, {
         success: true,
-        presentationId: docRef.id,
+        presentationId: presentationId,
         slides: slides
       });
 
@@ -273,10 +395,122 @@ Format as JSON with slide titles and content points.`;
       res.status(500).json({error: 'Failed to generate presentation'});
     }
   });
-});
+};
+
+async function generatePresentationContent({topic, slideCount, audience, userId}) {
+  const admin = firebaseAdmin();
+  const prompt = `Create a presentation outline for "${topic}" with ${slideCount} slides for ${audience} audience.
+      
+Format as JSON with slide titles and content points.`;
+
+  const result = await callHuggingFace('{{ hf_model }}', {
+    inputs: prompt,
+    parameters: {
+      max_new_tokens: {{ presentation_max_tokens }},
+      temperature: 0.7
+    }
+  }, {endpoint: 'generatePresentation'});
+
+  // Fallback presentation structure
+  const fallbackSlides = [
+    {
+      title: topic,
+      content: ["Introduction to the topic", "Overview of key points"]
+    },
+    {
+      title: "Main Points",
+      content: ["Key concept 1", "Key concept 2", "Key concept 3"]
+    },
+    {
+      title: "Conclusion",
+      content: ["Summary of findings", "Next steps", "Questions?"]
+    }
+  ];
+
+  const slides = result?.generated_text ?
+    parsePresentationFromAI(result.generated_text) : fallbackSlides;
+
+  // Save to Firestore
+  const presentationData = {
+    userId: userId,
+    title: topic,
+    slides: slides,
+    audience: audience,
+    slideCount: slideCount,
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  };
+
+  const docRef = admin.firestore().collection('presentations').doc();
+  const persisted = persistence.set(docRef, presentationData);
+  return {presentationId: docRef.id, slides, persisted};
+}
+
+// Generation jobs: in async mode the request only creates a generationJobs
+// document; runGenerationJob (or the in-process queue when
+// GENERATION_JOBS=local, e.g. under the emulator) does the work and writes
+// the result or error back to the job for the client to pick up
+const GENERATION_JOBS = 'generationJobs';
+const jobGenerators = {
+  document: generateDocumentContent,
+  presentation: generatePresentationContent,
+};
+const localJobQueue = process.env.GENERATION_JOBS === 'local' ?
+  createLocalJobQueue({run: runGenerationJob}) : null;
+
+async function enqueueGenerationJob(type, input) {
+  const admin = firebaseAdmin();
+  const jobRef = admin.firestore().collection(GENERATION_JOBS).doc();
+  await jobRef.set({
+    type: type,
+    userId: input.userId ?? null,
+    // Firestore rejects undefined fields
+    input: Object.fromEntries(Object.entries(input).filter(([, value]) => value !== undefined)),
+    status: 'queued',
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    updatedAt: admin.firestore.FieldValue.serverTimestamp()
+  });
+  if (localJobQueue) {
+    localJobQueue.push(jobRef.id);
+  }
+  return jobRef.id;
+}
+
+async function runGenerationJob(jobId) {
+  const admin = firebaseAdmin();
+  const {FieldValue} = admin.firestore;
+  const jobRef = admin.firestore().collection(GENERATION_JOBS).doc(jobId);
+
+  // Claim the job so a redelivered trigger (or both workers) cannot run it twice
+  const job = await admin.firestore().runTransaction(async transaction => {
+    const snapshot = await transaction.get(jobRef);
+    if (!snapshot.exists || snapshot.data().status !== 'queued') {
+      return null;
+    }
+    transaction.update(jobRef, {status: 'running', updatedAt: FieldValue.serverTimestamp()});
+    return snapshot.data();
+  });
+  if (!job) {
+    return;
+  }
+
+  try {
+    const {persisted, ...result} = await jobGenerators[job.type](job.input);
+    // The worker's instance may be idle once it returns, so wait for the write
+    await persisted;
+    await jobRef.update({status: 'done', result, updatedAt: FieldValue.serverTimestamp()});
+  } catch (error) {
+    console.error('Generation job failed:', jobId, error);
+    await jobRef.update({status: 'failed', error: error.message, updatedAt: FieldValue.serverTimestamp()});
+  }
+}
+
+exports.runGenerationJob = functions.firestore
+  .document(`${GENERATION_JOBS}/{jobId}`)
+  .onCreate((snapshot, context) => runGenerationJob(context.params.jobId));
 
 // AI Code Fix
-exports.fixCode = functions.https.onRequest((req, res) => {
+handlers.fixCode = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -294,13 +528,13 @@ Error: ${error}
 
 Provide the corrected code and explain the fix.`;
 
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
+      const result = await callHuggingFace('{{ hf_model }}', {
         inputs: prompt,
         parameters: {
-          max_new_tokens: 400,
+          max_new_tokens: {{ code_fix_max_tokens }},
           temperature: 0.3
         }
-      });
+      }, {endpoint: 'fixCode'});
 
       const response = {
         originalCode: code,
@@ -325,10 +559,10 @@ Provide the corrected code and explain the fix.`;
       res.status(500).json({error: 'Failed to fix code'});
     }
   });
-});
+};
 
 // AI Chat Response
-exports.chatWithAI = functions.https.onRequest((req, res) => {
+handlers.chatWithAI = (req, res) => {
   cors(req, res, async () => {
     try {
       if (req.method !== 'POST') {
@@ -336,24 +570,17 @@ exports.chatWithAI = functions.https.onRequest((req, res) => {
       }
 
       const {message, context} = req.body;
-      
-      const prompt = `You are an AI assistant helping students with productivity and learning. 
-      
-Context: ${context || 'General assistance'}
-User: ${message}
-      
-Provide a helpful response.`;
+      const prompt = chatPrompt(message, context);
 
-      const result = await callHuggingFace('microsoft/DialoGPT-large', {
+      const result = await callHuggingFace('{{ hf_model }}', {
         inputs: prompt,
         parameters: {
-          max_new_tokens: 300,
+          max_new_tokens: {{ chat_max_tokens }},
           temperature: 0.8
         }
-      });
+      }, {endpoint: 'chatWithAI'});
 
-      const response = result?.generated_text || 
-        "I'm here to help! Could you please provide more details about what you need assistance with?";
+      const response = result?.generated_text || CHAT_FALLBACK;
 
       res.json({
         success: true,
@@ -366,20 +593,132 @@ Provide a helpful response.`;
       res.status(500).json({error: 'Failed to get AI response'});
     }
   });
-});
+};
+
+// Streaming AI Chatbot: relays tokens as server-sent events while the model
+// generates them, then sends a final `done` event with the full response
+handlers.chatWithAIStream = (req, res) => {
+  cors(req, res, async () => {
+    if (req.method !== 'POST') {
+      return res.status(405).json({error: 'Method not allowed'});
+    }
+
+    const {message, context} = req.body;
+    const model = '{{ hf_model }}';
+    const breaker = breakerFor(model);
+    const controller = new AbortController();
+    res.on('close', () => controller.abort());
+
+    res.set({
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    });
+    res.flushHeaders();
+
+    const started = Date.now();
+    let ttftMs = null;
+    let tokens = 0;
+    let response = '';
+
+    try {
+      if (breaker.allowRequest()) {
+        const upstream = await hfClient.stream(`/${model}`, {
+          inputs: chatPrompt(message, context),
+          parameters: {
+            max_new_tokens: {{ chat_max_tokens }},
+            temperature: 0.8,
+            return_full_text: false
+          },
+          stream: true
+        }, {timeout: HF_DEADLINES_MS.chatWithAI, signal: controller.signal});
+
+        const parser = createSSEParser(data => {
+          const event = JSON.parse(data);
+          if (event.error) {
+            throw new Error(event.error);
+          }
+          if (!event.token || event.token.special) {
+            return;
+          }
+          if (ttftMs === null) {
+            ttftMs = Date.now() - started;
+          }
+          tokens += 1;
+          response += event.token.text;
+          res.write(formatSSE({token: event.token.text}));
+        });
+        for await (const chunk of upstream.data) {
+          parser.push(chunk);
+        }
+        parser.end();
+        breaker.recordSuccess();
+      }
+    } catch (error) {
+      if (controller.signal.aborted) {
+        // The client left before the model answered: no outcome to record
+        breaker.releaseProbe();
+        return;
+      }
+      if (isRetryable(error)) {
+        breaker.recordColdModel(retryDelayMs(error, 0));
+      } else {
+        breaker.recordFailure();
+      }
+      console.error('Error in AI chat stream:', error.message);
+    }
+
+    if (!response) {
+      // Cold model, open breaker or upstream error: answer like chatWithAI
+      streamStats.fallbacks += 1;
+      response = CHAT_FALLBACK;
+      res.write(formatSSE({token: response}));
+    }
+
+    const totalMs = Date.now() - started;
+    streamStats.streams += 1;
+    streamStats.totalMs.observe(totalMs);
+    if (ttftMs !== null) {
+      streamStats.ttftMs.observe(ttftMs);
+    }
+    console.log('HF stream', JSON.stringify({model, ttftMs, totalMs, tokens}));
+
+    res.write(formatSSE({done: true, response, timestamp: new Date().toISOString()}));
+    res.end();
+  });
+};
+
+// Client-generated voice session IDs (crypto.randomUUID() in the browser)
+function isSessionId(value) {
+  return typeof value === 'string' && /^[A-Za-z0-9_-]{16,64}$/.test(value);
+}
 
 // Voice Analysis
-exports.analyzeVoice = functions.https.onRequest((req, res) => {
+handlers.analyzeVoice = (req, res) => {
   cors(req, res, async () => {
     try {
+      const admin = firebaseAdmin();
       if (req.method !== 'POST') {
         return res.status(405).json({error: 'Method not allowed'});
       }
 
-      const {transcript, duration, userId} = req.body;
+      const {transcript, duration, userId, sessionId, incomplete} = req.body;
+      const sessions = admin.firestore().collection('voiceSessions');
       
-      // Analyze speech patterns
-      const analysis = analyzeTranscript(transcript, duration);
+      // A live session already has running counts from analyzeVoiceSegment,
+      // so the transcript is stored without being analyzed again. The client
+      // marks a session incomplete when a segment never reached the server;
+      // its transcript is analyzed in full and replaces the partial counts
+      if (sessionId != null && !isSessionId(sessionId)) {
+        return res.status(400).json({error: 'Invalid sessionId'});
+      }
+      const session = sessionId ? (await sessions.doc(sessionId).get()).data() : null;
+      const owned = Boolean(session) && session.userId === userId;
+      const live = owned && !incomplete ? session.live : null;
+      const analysis = live ?
+        new SpeechAnalyzer(live).analysis(duration) :
+        analyzeTranscript(transcript, duration);
       
       // Save to Firestore
       const sessionData = {
@@ -390,9 +729,10 @@ exports.analyzeVoice = functions.https.onRequest((req, res) => {
         createdAt: admin.firestore.FieldValue.serverTimestamp()
       };
 
-      const docRef = await admin.firestore().collection('voiceSessions').add(sessionData);
+      // The client's session ID names the document unless another user has it
+      const docRef = sessionId && (owned || !session) ? sessions.doc(sessionId) : sessions.doc();
       
-      res.json({
+      await respondPersisted(res, persistence.set(docRef, sessionData), {
         success: true,
         sessionId: docRef.id,
         analysis: analysis
@@ -403,9 +743,164 @@ exports.analyzeVoice = functions.https.onRequest((req, res) => {
       res.status(500).json({error: 'Failed to analyze voice'});
     }
   });
-});
+};
+
+// Live voice sessions: the client posts each final recognition result as it
+// arrives and gets the running analysis back. The counts are kept on the
+// voiceSessions document, so each update only analyzes the new text and
+// analyzeVoice can finish the session without re-reading the transcript
+handlers.analyzeVoiceSegment = (req, res) => {
+  cors(req, res, async () => {
+    try {
+      const admin = firebaseAdmin();
+      if (req.method !== 'POST') {
+        return res.status(405).json({error: 'Method not allowed'});
+      }
+
+      const {sessionId, userId, text, sequence, offsetSeconds} = req.body;
+      if (typeof text !== 'string' || !Number.isInteger(sequence) || !(offsetSeconds >= 0)) {
+        return res.status(400).json({error: 'text, sequence and offsetSeconds are required'});
+      }
+      // The client names the session before its first segment, so a retried
+      // first segment lands on the same document instead of a new one
+      if (!isSessionId(sessionId)) {
+        return res.status(400).json({error: 'sessionId is required'});
+      }
+
+      const sessions = admin.firestore().collection('voiceSessions');
+      const sessionRef = sessions.doc(sessionId);
+      const result = await admin.firestore().runTransaction(async transaction => {
+        const snapshot = await transaction.get(sessionRef);
+        const session = snapshot.data();
+        if (session && (session.userId !== userId || !session.live)) {
+          return null;
+        }
+        const analyzer = new SpeechAnalyzer(session?.live);
+        // A retried segment is answered without being counted twice
+        if (!session || sequence > session.sequence) {
+          analyzer.push(text, offsetSeconds);
+          transaction.set(sessionRef, {
+            userId: userId,
+            live: analyzer.state,
+            sequence: sequence,
+            updatedAt: admin.firestore.FieldValue.serverTimestamp()
+          });
+        }
+        return {...analyzer.analysis(offsetSeconds), currentWpm: analyzer.currentWpm()};
+      });
+      if (!result) {
+        return res.status(409).json({error: 'Session is not live'});
+      }
+
+      res.json({
+        success: true,
+        sessionId: sessionRef.id,
+        analysis: result
+      });
+
+    } catch (error) {
+      console.error('Error analyzing voice segment:', error);
+      res.status(500).json({error: 'Failed to analyze voice segment'});
+    }
+  });
+};
+
+// PDF export: renders a precompiled template (invoice, resume-*) on a pool
+// of warm browser pages. The renderer and puppeteer load with the first render.
+let pdfRenderer = null;
+function getPdfRenderer() {
+  if (!pdfRenderer) {
+    pdfRenderer = require('./pdf/renderer').createPdfRenderer({
+      poolSize: Number(process.env.PDF_POOL_SIZE) || 4
+    });
+  }
+  return pdfRenderer;
+}
+
+handlers.renderPdf = (req, res) => {
+  cors(req, res, async () => {
+    try {
+      if (req.method !== 'POST') {
+        return res.status(405).json({error: 'Method not allowed'});
+      }
+
+      const {template, data} = req.body;
+      const renderer = getPdfRenderer();
+      if (!renderer.templates.includes(template)) {
+        return res.status(400).json({error: `Unknown template, expected one of: ${renderer.templates.join(', ')}`});
+      }
+
+      const problem = dataError(data ?? {});
+      if (problem) {
+        return res.status(400).json({error: problem});
+      }
+
+      const {pdf, filename} = await renderer.render(template, data ?? {});
+
+      res.set({
+        'Content-Type': 'application/pdf',
+        'Content-Disposition': `attachment; filename="${filename.replace(/["\\\\\\r\\n]/g, '')}"`
+      });
+      res.send(Buffer.from(pdf));
+
+    } catch (error) {
+      console.error('Error rendering PDF:', error);
+      res.status(500).json({error: 'Failed to render PDF'});
+    }
+  });
+};
+
+// Inference cache counters for this instance
+handlers.inferenceStats = (req, res) => {
+  cors(req, res, () => {
+    res.json({
+      cache: responseCache.stats(),
+      singleFlight: singleFlight.stats(),
+      connections: hfClient.stats(),
+      batching: batcher.stats(),
+      persistence: persistence.stats(),
+      pdf: pdfRenderer ? pdfRenderer.stats() : null,
+      breakers: Object.fromEntries([...breakers].map(([model, breaker]) => [model, breaker.stats()])),
+      streaming: {
+        streams: streamStats.streams,
+        fallbacks: streamStats.fallbacks,
+        ttftMs: streamStats.ttftMs.snapshot(),
+        totalMs: streamStats.totalMs.snapshot()
+      },
+      timestamp: new Date().toISOString()
+    });
+  });
+};
+
+// Per-route runtime options: PDF rendering needs room for Chromium
+const RUNTIME_OPTIONS = {
+  renderPdf: {memory: '2GB', timeoutSeconds: 60}
+};
+
+// Deployment layout: one function per route (default), or a single `api`
+// function that routes /<name> to the same handlers (FUNCTIONS_LAYOUT=router)
+if (process.env.FUNCTIONS_LAYOUT === 'router') {
+  // Serves every route, so it is sized for the heaviest one
+  exports.api = functions.runWith(RUNTIME_OPTIONS.renderPdf).https
+    .onRequest(require('./router').createRouter(handlers));
+} else {
+  for (const [name, handler] of Object.entries(handlers)) {
+    exports[name] = functions.runWith(RUNTIME_OPTIONS[name] || {}).https.onRequest(handler);
+  }
+}
 
 // Helper Functions
+const CHAT_FALLBACK = "I'm here to help! Could you please provide more details about what you need assistance with?";
+
+function chatPrompt(message, context) {
+  return `You are an AI assistant helping students with productivity and learning. 
+      
+Context: ${context || 'General assistance'}
+User: ${message}
+      
+Provide a helpful response.`;
+}
+
 function parseResumeFromAI(text) {
   // Simple parsing logic - in production, use more sophisticated NLP
   return {
@@ -431,49 +926,1647 @@ function parsePresentationFromAI(text) {
 }
 
 function analyzeTranscript(transcript, duration) {
-  const words = transcript.split(' ');
-  const wpm = Math.round((words.length / duration) * 60);
-  
-  // Count filler words
-  const fillerWords = ['um', 'uh', 'like', 'you know', 'so', 'actually'];
-  const fillerCount = words.filter(word => 
-    fillerWords.includes(word.toLowerCase())).length;
-  
-  // Calculate pause detection (simplified)
-  const sentences = transcript.split(/[.!?]+/).length;
-  const avgWordsPerSentence = words.length / sentences;
-  
-  return {
-    wpm: wpm,
-    fillerWords: fillerCount,
-    fillerPercentage: Math.round((fillerCount / words.length) * 100),
-    totalWords: words.length,
-    avgWordsPerSentence: Math.round(avgWordsPerSentence),
-    duration: duration,
-    feedback: generateFeedback(wpm, fillerCount, words.length)
-  };
-}
+  // Words, fillers (including multi-word ones) and sentences in one pass
+  return summarize(scanTranscript(transcript), duration);
+}""",
 
-function generateFeedback(wpm, fillerCount, totalWords) {
-  let feedback = [];
-  
-  if (wpm < 100) {
-    feedback.push("Try speaking a bit faster - aim for 120-150 WPM");
-  } else if (wpm > 180) {
-    feedback.push("Slow down slightly for better clarity");
-  } else {
-    feedback.push("Good speaking pace!");
+    "functions/inference/responseCache.js": """const crypto = require('crypto');
+
+// Default time-to-live per endpoint; chat answers depend on context, so they age fastest
+const DEFAULT_TTLS = {
+  generateResume: 60 * 60 * 1000,
+  generateDocument: 60 * 60 * 1000,
+  generatePresentation: 60 * 60 * 1000,
+  fixCode: 10 * 60 * 1000,
+  chatWithAI: 5 * 60 * 1000,
+  default: 10 * 60 * 1000,
+};
+
+// JSON with sorted object keys, so equal payloads always hash the same
+function stableStringify(value) {
+  if (Array.isArray(value)) {
+    return `[${value.map(stableStringify).join(',')}]`;
   }
-  
-  const fillerPercentage = (fillerCount / totalWords) * 100;
-  if (fillerPercentage > 5) {
-    feedback.push("Try to reduce filler words - practice pausing instead");
-  } else {
-    feedback.push("Great job minimizing filler words!");
+  if (value && typeof value === 'object') {
+    const keys = Object.keys(value).filter(key => value[key] !== undefined).sort();
+    return `{${keys.map(key => `${JSON.stringify(key)}:${stableStringify(value[key])}`).join(',')}}`;
+  }
+  return JSON.stringify(value);
+}
+
+function cacheKey(model, payload) {
+  return crypto.createHash('sha256').update(stableStringify([model, payload])).digest('hex');
+}
+
+// Map-backed LRU: re-inserting on access keeps the oldest entry first
+class LruTtlCache {
+  constructor(maxEntries = 500) {
+    this.maxEntries = maxEntries;
+    this.entries = new Map();
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      return undefined;
+    }
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key, value, ttlMs) {
+    this.entries.delete(key);
+    this.entries.set(key, {value, expiresAt: Date.now() + ttlMs});
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+}
+
+/**
+ * Two-tier response cache for inference calls.
+ *
+ * The first tier is an in-memory LRU with per-endpoint TTLs; the optional
+ * second tier is a Firestore collection shared by all warm instances.
+ * `firestore` may also be a function returning the instance, called on
+ * first use.
+ */
+function createResponseCache({maxEntries = 500, ttls = {}, firestore = null,
+  collection = 'inferenceCache'} = {}) {
+  const shared = typeof firestore === 'function' ? firestore : () => firestore;
+  const memory = new LruTtlCache(maxEntries);
+  const endpointTtls = {...DEFAULT_TTLS, ...ttls};
+  const ttlFor = endpoint => endpointTtls[endpoint] ?? endpointTtls.default;
+  const stats = {};
+  const count = (endpoint, field) => {
+    stats[endpoint] = stats[endpoint] || {hits: 0, sharedHits: 0, misses: 0};
+    stats[endpoint][field] += 1;
+  };
+
+  async function get(endpoint, key) {
+    const local = memory.get(key);
+    if (local !== undefined) {
+      count(endpoint, 'hits');
+      return local;
+    }
+    if (firestore) {
+      try {
+        const snapshot = await shared().collection(collection).doc(key).get();
+        const data = snapshot.exists ? snapshot.data() : null;
+        if (data && data.expiresAt > Date.now()) {
+          memory.set(key, data.value, data.expiresAt - Date.now());
+          count(endpoint, 'sharedHits');
+          return data.value;
+        }
+      } catch (error) {
+        console.warn('Inference cache read failed:', error.message);
+      }
+    }
+    count(endpoint, 'misses');
+    return undefined;
+  }
+
+  function set(endpoint, key, value) {
+    const ttlMs = ttlFor(endpoint);
+    memory.set(key, value, ttlMs);
+    if (firestore) {
+      // Shared tier is best effort and never delays the response
+      shared().collection(collection).doc(key)
+        .set({endpoint, value, expiresAt: Date.now() + ttlMs})
+        .catch(error => console.warn('Inference cache write failed:', error.message));
+    }
+  }
+
+  return {
+    get,
+    set,
+    stats: () => ({size: memory.size, endpoints: stats}),
+  };
+}
+
+module.exports = {createResponseCache, cacheKey, stableStringify, LruTtlCache};
+""",
+
+    "functions/inference/singleFlight.js": """/**
+ * Coalesces concurrent identical calls inside one function instance.
+ *
+ * The first caller for a key runs the upstream request; everyone arriving
+ * while it is in flight awaits the same promise. Callers share the resolved
+ * value, so it must be treated as read-only.
+ */
+function createSingleFlight() {
+  const inFlight = new Map();
+  const stats = {};
+
+  function run(endpoint, key, fn) {
+    stats[endpoint] = stats[endpoint] || {upstreamCalls: 0, coalesced: 0};
+    const pending = inFlight.get(key);
+    if (pending) {
+      stats[endpoint].coalesced += 1;
+      return pending;
+    }
+    stats[endpoint].upstreamCalls += 1;
+    const promise = Promise.resolve()
+      .then(fn)
+      .finally(() => inFlight.delete(key));
+    inFlight.set(key, promise);
+    return promise;
+  }
+
+  return {
+    run,
+    // coalesced == upstream calls saved
+    stats: () => ({inFlight: inFlight.size, endpoints: stats}),
+  };
+}
+
+module.exports = {createSingleFlight};
+""",
+
+    "functions/inference/httpClient.js": """const http = require('http');
+const https = require('https');
+
+// Times every new socket from creation to connect (TCP) or secureConnect (TLS)
+function instrumentAgent(agent, readyEvent) {
+  const createConnection = agent.createConnection.bind(agent);
+  agent.createConnection = (options, callback) => {
+    const start = process.hrtime.bigint();
+    const socket = createConnection(options, callback);
+    socket.once(readyEvent, () => {
+      socket.handshakeMs = Number(process.hrtime.bigint() - start) / 1e6;
+    });
+    return socket;
+  };
+  return agent;
+}
+
+/**
+ * Shared keep-alive client for the inference API.
+ *
+ * Created once per instance, so warm invocations reuse pooled sockets
+ * instead of paying a fresh TLS handshake. maxSockets bounds concurrent
+ * connections per host.
+ */
+function createInferenceClient({baseURL, apiKey, timeout = 30000, maxSockets = 50,
+  maxFreeSockets = 10, keepAliveMsecs = 1000}) {
+  const agentOptions = {keepAlive: true, keepAliveMsecs, maxSockets, maxFreeSockets, scheduling: 'lifo'};
+  let client = null;
+
+  // axios is loaded on the first request, so routes without inference
+  // calls do not pay for it on cold start
+  function getClient() {
+    if (!client) {
+      client = require('axios').create({
+        baseURL,
+        timeout,
+        headers: {
+          'Authorization': `Bearer ${apiKey}`,
+          'Content-Type': 'application/json',
+        },
+        httpAgent: instrumentAgent(new http.Agent(agentOptions), 'connect'),
+        httpsAgent: instrumentAgent(new https.Agent(agentOptions), 'secureConnect'),
+      });
+      client.interceptors.response.use(response => {
+        response.connection = record(response.request);
+        return response;
+      }, error => {
+        if (error.request) {
+          error.connection = record(error.request);
+        }
+        return Promise.reject(error);
+      });
+    }
+    return client;
+  }
+
+  const stats = {requests: 0, reused: 0, newConnections: 0, handshakeMsTotal: 0};
+
+  function record(request) {
+    if (!request) {
+      return undefined;
+    }
+    const reused = Boolean(request.reusedSocket);
+    const handshakeMs = reused ? 0 : (request.socket?.handshakeMs ?? null);
+    stats.requests += 1;
+    if (reused) {
+      stats.reused += 1;
+    } else {
+      stats.newConnections += 1;
+      stats.handshakeMsTotal += handshakeMs || 0;
+    }
+    return {reused, handshakeMs};
+  }
+
+  return {
+    post: (path, payload, config) => getClient().post(path, payload, config),
+    // Same request, but `response.data` is the raw body stream
+    stream: (path, payload, config) => getClient().post(path, payload, {...config, responseType: 'stream'}),
+    stats: () => ({
+      ...stats,
+      reuseRatio: stats.requests ? stats.reused / stats.requests : 0,
+      avgHandshakeMs: stats.newConnections ? stats.handshakeMsTotal / stats.newConnections : 0,
+    }),
+  };
+}
+
+module.exports = {createInferenceClient};
+""",
+
+    "functions/inference/retryPolicy.js": """// Statuses worth retrying: model still loading, or rate limited
+const RETRYABLE_STATUSES = new Set([429, 503]);
+
+function isRetryable(error) {
+  return RETRYABLE_STATUSES.has(error.response?.status);
+}
+
+function isModelLoading(error) {
+  return error.response?.status === 503;
+}
+
+// Delay the API asked for: `estimated_time` (seconds) in a 503 body, or Retry-After
+function hintedDelayMs(error) {
+  const estimated = error.response?.data?.estimated_time;
+  if (typeof estimated === 'number' && estimated >= 0) {
+    return estimated * 1000;
+  }
+  const retryAfter = error.response?.headers?.['retry-after'];
+  if (retryAfter) {
+    const seconds = Number(retryAfter);
+    if (!Number.isNaN(seconds)) {
+      return seconds * 1000;
+    }
+    const date = Date.parse(retryAfter);
+    if (!Number.isNaN(date)) {
+      return Math.max(0, date - Date.now());
+    }
+  }
+  return null;
+}
+
+/**
+ * Delay before retry number `attempt` (0-based): the server's hint plus a
+ * little jitter when there is one, otherwise full-jitter exponential backoff.
+ */
+function retryDelayMs(error, attempt, {baseMs = 500, maxMs = 10000} = {}) {
+  const hinted = hintedDelayMs(error);
+  if (hinted !== null) {
+    return hinted + Math.random() * baseMs;
+  }
+  return Math.random() * Math.min(maxMs, baseMs * 2 ** attempt);
+}
+
+/**
+ * Per-model circuit breaker.
+ *
+ * A model reported as loading opens the circuit for its estimated load time;
+ * `failureThreshold` consecutive other failures open it for `cooldownMs`.
+ * While open, callers skip the upstream call and use their fallback content.
+ * Once the open period ends a single probe is let through (half-open). Every
+ * probe must end in one of the record calls or in `releaseProbe()`, or the
+ * breaker keeps refusing requests.
+ */
+class CircuitBreaker {
+  constructor({failureThreshold = 5, cooldownMs = 30000} = {}) {
+    this.failureThreshold = failureThreshold;
+    this.cooldownMs = cooldownMs;
+    this.failures = 0;
+    this.openUntil = 0;
+    this.probing = false;
+    this.shortCircuited = 0;
+  }
+
+  get state() {
+    if (this.openUntil > Date.now()) {
+      return 'open';
+    }
+    return this.openUntil ? 'half-open' : 'closed';
+  }
+
+  allowRequest() {
+    const state = this.state;
+    if (state === 'closed' || (state === 'half-open' && !this.probing)) {
+      this.probing = state === 'half-open';
+      return true;
+    }
+    this.shortCircuited += 1;
+    return false;
+  }
+
+  recordSuccess() {
+    this.failures = 0;
+    this.openUntil = 0;
+    this.probing = false;
+  }
+
+  // The probe ended without an outcome (e.g. the client went away): let the next one through
+  releaseProbe() {
+    this.probing = false;
+  }
+
+  recordColdModel(expectedLoadMs) {
+    this.openUntil = Math.max(this.openUntil, Date.now() + expectedLoadMs);
+    this.probing = false;
+  }
+
+  recordFailure() {
+    this.failures += 1;
+    this.probing = false;
+    if (this.failures >= this.failureThreshold) {
+      this.openUntil = Date.now() + this.cooldownMs;
+    }
+  }
+
+  stats() {
+    return {state: this.state, openUntil: this.openUntil || null, failures: this.failures,
+      shortCircuited: this.shortCircuited};
+  }
+}
+
+module.exports = {CircuitBreaker, isModelLoading, isRetryable, retryDelayMs};
+""",
+
+    "functions/inference/sse.js": """/**
+ * Incremental parser for `text/event-stream` bodies.
+ *
+ * Feed it raw chunks as they arrive; `onData` is called with the `data`
+ * payload of each complete event. Chunks may split lines or multi-byte
+ * characters anywhere.
+ */
+function createSSEParser(onData) {
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let data = [];
+
+  function processLine(line) {
+    if (line === '') {
+      if (data.length) {
+        onData(data.join('\\n'));
+        data = [];
+      }
+      return;
+    }
+    if (line.startsWith(':')) {
+      return;
+    }
+    const colon = line.indexOf(':');
+    const field = colon === -1 ? line : line.slice(0, colon);
+    let value = colon === -1 ? '' : line.slice(colon + 1);
+    if (value.startsWith(' ')) {
+      value = value.slice(1);
+    }
+    if (field === 'data') {
+      data.push(value);
+    }
+  }
+
+  return {
+    push(chunk) {
+      buffer += typeof chunk === 'string' ? chunk : decoder.decode(chunk, {stream: true});
+      const lines = buffer.split(/\\r?\\n/);
+      buffer = lines.pop();
+      lines.forEach(processLine);
+    },
+    end() {
+      buffer += decoder.decode();
+      if (buffer) {
+        processLine(buffer);
+        buffer = '';
+      }
+      processLine('');
+    },
+  };
+}
+
+// One SSE event carrying a JSON payload
+function formatSSE(payload) {
+  return `data: ${JSON.stringify(payload)}\\n\\n`;
+}
+
+module.exports = {createSSEParser, formatSSE};
+""",
+
+    "functions/inference/metrics.js": """/**
+ * Fixed-bucket histogram for per-instance latency metrics.
+ *
+ * `bounds` are inclusive upper bounds in ascending order; values above the
+ * last bound land in an overflow bucket. Quantiles are estimated as the
+ * upper bound of the bucket they fall in.
+ */
+class Histogram {
+  constructor(bounds) {
+    this.bounds = bounds;
+    this.counts = new Array(bounds.length + 1).fill(0);
+    this.count = 0;
+    this.sum = 0;
+    this.max = 0;
+  }
+
+  observe(value) {
+    let i = 0;
+    while (i < this.bounds.length && value > this.bounds[i]) {
+      i++;
+    }
+    this.counts[i] += 1;
+    this.count += 1;
+    this.sum += value;
+    this.max = Math.max(this.max, value);
+  }
+
+  quantile(q) {
+    if (!this.count) {
+      return null;
+    }
+    const rank = q * this.count;
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      seen += this.counts[i];
+      if (seen >= rank) {
+        return i < this.bounds.length ? Math.min(this.bounds[i], this.max) : this.max;
+      }
+    }
+    return this.max;
+  }
+
+  snapshot() {
+    const buckets = {};
+    this.bounds.forEach((bound, i) => {
+      buckets[`le_${bound}`] = this.counts[i];
+    });
+    buckets.overflow = this.counts[this.bounds.length];
+    return {
+      count: this.count,
+      mean: this.count ? this.sum / this.count : null,
+      p50: this.quantile(0.5),
+      p95: this.quantile(0.95),
+      p99: this.quantile(0.99),
+      max: this.max,
+      buckets,
+    };
+  }
+}
+
+// Millisecond buckets suited to inference latencies
+const LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000];
+
+module.exports = {Histogram, LATENCY_BUCKETS_MS};
+""",
+
+    "functions/inference/microBatcher.js": """const {Histogram} = require('./metrics');
+const {stableStringify} = require('./responseCache');
+
+const BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64];
+const QUEUE_DELAY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 250];
+
+/**
+ * Collects concurrent single-input calls that share a model and parameters
+ * and sends them upstream as one request with an `inputs` array.
+ *
+ * A batch is flushed when it reaches `maxBatchSize` or `maxDelayMs` after its
+ * first item was queued, whichever comes first. `send(model, payload, endpoint)`
+ * performs the upstream call; it may resolve to null (model unavailable),
+ * which every caller in the batch receives.
+ */
+function createMicroBatcher({send, maxBatchSize = 8, maxDelayMs = 20}) {
+  const queues = new Map();
+  const batchSize = new Histogram(BATCH_SIZE_BUCKETS);
+  const queueDelayMs = new Histogram(QUEUE_DELAY_BUCKETS_MS);
+  const stats = {requests: 0, batches: 0, unbatched: 0};
+
+  function submit(model, payload, endpoint) {
+    stats.requests += 1;
+    if (maxBatchSize <= 1 || typeof payload.inputs !== 'string') {
+      return send(model, payload, endpoint);
+    }
+    const {inputs, ...shared} = payload;
+    const key = `${endpoint}:${model}:${stableStringify(shared)}`;
+    return new Promise((resolve, reject) => {
+      let queue = queues.get(key);
+      if (!queue) {
+        queue = {model, endpoint, shared, items: []};
+        queue.timer = setTimeout(() => flush(key), maxDelayMs);
+        queues.set(key, queue);
+      }
+      queue.items.push({inputs, resolve, reject, queuedAt: Date.now()});
+      if (queue.items.length >= maxBatchSize) {
+        flush(key);
+      }
+    });
+  }
+
+  async function flush(key) {
+    const queue = queues.get(key);
+    queues.delete(key);
+    clearTimeout(queue.timer);
+    const {model, endpoint, shared, items} = queue;
+
+    const now = Date.now();
+    stats.batches += 1;
+    batchSize.observe(items.length);
+    items.forEach(item => queueDelayMs.observe(now - item.queuedAt));
+
+    if (items.length === 1) {
+      const [item] = items;
+      return send(model, {...shared, inputs: item.inputs}, endpoint).then(item.resolve, item.reject);
+    }
+
+    try {
+      const results = await send(model, {...shared, inputs: items.map(item => item.inputs)}, endpoint);
+      if (results === null) {
+        items.forEach(item => item.resolve(null));
+      } else if (Array.isArray(results) && results.length === items.length) {
+        // Each entry is that input's output; give callers the single-input shape
+        results.forEach((result, i) => items[i].resolve(Array.isArray(result) ? result : [result]));
+      } else {
+        // The model did not answer per input: fall back to one call each
+        console.warn('Batched call returned an unexpected shape', JSON.stringify({model, endpoint, size: items.length}));
+        stats.unbatched += items.length;
+        items.forEach(item => send(model, {...shared, inputs: item.inputs}, endpoint).then(item.resolve, item.reject));
+      }
+    } catch (error) {
+      items.forEach(item => item.reject(error));
+    }
+  }
+
+  return {
+    submit,
+    stats: () => ({
+      ...stats,
+      queued: [...queues.values()].reduce((total, queue) => total + queue.items.length, 0),
+      batchSize: batchSize.snapshot(),
+      queueDelayMs: queueDelayMs.snapshot(),
+    }),
+  };
+}
+
+module.exports = {createMicroBatcher};
+""",
+
+    "functions/lazy.js": """/**
+ * Defers `require(id)` until the returned getter is first called.
+ *
+ * Module loading dominates cold starts, so routes pull in heavy
+ * dependencies (firebase-admin, axios, puppeteer, sharp, ...) only when
+ * they actually use them. `init` runs once with the loaded module.
+ */
+function lazyRequire(id, init) {
+  let loaded = null;
+  return () => {
+    if (!loaded) {
+      loaded = {module: require(id)};
+      if (init) {
+        init(loaded.module);
+      }
+    }
+    return loaded.module;
+  };
+}
+
+module.exports = {lazyRequire};
+""",
+
+    "functions/router.js": """const express = require('express');
+
+/**
+ * Single Express app serving every route handler at `/<name>`, for the
+ * FUNCTIONS_LAYOUT=router deployment: one function, one warm pool and one
+ * cold start instead of one per route.
+ */
+function createRouter(handlers) {
+  const app = express();
+  app.disable('x-powered-by');
+  for (const [name, handler] of Object.entries(handlers)) {
+    app.all(`/${name}`, handler);
+  }
+  app.use((req, res) => res.status(404).json({error: 'Not found'}));
+  return app;
+}
+
+module.exports = {createRouter};
+""",
+
+    "functions/bench/coldStart.js": """/**
+ * Cold-start benchmark: one function per route vs. the single router app.
+ *
+ * Every run spawns a fresh Node process that loads index.js in the given
+ * FUNCTIONS_LAYOUT, serves the exported handler on a local port and answers
+ * one request to `--route`. Reported per layout (median and p95 over the runs):
+ *
+ *   spawnMs     process spawn until the first response was sent
+ *   loadMs      time spent in require('../index.js')
+ *   firstReqMs  first request, including any lazily loaded dependencies
+ *   modules     modules in the require cache after the first request
+ *   rssMb       resident memory after the first request
+ *
+ * Usage: node bench/coldStart.js [--runs 10] [--route inferenceStats] [--json out.json]
+ */
+const {spawn} = require('child_process');
+const fs = require('fs');
+const path = require('path');
+
+const LAYOUTS = ['split', 'router'];
+
+// Runs inside the child process
+const CHILD = `
+const http = require('http');
+const {performance} = require('perf_hooks');
+const route = process.env.BENCH_ROUTE;
+const router = process.env.FUNCTIONS_LAYOUT === 'router';
+
+// The Functions runtime serves every function through Express with JSON
+// body parsing, and has it loaded before user code in both layouts
+const express = require('express');
+
+const loadStart = performance.now();
+const exported = require(process.env.BENCH_INDEX);
+const loadMs = performance.now() - loadStart;
+
+const app = express();
+app.use(express.json());
+app.use(router ? exported.api : exported[route]);
+const server = http.createServer(app);
+
+server.listen(0, '127.0.0.1', () => {
+  const requestStart = performance.now();
+  const req = http.request({
+    host: '127.0.0.1',
+    port: server.address().port,
+    method: 'GET',
+    path: router ? '/' + route : '/',
+  }, res => {
+    res.resume();
+    res.on('end', () => {
+      process.send({
+        status: res.statusCode,
+        loadMs,
+        firstReqMs: performance.now() - requestStart,
+        modules: Object.keys(require.cache).length,
+        rssMb: process.memoryUsage().rss / 1048576,
+      }, () => process.exit(0));
+    });
+  });
+  req.end();
+});
+`;
+
+function parseArgs(argv) {
+  const options = {runs: 10, route: 'inferenceStats', json: null};
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '');
+    if (!(key in options)) {
+      throw new Error(`Unknown option ${argv[i]}`);
+    }
+    options[key] = key === 'runs' ? Number(argv[i + 1]) : argv[i + 1];
+  }
+  return options;
+}
+
+function runOnce(layout, route) {
+  return new Promise((resolve, reject) => {
+    const started = process.hrtime.bigint();
+    const child = spawn(process.execPath, ['-e', CHILD], {
+      cwd: path.join(__dirname, '..'),
+      env: {
+        ...process.env,
+        FUNCTIONS_LAYOUT: layout,
+        BENCH_ROUTE: route,
+        BENCH_INDEX: path.join(__dirname, '..', 'index.js'),
+      },
+      stdio: ['ignore', 'ignore', 'inherit', 'ipc'],
+    });
+    let result = null;
+    child.on('message', message => {
+      result = {...message, spawnMs: Number(process.hrtime.bigint() - started) / 1e6};
+    });
+    child.on('error', reject);
+    child.on('exit', code => {
+      if (result) {
+        resolve(result);
+      } else {
+        reject(new Error(`${layout} run exited with code ${code} before responding`));
+      }
+    });
+  });
+}
+
+function percentile(values, q) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+}
+
+function summarize(runs) {
+  const summary = {};
+  for (const field of ['spawnMs', 'loadMs', 'firstReqMs', 'modules', 'rssMb']) {
+    const values = runs.map(run => run[field]);
+    summary[field] = {p50: percentile(values, 0.5), p95: percentile(values, 0.95)};
+  }
+  return summary;
+}
+
+async function main() {
+  const {runs, route, json} = parseArgs(process.argv.slice(2));
+  const results = Object.fromEntries(LAYOUTS.map(layout => [layout, []]));
+
+  // Interleave layouts so machine noise hits both equally
+  for (let i = 0; i < runs; i++) {
+    for (const layout of LAYOUTS) {
+      results[layout].push(await runOnce(layout, route));
+    }
+  }
+
+  const report = {route, runs, layouts: {}};
+  console.log(`Cold start, route ${route}, ${runs} runs per layout (p50 / p95)`);
+  for (const layout of LAYOUTS) {
+    const summary = summarize(results[layout]);
+    report.layouts[layout] = summary;
+    const cells = Object.entries(summary)
+      .map(([field, {p50, p95}]) => `${field} ${p50.toFixed(1)} / ${p95.toFixed(1)}`);
+    console.log(`  ${layout.padEnd(7)} ${cells.join('  ')}`);
+  }
+  if (json) {
+    fs.writeFileSync(json, JSON.stringify(report, null, 2) + '\\n');
+  }
+}
+
+main().catch(error => {
+  console.error(error.message);
+  process.exit(1);
+});
+""",
+
+    "functions/bench/fillers.js": """/**
+ * Filler-detection benchmark on 1-hour transcripts.
+ *
+ * Compares the original per-token scan (split on spaces, then
+ * fillerWords.includes for every token) with the compiled matcher in
+ * speech/fillers.js. Transcripts are synthetic practice sessions:
+ * `--wpm` words per minute for `--minutes`, with `--filler-rate` of the words
+ * being fillers, punctuation attached to words as speech recognition returns
+ * it. `--extra-fillers` adds made-up fillers to the list to show how each
+ * approach scales with the list length. Reported per approach: median ms per
+ * transcript, words per second and fillers found.
+ *
+ * Usage: node bench/fillers.js [--transcripts 20] [--minutes 60] [--wpm 150]
+ *        [--filler-rate 0.05] [--extra-fillers 0] [--json out.json]
+ */
+const fs = require('fs');
+const {performance} = require('perf_hooks');
+const {FILLER_WORDS, compileFillerMatcher, scanTranscript} = require('../speech/fillers');
+
+const WORDS = ['the', 'project', 'team', 'we', 'built', 'data', 'results', 'students', 'because',
+  'really', 'important', 'know', 'you', 'learned', 'design', 'next', 'time', 'would', 'improve'];
+
+function parseArgs(argv) {
+  const options = {'transcripts': 20, 'minutes': 60, 'wpm': 150, 'filler-rate': 0.05,
+    'extra-fillers': 0, 'json': null};
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '');
+    if (!(key in options)) {
+      throw new Error(`Unknown option ${argv[i]}`);
+    }
+    options[key] = key === 'json' ? argv[i + 1] : Number(argv[i + 1]);
+  }
+  return options;
+}
+
+// Small deterministic PRNG so every run benchmarks the same text
+function random(seed) {
+  return () => {
+    seed = (seed * 1664525 + 1013904223) >>> 0;
+    return seed / 4294967296;
+  };
+}
+
+function makeTranscript(seed, {minutes, wpm, 'filler-rate': fillerRate}) {
+  const next = random(seed);
+  const parts = [];
+  for (let i = 0; i < minutes * wpm; i++) {
+    let word = next() < fillerRate ?
+      FILLER_WORDS[Math.floor(next() * FILLER_WORDS.length)] :
+      WORDS[Math.floor(next() * WORDS.length)];
+    const mark = next();
+    if (mark < 0.06) {
+      word += '.';
+    } else if (mark < 0.1) {
+      word += ',';
+    }
+    parts.push(i === 0 || parts[i - 1].endsWith('.') ? word[0].toUpperCase() + word.slice(1) : word);
+  }
+  return parts.join(' ');
+}
+
+const approaches = {
+  // The analyzeTranscript implementation this replaces
+  includes(transcript, fillerWords) {
+    const words = transcript.split(' ');
+    return words.filter(word => fillerWords.includes(word.toLowerCase())).length;
+  },
+  // speech/fillers.js, which also counts words and sentences in the same pass
+  compiled(transcript, fillerWords, matcher) {
+    return scanTranscript(transcript, matcher).fillers;
+  },
+};
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+function main() {
+  const options = parseArgs(process.argv.slice(2));
+  const fillerWords = [...FILLER_WORDS];
+  for (let i = 0; i < options['extra-fillers']; i++) {
+    fillerWords.push(i % 2 ? `filler${i}` : `filler phrase${i}`);
+  }
+  const matcher = compileFillerMatcher(fillerWords);
+  const transcripts = Array.from({length: options.transcripts}, (_, i) => makeTranscript(i + 1, options));
+  const words = options.minutes * options.wpm;
+
+  const report = {...options, fillerWords: fillerWords.length, approaches: {}};
+  console.log(`${options.transcripts} transcripts of ${options.minutes} min (${words} words), ` +
+    `${fillerWords.length} fillers in the list`);
+  for (const [name, count] of Object.entries(approaches)) {
+    count(transcripts[0], fillerWords, matcher); // warm up the JIT
+    const times = [];
+    let found = 0;
+    for (const transcript of transcripts) {
+      const started = performance.now();
+      found += count(transcript, fillerWords, matcher);
+      times.push(performance.now() - started);
+    }
+    const ms = median(times);
+    report.approaches[name] = {msPerTranscript: ms, wordsPerSec: words / (ms / 1000), fillersFound: found};
+    console.log(`  ${name.padEnd(9)} ${ms.toFixed(2)} ms/transcript  ` +
+      `${Math.round(words / (ms / 1000)).toLocaleString()} words/s  ${found} fillers found`);
+  }
+  if (options.json) {
+    fs.writeFileSync(options.json, JSON.stringify(report, null, 2) + '\\n');
+  }
+}
+
+main();
+""",
+
+    "functions/jobQueue.js": """/**
+ * In-process stand-in for the Firestore-triggered job worker.
+ *
+ * Used when GENERATION_JOBS=local (e.g. the Functions emulator running
+ * without the Firestore emulator's triggers): job IDs pushed here are run
+ * in this instance, at most `concurrency` at a time.
+ */
+function createLocalJobQueue({run, concurrency = 2}) {
+  const pending = [];
+  let active = 0;
+
+  function drain() {
+    while (active < concurrency && pending.length) {
+      const jobId = pending.shift();
+      active += 1;
+      Promise.resolve()
+        .then(() => run(jobId))
+        .catch(error => console.error('Local job failed:', jobId, error))
+        .finally(() => {
+          active -= 1;
+          drain();
+        });
+    }
+  }
+
+  return {
+    push(jobId) {
+      pending.push(jobId);
+      drain();
+    },
+    stats: () => ({pending: pending.length, active}),
+  };
+}
+
+module.exports = {createLocalJobQueue};
+""",
+
+    "functions/batchWriter.js": """/**
+ * Shared write-behind queue for Firestore documents.
+ *
+ * Handlers pre-allocate a document reference and queue the write with
+ * `set`, so concurrent requests share commits. Queued writes are committed
+ * in batches once `maxBatchSize` are pending or `flushIntervalMs` after the
+ * first one was queued. A failed batch is retried document by document with
+ * exponential backoff; after `maxAttempts` the write is stored in the
+ * dead-letter collection instead of being dropped.
+ *
+ * `set` resolves (never rejects) with `{ok, attempts}` once the write is
+ * committed or dead-lettered; `wait` bounds how long a caller waits for it.
+ */
+class BatchWriter {
+  constructor({firestore, maxBatchSize = 100, flushIntervalMs = 200, maxAttempts = 4,
+    baseRetryMs = 250, deadLetterCollection = 'failedWrites', waitMs = 10000}) {
+    // Firestore is resolved on first flush, so the writer is free to create
+    this.firestore = typeof firestore === 'function' ? firestore : () => firestore;
+    this.maxBatchSize = Math.min(maxBatchSize, 500);
+    this.flushIntervalMs = flushIntervalMs;
+    this.maxAttempts = maxAttempts;
+    this.baseRetryMs = baseRetryMs;
+    this.deadLetterCollection = deadLetterCollection;
+    this.waitMs = waitMs;
+    this.pending = [];
+    this.timer = null;
+    this.counters = {queued: 0, written: 0, batches: 0, retries: 0, deadLettered: 0, lost: 0, timedOut: 0};
+  }
+
+  set(ref, data) {
+    this.counters.queued += 1;
+    return new Promise(resolve => {
+      this.enqueue({ref, data, attempts: 0, isolated: false, resolve});
+    });
+  }
+
+  // Resolves with the outcome of `written` (a `set` result), or with
+  // `{ok: false, timedOut: true}` after `timeoutMs`; the write carries on
+  wait(written, timeoutMs = this.waitMs) {
+    let timer;
+    const timeout = new Promise(resolve => {
+      timer = setTimeout(() => {
+        this.counters.timedOut += 1;
+        console.warn('Still waiting for a Firestore write', JSON.stringify({timeoutMs}));
+        resolve({ok: false, timedOut: true});
+      }, timeoutMs);
+    });
+    return Promise.race([written, timeout]).finally(() => clearTimeout(timer));
+  }
+
+  enqueue(write) {
+    this.pending.push(write);
+    if (this.pending.length >= this.maxBatchSize) {
+      this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.flushIntervalMs);
+    }
+  }
+
+  // Commits everything queued so far; resolves when those commits settle
+  flush() {
+    clearTimeout(this.timer);
+    this.timer = null;
+    const writes = this.pending.splice(0);
+    const batched = writes.filter(write => !write.isolated);
+    const commits = [];
+    for (let i = 0; i < batched.length; i += this.maxBatchSize) {
+      commits.push(this.commitBatch(batched.slice(i, i + this.maxBatchSize)));
+    }
+    // Writes that already failed in a batch go alone, so one bad document
+    // cannot keep failing the others
+    writes.filter(write => write.isolated).forEach(write => commits.push(this.commitBatch([write])));
+    return Promise.all(commits);
+  }
+
+  async commitBatch(writes) {
+    writes.forEach(write => {
+      write.attempts += 1;
+    });
+    try {
+      const batch = this.firestore().batch();
+      writes.forEach(write => batch.set(write.ref, write.data));
+      await batch.commit();
+      this.counters.batches += 1;
+      this.counters.written += writes.length;
+      writes.forEach(write => write.resolve({ok: true, attempts: write.attempts}));
+    } catch (error) {
+      writes.forEach(write => this.retry(write, error));
+    }
+  }
+
+  retry(write, error) {
+    if (write.attempts >= this.maxAttempts) {
+      return this.deadLetter(write, error);
+    }
+    this.counters.retries += 1;
+    write.isolated = true;
+    const delay = Math.random() * this.baseRetryMs * 2 ** write.attempts;
+    setTimeout(() => this.enqueue(write), delay);
+  }
+
+  async deadLetter(write, error) {
+    console.error('Firestore write failed, dead-lettering', JSON.stringify({
+      path: write.ref.path, attempts: write.attempts, error: error.message,
+    }));
+    try {
+      await this.firestore().collection(this.deadLetterCollection).add({
+        path: write.ref.path,
+        data: write.data,
+        error: error.message,
+        attempts: write.attempts,
+        failedAt: new Date(),
+      });
+      this.counters.deadLettered += 1;
+    } catch (deadLetterError) {
+      // Last resort: the full document goes to the logs
+      this.counters.lost += 1;
+      console.error('Dead-letter write failed', deadLetterError.message, JSON.stringify({
+        path: write.ref.path, data: write.data,
+      }));
+    }
+    write.resolve({ok: false, attempts: write.attempts});
+  }
+
+  stats() {
+    return {...this.counters, pending: this.pending.length};
+  }
+}
+
+module.exports = {BatchWriter};
+""",
+
+    "functions/pdf/templates.js": """/**
+ * Print templates for the PDF renderer.
+ *
+ * Each template is compiled once at load: its stylesheet is baked into a
+ * static HTML shell that pooled pages keep loaded, and `body(data)` renders
+ * only the document body. Switching data on a warm page therefore costs one
+ * innerHTML assignment instead of a full page load.
+ */
+const ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+
+function escapeHtml(value) {
+  return String(value ?? '').replace(/[&<>"']/g, char => ESCAPES[char]);
+}
+
+function lines(value) {
+  return escapeHtml(value).replace(/\\n/g, '<br>');
+}
+
+function list(items, render) {
+  return Array.isArray(items) ? items.map(render).join('') : '';
+}
+
+const money = value => Number(value || 0).toFixed(2);
+
+const BASE_CSS = `
+  * { box-sizing: border-box; margin: 0; padding: 0; }
+  body { font-family: 'Helvetica Neue', Arial, sans-serif; font-size: 11pt; color: #111827; line-height: 1.45; }
+  h1 { font-size: 24pt; }
+  h2 { font-size: 12pt; margin: 18px 0 6px; }
+  ul { padding-left: 18px; }
+  .muted { color: #6b7280; }
+`;
+
+function resumeSections(data) {
+  return `
+    ${data.summary ? `<section><h2>Summary</h2><p>${lines(data.summary)}</p></section>` : ''}
+    ${data.experience?.length ? `<section><h2>Experience</h2>${list(data.experience, job => `
+      <div class="entry">
+        <div class="entry-head"><strong>${escapeHtml(job.title)}</strong><span class="muted">${escapeHtml(job.period)}</span></div>
+        <div class="muted">${escapeHtml(job.company)}</div>
+        <p>${lines(job.description)}</p>
+      </div>`)}</section>` : ''}
+    ${data.education?.length ? `<section><h2>Education</h2>${list(data.education, school => `
+      <div class="entry">
+        <div class="entry-head"><strong>${escapeHtml(school.degree)}</strong><span class="muted">${escapeHtml(school.year)}</span></div>
+        <div class="muted">${escapeHtml(school.school)}</div>
+      </div>`)}</section>` : ''}
+    ${data.projects?.length ? `<section><h2>Projects</h2>${list(data.projects, project => `
+      <div class="entry"><strong>${escapeHtml(project.name)}</strong><p>${lines(project.description)}</p></div>`)}</section>` : ''}
+    ${data.skills?.length ? `<section><h2>Skills</h2><p class="skills">${list(data.skills, skill => `<span>${escapeHtml(skill)}</span>`)}</p></section>` : ''}
+  `;
+}
+
+// Fields rendered as lists, and what each of their entries must be
+const LIST_FIELDS = {experience: 'objects', education: 'objects', projects: 'objects', items: 'objects', skills: 'strings'};
+
+const isRecord = value => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+// Why `data` cannot be rendered, or null when its shape is fine
+function dataError(data) {
+  if (!isRecord(data)) {
+    return 'data must be an object';
+  }
+  for (const [field, entries] of Object.entries(LIST_FIELDS)) {
+    const value = data[field];
+    if (value === undefined || value === null) {
+      continue;
+    }
+    const valid = entries === 'objects' ? isRecord : entry => entry === null || typeof entry !== 'object';
+    if (!Array.isArray(value) || !value.every(valid)) {
+      return `${field} must be an array of ${entries}`;
+    }
+  }
+  return null;
+}
+
+function contactLine(data) {
+  return [data.email, data.phone, data.location].filter(Boolean).map(escapeHtml).join(' &middot; ');
+}
+
+const TEMPLATES = {
+  invoice: {
+    filename: data => `${data.invoiceNumber || 'invoice'}.pdf`,
+    css: `
+      body { padding: 48px; }
+      header { display: flex; justify-content: space-between; margin-bottom: 32px; }
+      .parties { display: flex; justify-content: space-between; margin-bottom: 32px; }
+      table { width: 100%; border-collapse: collapse; }
+      th { text-align: left; border-bottom: 2px solid #111827; padding: 6px 4px; font-size: 9pt; text-transform: uppercase; }
+      td { border-bottom: 1px solid #e5e7eb; padding: 6px 4px; }
+      .num { text-align: right; }
+      .total td { border: none; font-weight: bold; font-size: 13pt; padding-top: 12px; }
+    `,
+    body: data => {
+      const items = Array.isArray(data.items) ? data.items : [];
+      const total = items.reduce((sum, item) => sum + Number(item.quantity || 0) * Number(item.rate || 0), 0);
+      return `
+        <header>
+          <div><h1>Invoice</h1><p class="muted">${escapeHtml(data.invoiceNumber)}</p></div>
+          <div class="num"><p>Date: ${escapeHtml(data.date)}</p>${data.dueDate ? `<p>Due: ${escapeHtml(data.dueDate)}</p>` : ''}</div>
+        </header>
+        <div class="parties">
+          <div><h2>From</h2><p><strong>${escapeHtml(data.companyName)}</strong></p><p>${lines(data.companyAddress)}</p></div>
+          <div><h2>Bill To</h2><p><strong>${escapeHtml(data.clientName)}</strong></p><p>${lines(data.clientAddress)}</p></div>
+        </div>
+        <table>
+          <thead><tr><th>Description</th><th class="num">Qty</th><th class="num">Rate</th><th class="num">Amount</th></tr></thead>
+          <tbody>${list(items, item => `
+            <tr>
+              <td>${escapeHtml(item.description)}</td>
+              <td class="num">${escapeHtml(item.quantity)}</td>
+              <td class="num">${money(item.rate)}</td>
+              <td class="num">${money(Number(item.quantity || 0) * Number(item.rate || 0))}</td>
+            </tr>`)}
+            <tr class="total"><td colspan="3" class="num">Total</td><td class="num">$${money(total)}</td></tr>
+          </tbody>
+        </table>
+      `;
+    },
+  },
+
+  'resume-professional': {
+    filename: data => `${data.name || 'resume'}.pdf`,
+    css: `
+      body { padding: 40px 48px; }
+      header { border-bottom: 2px solid #1d4ed8; padding-bottom: 10px; }
+      h2 { color: #1d4ed8; text-transform: uppercase; letter-spacing: 0.05em; }
+      .entry { margin-bottom: 8px; }
+      .entry-head { display: flex; justify-content: space-between; }
+      .skills span:not(:last-child)::after { content: ' · '; }
+    `,
+    body: data => `
+      <header><h1>${escapeHtml(data.name)}</h1><p class="muted">${contactLine(data)}</p></header>
+      ${resumeSections(data)}
+    `,
+  },
+
+  'resume-creative': {
+    filename: data => `${data.name || 'resume'}.pdf`,
+    css: `
+      body { display: flex; min-height: 100vh; }
+      aside { width: 32%; background: #4c1d95; color: #f5f3ff; padding: 40px 24px; }
+      aside h1 { font-size: 22pt; line-height: 1.1; margin-bottom: 12px; }
+      aside p { font-size: 9.5pt; word-break: break-word; }
+      main { width: 68%; padding: 40px 32px; }
+      h2 { color: #7c3aed; }
+      .entry { margin-bottom: 8px; }
+      .entry-head { display: flex; justify-content: space-between; }
+      .skills span { display: inline-block; background: #ede9fe; color: #4c1d95; border-radius: 10px; padding: 1px 8px; margin: 0 4px 4px 0; font-size: 9pt; }
+    `,
+    body: data => `
+      <aside><h1>${escapeHtml(data.name)}</h1><p>${[data.email, data.phone, data.location].filter(Boolean).map(escapeHtml).join('<br>')}</p></aside>
+      <main>${resumeSections(data)}</main>
+    `,
+  },
+
+  'resume-academic': {
+    filename: data => `${data.name || 'cv'}.pdf`,
+    css: `
+      body { padding: 48px 56px; font-family: Georgia, 'Times New Roman', serif; }
+      header { text-align: center; margin-bottom: 12px; }
+      h1 { font-size: 20pt; font-weight: normal; font-variant: small-caps; }
+      h2 { font-size: 11pt; border-bottom: 1px solid #111827; font-variant: small-caps; }
+      .entry { margin-bottom: 6px; }
+      .entry-head { display: flex; justify-content: space-between; }
+      .skills span:not(:last-child)::after { content: '; '; }
+    `,
+    body: data => `
+      <header><h1>${escapeHtml(data.name)}</h1><p>${contactLine(data)}</p></header>
+      ${resumeSections(data)}
+    `,
+  },
+};
+
+// Compile: build each template's static shell once
+for (const template of Object.values(TEMPLATES)) {
+  template.shell = `<!DOCTYPE html><html><head><meta charset="utf-8"><style>${BASE_CSS}${template.css}</style></head><body></body></html>`;
+}
+
+module.exports = {TEMPLATES, dataError, escapeHtml};
+""",
+
+    "functions/pdf/pagePool.js": """/**
+ * Bounded pool of warm headless-browser pages.
+ *
+ * The browser is launched on first use and at most `size` pages are ever
+ * open; callers beyond that wait in FIFO order and are handed released pages
+ * directly. Pages are reused across renders (an idle page matching `prefer`
+ * is picked first), and a crashed browser is relaunched on the next acquire.
+ */
+function createPagePool({launch, size = 4}) {
+  let browser = null;
+  const idle = [];
+  const waiters = [];
+  let open = 0;
+  const stats = {acquired: 0, waited: 0, pagesCreated: 0, launches: 0};
+
+  async function getBrowser() {
+    if (!browser) {
+      stats.launches += 1;
+      browser = launch().then(instance => {
+        instance.on('disconnected', () => {
+          browser = null;
+          // Idle pages died with the browser; checked-out ones are counted
+          // down as they are released
+          open -= idle.length;
+          idle.length = 0;
+        });
+        return instance;
+      }, error => {
+        browser = null;
+        throw error;
+      });
+    }
+    return browser;
+  }
+
+  // The caller has already counted the page in `open`
+  async function newPage() {
+    try {
+      const created = await (await getBrowser()).newPage();
+      stats.pagesCreated += 1;
+      return created;
+    } catch (error) {
+      open -= 1;
+      throw error;
+    }
+  }
+
+  async function acquire(prefer) {
+    const preferred = prefer ? idle.findIndex(prefer) : -1;
+    const page = preferred === -1 ? idle.pop() : idle.splice(preferred, 1)[0];
+    if (page && !page.isClosed()) {
+      return page;
+    }
+    if (page) {
+      open -= 1;
+    }
+    if (open < size) {
+      open += 1;
+      return newPage();
+    }
+    stats.waited += 1;
+    return new Promise(resolve => waiters.push(resolve));
+  }
+
+  // `broken` pages (e.g. after a render timeout) are closed rather than reused
+  function release(page, {broken = false} = {}) {
+    const reusable = !broken && !page.isClosed();
+    if (!reusable) {
+      page.close().catch(() => {});
+    }
+    const next = waiters.shift();
+    if (next) {
+      // Straight to the longest waiter, so a newer caller cannot take it
+      // first; a page that cannot be reused passes its slot to a new one
+      next(reusable ? page : newPage());
+    } else if (reusable) {
+      idle.push(page);
+    } else {
+      open -= 1;
+    }
+  }
+
+  async function withPage(fn, {prefer} = {}) {
+    stats.acquired += 1;
+    const page = await acquire(prefer);
+    try {
+      const result = await fn(page);
+      release(page);
+      return result;
+    } catch (error) {
+      release(page, {broken: true});
+      throw error;
+    }
+  }
+
+  return {
+    withPage,
+    stats: () => ({...stats, size, open, idle: idle.length, waiting: waiters.length}),
+  };
+}
+
+module.exports = {createPagePool};
+""",
+
+    "functions/pdf/renderer.js": """const {Histogram, LATENCY_BUCKETS_MS} = require('../inference/metrics');
+const {createPagePool} = require('./pagePool');
+const {TEMPLATES} = require('./templates');
+
+const LAUNCH_ARGS = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage'];
+
+/**
+ * Renders the templates in ./templates to PDF on pooled puppeteer pages.
+ *
+ * A page remembers which template shell it has loaded, so consecutive
+ * renders of the same template only replace the body. Render latency is
+ * tracked per template.
+ */
+function createPdfRenderer({poolSize = 4, timeoutMs = 20000} = {}) {
+  const pool = createPagePool({
+    size: poolSize,
+    launch: () => require('puppeteer').launch({headless: 'new', args: LAUNCH_ARGS}),
+  });
+  const latency = Object.fromEntries(
+    Object.keys(TEMPLATES).map(id => [id, new Histogram(LATENCY_BUCKETS_MS)]));
+  const failures = Object.fromEntries(Object.keys(TEMPLATES).map(id => [id, 0]));
+
+  async function render(templateId, data) {
+    const template = TEMPLATES[templateId];
+    const started = Date.now();
+    try {
+      const pdf = await pool.withPage(async page => {
+        page.setDefaultTimeout(timeoutMs);
+        if (page.templateId !== templateId) {
+          await page.setContent(template.shell, {waitUntil: 'load'});
+          page.templateId = templateId;
+        }
+        await page.evaluate(html => {
+          document.body.innerHTML = html;
+        }, template.body(data));
+        return page.pdf({format: 'A4', printBackground: true, timeout: timeoutMs});
+      }, {prefer: page => page.templateId === templateId});
+      latency[templateId].observe(Date.now() - started);
+      return {pdf, filename: template.filename(data)};
+    } catch (error) {
+      failures[templateId] += 1;
+      throw error;
+    }
+  }
+
+  return {
+    render,
+    templates: Object.keys(TEMPLATES),
+    stats: () => ({
+      pool: pool.stats(),
+      templates: Object.fromEntries(Object.keys(TEMPLATES).map(id => [id, {
+        failures: failures[id],
+        latencyMs: latency[id].snapshot(),
+      }])),
+    }),
+  };
+}
+
+module.exports = {createPdfRenderer};
+""",
+
+    "functions/.puppeteerrc.cjs": """const {join} = require('path');
+
+// Keep the downloaded browser inside the functions source so it ships with the deploy
+module.exports = {
+  cacheDirectory: join(__dirname, '.cache', 'puppeteer'),
+};
+""",
+
+    "functions/speech/fillers.js": """/**
+ * Filler-word detection for speech analysis.
+ *
+ * FILLER_WORDS is the single list of fillers. It is compiled into a trie
+ * keyed by word, so multi-word fillers ("you know") are matched the same way
+ * as single words. A transcript is tokenized once (punctuation is not part of
+ * a word, so "um," counts) and scanned left to right: at each word the
+ * longest filler starting there is counted and the scan resumes after it.
+ * Matches never overlap or cross a sentence end, and the cost is linear in
+ * the number of words.
+ */
+const FILLER_WORDS = ['um', 'uh', 'like', 'you know', 'so', 'actually'];
+
+// Words (letters and digits, with inner apostrophes) and runs of sentence-ending punctuation
+const TOKEN_PATTERN = /[\\p{L}\\p{N}]+(?:['’][\\p{L}\\p{N}]+)*|[.!?]+/gu;
+
+function compileFillerMatcher(phrases = FILLER_WORDS) {
+  const root = {next: new Map(), phrase: null};
+  let longest = 0;
+  for (const phrase of phrases) {
+    const words = phrase.toLowerCase().split(/\\s+/).filter(Boolean);
+    let node = root;
+    for (const word of words) {
+      if (!node.next.has(word)) {
+        node.next.set(word, {next: new Map(), phrase: null});
+      }
+      node = node.next.get(word);
+    }
+    node.phrase = words.join(' ');
+    longest = Math.max(longest, words.length);
+  }
+
+  return {
+    longest,
+    // Words that can start a filler, for a quick check before walking the trie
+    starts: root.next,
+    // Number of words in the longest filler starting at words[start], 0 if none
+    matchAt(words, start) {
+      let node = root;
+      let matched = 0;
+      for (let i = start; i < words.length && i - start < longest; i++) {
+        node = node.next.get(words[i]);
+        if (!node) {
+          break;
+        }
+        if (node.phrase) {
+          matched = i - start + 1;
+        }
+      }
+      return matched;
+    },
+    // Whether words[start..] runs out while still on the way to a longer filler
+    continuesPast(words, start) {
+      let node = root;
+      for (let i = start; i < words.length; i++) {
+        node = node.next.get(words[i]);
+        if (!node) {
+          return false;
+        }
+      }
+      return node.next.size > 0;
+    },
+  };
+}
+
+const defaultMatcher = compileFillerMatcher();
+
+// Lower-cased words and sentence terminators, in order
+function tokenize(text) {
+  return String(text || '').toLowerCase().match(TOKEN_PATTERN) || [];
+}
+
+function isSentenceBreak(token) {
+  return token[0] === '.' || token[0] === '!' || token[0] === '?';
+}
+
+// Word, filler and sentence counts of a transcript, in one pass over its tokens
+function scanTranscript(text, matcher = defaultMatcher) {
+  const tokens = tokenize(text);
+  let words = 0;
+  let fillers = 0;
+  let sentenceBreaks = 0;
+  let matchedUntil = 0;
+  for (let i = 0; i < tokens.length; i++) {
+    if (isSentenceBreak(tokens[i])) {
+      sentenceBreaks += 1;
+      continue;
+    }
+    words += 1;
+    if (i >= matchedUntil && matcher.starts.has(tokens[i])) {
+      const matched = matcher.matchAt(tokens, i);
+      if (matched) {
+        fillers += 1;
+        matchedUntil = i + matched;
+      }
+    }
+  }
+  // Text after the last terminator counts as a sentence, as with split(/[.!?]+/)
+  return {words, fillers, sentences: sentenceBreaks + 1};
+}
+
+module.exports = {FILLER_WORDS, compileFillerMatcher, defaultMatcher, tokenize, isSentenceBreak, scanTranscript};
+""",
+
+    "functions/speech/analyzer.js": """/**
+ * Incremental speech analysis for live practice sessions.
+ *
+ * A SpeechAnalyzer is fed the recognizer's final results as they arrive. It
+ * keeps running counts (words, fillers, sentence ends) and the words spoken
+ * in a rolling window, so each update costs O(new text) and the session's
+ * analysis is ready as soon as it ends. `state` is a plain object that can be
+ * stored between requests and passed back to the constructor.
+ *
+ * Fed a transcript piece by piece, it reports what analyzing the whole
+ * transcript at once reports: words at the end of one result that could
+ * begin a multi-word filler ("you") are held back until the next result
+ * shows whether the filler continues ("know").
+ */
+const {defaultMatcher, isSentenceBreak, scanTranscript, tokenize} = require('./fillers');
+
+const PACE_WINDOW_SECONDS = 30;
+
+class SpeechAnalyzer {
+  constructor(state = null, {matcher = defaultMatcher, windowSeconds = PACE_WINDOW_SECONDS} = {}) {
+    this.matcher = matcher;
+    this.windowSeconds = windowSeconds;
+    this.state = state || {
+      words: 0,
+      fillers: 0,
+      sentenceBreaks: 0,
+      // Tokens held back because a filler may continue into the next result
+      pending: [],
+      // Words per result within the pace window, oldest first
+      window: [],
+      windowWords: 0,
+      lastAt: 0,
+    };
+  }
+
+  // Add one final result, spoken `atSeconds` after the session started
+  push(text, atSeconds = this.state.lastAt) {
+    const state = this.state;
+    const fresh = tokenize(text);
+    let newWords = 0;
+    for (const token of fresh) {
+      if (isSentenceBreak(token)) {
+        state.sentenceBreaks += 1;
+      } else {
+        newWords += 1;
+      }
+    }
+    state.words += newWords;
+
+    // Only the new tokens (and any held back) are scanned for fillers
+    const tokens = state.pending.length ? state.pending.concat(fresh) : fresh;
+    state.pending = [];
+    for (let i = 0; i < tokens.length;) {
+      if (!this.matcher.starts.has(tokens[i])) {
+        i += 1;
+      } else if (tokens.length - i < this.matcher.longest && this.matcher.continuesPast(tokens, i)) {
+        state.pending = tokens.slice(i);
+        break;
+      } else {
+        const matched = this.matcher.matchAt(tokens, i);
+        state.fillers += matched ? 1 : 0;
+        i += matched || 1;
+      }
+    }
+
+    state.window.push({at: atSeconds, words: newWords});
+    state.windowWords += newWords;
+    while (state.window.length && state.window[0].at <= atSeconds - this.windowSeconds) {
+      state.windowWords -= state.window.shift().words;
+    }
+    state.lastAt = atSeconds;
+    return this;
+  }
+
+  // Words per minute over the last `windowSeconds`
+  currentWpm() {
+    const span = Math.min(this.windowSeconds, this.state.lastAt);
+    return span > 0 ? Math.round((this.state.windowWords / span) * 60) : 0;
+  }
+
+  analysis(duration = this.state.lastAt) {
+    const {words, fillers, sentenceBreaks, pending} = this.state;
+    // Held-back words end the transcript if nothing follows them
+    const trailing = pending.length ? scanTranscript(pending.join(' '), this.matcher).fillers : 0;
+    return summarize({words, fillers: fillers + trailing, sentences: sentenceBreaks + 1}, duration);
+  }
+}
+
+// The stored analysis for word, filler and sentence counts over `duration` seconds
+function summarize({words, fillers, sentences}, duration) {
+  const wpm = duration > 0 ? Math.round((words / duration) * 60) : 0;
+  return {
+    wpm: wpm,
+    fillerWords: fillers,
+    fillerPercentage: words ? Math.round((fillers / words) * 100) : 0,
+    totalWords: words,
+    avgWordsPerSentence: Math.round(words / sentences),
+    duration: duration,
+    feedback: generateFeedback(wpm, fillers, words),
+  };
+}
+
+function generateFeedback(wpm, fillerCount, totalWords) {
+  let feedback = [];
+  
+  if (wpm < 100) {
+    feedback.push("Try speaking a bit faster - aim for 120-150 WPM");
+  } else if (wpm > 180) {
+    feedback.push("Slow down slightly for better clarity");
+  } else {
+    feedback.push("Good speaking pace!");
+  }
+  
+  const fillerPercentage = (fillerCount / totalWords) * 100;
+  if (fillerPercentage > 5) {
+    feedback.push("Try to reduce filler words - practice pausing instead");
+  } else {
+    feedback.push("Great job minimizing filler words!");
   }
   
   return feedback;
-}""",
+}
+
+module.exports = {SpeechAnalyzer, summarize, generateFeedback, PACE_WINDOW_SECONDS};
+""",
 
     "functions/.eslintrc.js": """module.exports = {
   env: {
@@ -502,16 +2595,10 @@ function generateFeedback(wpm, fillerCount, totalWords) {
 };""",
 }
 
-# Write Firebase Functions files
-import os
-os.makedirs('functions', exist_ok=True)
+# Write Firebase Functions files (unchanged files are skipped)
+from orbitgen.emit import emit
 
-for filepath, content in functions_code.items():
-    if isinstance(content, dict):
-        with open(filepath, 'w') as f:
-            json.dump(content, f, indent=2)
-    else:
-        with open(filepath, 'w') as f:
-            f.write(content)
+if __name__ == '__main__':
+    emit(functions_code)
 
-print("✅ Created Firebase Functions")
\ No newline at end of file
+    print("✅ Created Firebase Functions")
\ No newline at end of file
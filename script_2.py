@@ -9,7 +9,7 @@ import { Toaster } from '@/components/ui/Toaster'
 const inter = Inter({ subsets: ['latin'] })
 
 export const metadata = {
-  title: 'ORBIT AI - Student Productivity Platform',
+  title: '{{ project_name }} - Student Productivity Platform',
   description: 'All-in-One Student Productivity & Skill Ecosystem',
 }
 
@@ -264,6 +264,110 @@ export { signInWithPopup, signOut, onAuthStateChanged }
 
 export default app""",
 
+    "lib/functions.js": """import { doc, onSnapshot } from 'firebase/firestore'
+import { db } from './firebase'
+
+// Base URL of the deployed Cloud Functions (override to use the emulator)
+export const FUNCTIONS_URL = process.env.NEXT_PUBLIC_FUNCTIONS_URL ||
+  `https://us-central1-${process.env.NEXT_PUBLIC_FIREBASE_PROJECT_ID}.cloudfunctions.net`
+
+export function functionUrl(name) {
+  return `${FUNCTIONS_URL}/${name}`
+}
+
+// POST a JSON body to an HTTP function and return its JSON response
+export async function callFunction(name, body) {
+  const response = await fetch(functionUrl(name), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  })
+  const data = await response.json()
+  if (!response.ok) {
+    throw new Error(data.error || `${name} failed with status ${response.status}`)
+  }
+  return data
+}
+
+// Render a server-side PDF template and save it in the browser
+export async function downloadPdf(template, data) {
+  const response = await fetch(functionUrl('renderPdf'), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ template, data })
+  })
+  if (!response.ok) {
+    throw new Error(`renderPdf failed with status ${response.status}`)
+  }
+  const filename = response.headers.get('Content-Disposition')?.match(/filename="([^"]+)"/)?.[1] || `${template}.pdf`
+  const url = URL.createObjectURL(await response.blob())
+  const link = document.createElement('a')
+  link.href = url
+  link.download = filename
+  link.click()
+  URL.revokeObjectURL(url)
+}
+
+// Start a function in async mode and resolve with the job result once the
+// worker has written it, instead of holding the request open
+export async function runJob(name, body, { onStatus } = {}) {
+  const { jobId } = await callFunction(name, { ...body, async: true })
+  return new Promise((resolve, reject) => {
+    const unsubscribe = onSnapshot(doc(db, 'generationJobs', jobId), (snapshot) => {
+      const job = snapshot.data()
+      if (!job) return
+      onStatus?.(job.status)
+      if (job.status === 'done') {
+        unsubscribe()
+        resolve(job.result)
+      } else if (job.status === 'failed') {
+        unsubscribe()
+        reject(new Error(job.error || `${name} job failed`))
+      }
+    }, (error) => {
+      unsubscribe()
+      reject(error)
+    })
+  })
+}
+
+// POST to a streaming function and call onEvent with each server-sent event's JSON payload
+export async function streamFunction(name, body, { onEvent, signal } = {}) {
+  const response = await fetch(functionUrl(name), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(body),
+    signal
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`${name} failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { value, done } = await reader.read()
+    buffer += decoder.decode(value, { stream: !done })
+    // Events are separated by a blank line; keep any partial event for the next chunk
+    const events = buffer.split(/\\r?\\n\\r?\\n/)
+    buffer = done ? '' : events.pop()
+    for (const event of events) {
+      const data = event
+        .split(/\\r?\\n/)
+        .filter(line => line.startsWith('data:'))
+        .map(line => line.slice(5).replace(/^ /, ''))
+        .join('\\n')
+      if (data) {
+        onEvent?.(JSON.parse(data))
+      }
+    }
+    if (done) {
+      break
+    }
+  }
+}""",
+
     # Main Dashboard Component
     "components/Dashboard.js": """'use client'
 import { useState } from 'react'
@@ -354,7 +458,7 @@ export default function LoginPage() {
           <div className="text-center">
             <div className="text-6xl mb-4">🌌</div>
             <h1 className="text-3xl font-bold text-gray-900 mb-2">
-              ORBIT AI
+              {{ project_name }}
             </h1>
             <p className="text-gray-600 mb-8">
               All-in-One Student Productivity & Skill Ecosystem
@@ -415,7 +519,7 @@ export default function Sidebar({ currentModule, onNavigate }) {
   return (
     <div className="w-64 bg-white shadow-lg">
       <div className="flex items-center justify-center h-16 border-b border-gray-200">
-        <h1 className="text-xl font-bold text-gray-800">🌌 ORBIT AI</h1>
+        <h1 className="text-xl font-bold text-gray-800">🌌 {{ project_name }}</h1>
       </div>
       <nav className="mt-5">
         <div className="px-2">
@@ -520,6 +624,8 @@ export default function TopBar() {
 # Create directories and write files
 import os
 
+from orbitgen.emit import emit
+
 # Create directory structure
 directories = [
     'app', 'contexts', 'lib', 'components', 
@@ -527,12 +633,11 @@ directories = [
     'components/ui', 'hooks', 'utils', 'tests'
 ]
 
-for directory in directories:
-    os.makedirs(directory, exist_ok=True)
+if __name__ == '__main__':
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
 
-# Write Next.js files
-for filepath, content in nextjs_structure.items():
-    with open(filepath, 'w') as f:
-        f.write(content)
+    # Write Next.js files (unchanged files are skipped)
+    emit(nextjs_structure)
 
-print("✅ Created Next.js app structure and core components")
\ No newline at end of file
+    print("✅ Created Next.js app structure and core components")
\ No newline at end of file
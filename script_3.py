@@ -153,6 +153,7 @@ export default function DashboardHome({ onNavigate }) {
     "components/modules/ResumeBuilder.js": """'use client'
 import { useState } from 'react'
 import { useAuth } from '@/contexts/AuthContext'
+import { downloadPdf } from '@/lib/functions'
 
 const templates = [
   { id: 'professional', name: 'Professional', description: 'Clean, modern design perfect for corporate roles' },
@@ -165,6 +166,7 @@ export default function ResumeBuilder() {
   const [activeTab, setActiveTab] = useState('create')
   const [selectedTemplate, setSelectedTemplate] = useState('professional')
   const [loading, setLoading] = useState(false)
+  const [exporting, setExporting] = useState(false)
   const [formData, setFormData] = useState({
     name: user?.displayName || '',
     email: user?.email || '',
@@ -188,6 +190,18 @@ export default function ResumeBuilder() {
     }, 2000)
   }
 
+  const handleExport = async () => {
+    setExporting(true)
+    try {
+      await downloadPdf(`resume-${selectedTemplate}`, formData)
+    } catch (error) {
+      console.error('Resume export error:', error)
+      alert('Failed to export resume. Please try again.')
+    } finally {
+      setExporting(false)
+    }
+  }
+
   return (
     <div className="max-w-6xl mx-auto fade-in">
       <div className="mb-8">
@@ -295,6 +309,15 @@ export default function ResumeBuilder() {
               >
                 {loading ? 'Generating Resume...' : 'Generate Resume with AI'}
               </button>
+
+              <button
+                type="button"
+                onClick={handleExport}
+                disabled={exporting || !formData.name}
+                className="w-full bg-white text-blue-600 border border-blue-600 py-2 px-4 rounded-md hover:bg-blue-50 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {exporting ? 'Exporting PDF...' : `Export PDF (${templates.find(t => t.id === selectedTemplate)?.name} template)`}
+              </button>
             </form>
           )}
 
@@ -509,15 +532,25 @@ console.log(fibonacci(10));`)
     "components/modules/VoiceAssistant.js": """'use client'
 import { useState, useRef, useEffect } from 'react'
 import { MicrophoneIcon, StopIcon, PlayIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { callFunction } from '@/lib/functions'
+
+const SEGMENT_ATTEMPTS = 3
+const SEGMENT_RETRY_MS = 1000
+// Recognition errors that a restart cannot recover from
+const FATAL_RECOGNITION_ERRORS = ['not-allowed', 'service-not-allowed', 'audio-capture', 'network']
 
 export default function VoiceAssistant() {
+  const { user } = useAuth()
   const [isRecording, setIsRecording] = useState(false)
   const [transcript, setTranscript] = useState('')
+  const [liveAnalysis, setLiveAnalysis] = useState(null)
   const [analysis, setAnalysis] = useState(null)
   const [loading, setLoading] = useState(false)
   const [recordingTime, setRecordingTime] = useState(0)
   const recognitionRef = useRef(null)
   const timerRef = useRef(null)
+  const sessionRef = useRef(null)
 
   useEffect(() => {
     // Initialize speech recognition
@@ -526,7 +559,64 @@ export default function VoiceAssistant() {
       recognitionRef.current = new SpeechRecognition()
       recognitionRef.current.continuous = true
       recognitionRef.current.interimResults = true
-      
+    }
+  }, [])
+
+  // Each final result is sent as one segment, in order; the server adds just
+  // the new text to the session's running counts and returns the analysis so far.
+  // A failed segment is retried with the same sequence, which the server counts
+  // once. If it still fails, the counts are missing text, so the session is
+  // marked incomplete and finished from the full transcript instead
+  const sendSegment = (session, text) => {
+    const sequence = ++session.sequence
+    const offsetSeconds = (Date.now() - session.startedAt) / 1000
+    session.segments = session.segments
+      .then(async () => {
+        if (session.incomplete) return
+        for (let attempt = 1; ; attempt++) {
+          try {
+            const result = await callFunction('analyzeVoiceSegment', {
+              sessionId: session.id,
+              userId: user?.uid,
+              text,
+              sequence,
+              offsetSeconds
+            })
+            setLiveAnalysis(result.analysis)
+            return
+          } catch (error) {
+            if (attempt >= SEGMENT_ATTEMPTS) {
+              console.error('Live analysis error:', error)
+              session.incomplete = true
+              return
+            }
+            await new Promise((resolve) => setTimeout(resolve, SEGMENT_RETRY_MS * attempt))
+          }
+        }
+      })
+  }
+
+  const startRecording = () => {
+    if (recognitionRef.current) {
+      // Named up front, so a retried first segment reuses the same document
+      const session = {
+        id: crypto.randomUUID(),
+        sequence: 0,
+        startedAt: Date.now(),
+        transcript: '',
+        segments: Promise.resolve(),
+        recording: true,
+        incomplete: false,
+        error: null,
+        ended: false
+      }
+      sessionRef.current = session
+      setIsRecording(true)
+      setTranscript('')
+      setLiveAnalysis(null)
+      setAnalysis(null)
+      setRecordingTime(0)
+
       recognitionRef.current.onresult = (event) => {
         let finalTranscript = ''
         for (let i = event.resultIndex; i < event.results.length; i++) {
@@ -535,17 +625,29 @@ export default function VoiceAssistant() {
           }
         }
         if (finalTranscript) {
-          setTranscript(prev => prev + finalTranscript + ' ')
+          session.transcript += finalTranscript + ' '
+          setTranscript(session.transcript)
+          sendSegment(session, finalTranscript)
         }
       }
-    }
-  }, [])
-
-  const startRecording = () => {
-    if (recognitionRef.current) {
-      setIsRecording(true)
-      setTranscript('')
-      setRecordingTime(0)
+      recognitionRef.current.onerror = (event) => {
+        if (FATAL_RECOGNITION_ERRORS.includes(event.error)) {
+          session.error = event.error
+        }
+      }
+      // Chrome ends recognition by itself after a stretch of silence or when
+      // the connection drops; keep listening, or finish if it cannot go on
+      recognitionRef.current.onend = () => {
+        if (session.recording && !session.error) {
+          try {
+            recognitionRef.current.start()
+            return
+          } catch (error) {
+            console.error('Could not restart speech recognition:', error)
+          }
+        }
+        endSession(session)
+      }
       recognitionRef.current.start()
       
       // Start timer
@@ -556,57 +658,52 @@ export default function VoiceAssistant() {
   }
 
   const stopRecording = () => {
-    if (recognitionRef.current) {
+    const session = sessionRef.current
+    if (recognitionRef.current && session?.recording) {
+      // The last final result can arrive after stop(), so the session finishes once recognition ends
+      session.recording = false
       setIsRecording(false)
+      clearInterval(timerRef.current)
       recognitionRef.current.stop()
+    }
+  }
+
+  const endSession = (session) => {
+    if (session.ended) return
+    session.ended = true
+    session.recording = false
+    if (sessionRef.current === session) {
+      setIsRecording(false)
       clearInterval(timerRef.current)
-      analyzeTranscript()
     }
+    if (session.error) {
+      console.error('Speech recognition stopped:', session.error)
+    }
+    finishSession(session)
   }
 
-  const analyzeTranscript = async () => {
-    if (!transcript.trim()) return
+  const finishSession = async (session) => {
+    if (!session.transcript.trim()) return
     
     setLoading(true)
-    
-    // Simulate analysis
-    setTimeout(() => {
-      const words = transcript.split(' ').length
-      const wpm = Math.round((words / recordingTime) * 60)
-      const fillerWords = (transcript.match(/\\b(um|uh|like|you know|so|actually)\\b/gi) || []).length
-      const fillerPercentage = Math.round((fillerWords / words) * 100)
-      
-      setAnalysis({
-        wpm,
-        fillerWords,
-        fillerPercentage,
-        totalWords: words,
-        duration: recordingTime,
-        feedback: generateFeedback(wpm, fillerPercentage)
+    try {
+      // The session's counts are already up to date once its segments are in,
+      // unless one was lost and the transcript has to be analyzed in full
+      await session.segments
+      const result = await callFunction('analyzeVoice', {
+        sessionId: session.id,
+        incomplete: session.incomplete,
+        transcript: session.transcript.trim(),
+        duration: Math.max(1, Math.round((Date.now() - session.startedAt) / 1000)),
+        userId: user?.uid
       })
-      
+      setAnalysis(result.analysis)
+    } catch (error) {
+      console.error('Voice analysis error:', error)
+      alert('Failed to analyze your speech. Please try again.')
+    } finally {
       setLoading(false)
-    }, 2000)
-  }
-
-  const generateFeedback = (wpm, fillerPercentage) => {
-    const feedback = []
-    
-    if (wpm < 100) {
-      feedback.push("Try speaking a bit faster - aim for 120-150 WPM")
-    } else if (wpm > 180) {
-      feedback.push("Slow down slightly for better clarity")
-    } else {
-      feedback.push("Good speaking pace!")
-    }
-    
-    if (fillerPercentage > 5) {
-      feedback.push("Try to reduce filler words - practice pausing instead")
-    } else {
-      feedback.push("Great job minimizing filler words!")
     }
-    
-    return feedback
   }
 
   const formatTime = (seconds) => {
@@ -676,6 +773,38 @@ export default function VoiceAssistant() {
         </div>
 
         <div className="space-y-6">
+          {isRecording && liveAnalysis && (
+            <div className="bg-white rounded-lg shadow-sm border border-gray-200">
+              <div className="border-b border-gray-200 px-6 py-4">
+                <h3 className="text-lg font-medium text-gray-900">Live Feedback</h3>
+              </div>
+              <div className="p-6">
+                <div className="grid grid-cols-3 gap-4 mb-4">
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-blue-600">{liveAnalysis.currentWpm}</div>
+                    <div className="text-sm text-gray-600">WPM (last 30s)</div>
+                  </div>
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-orange-600">{liveAnalysis.fillerWords}</div>
+                    <div className="text-sm text-gray-600">Filler words</div>
+                  </div>
+                  <div className="text-center">
+                    <div className="text-2xl font-bold text-green-600">{liveAnalysis.totalWords}</div>
+                    <div className="text-sm text-gray-600">Total words</div>
+                  </div>
+                </div>
+                <ul className="space-y-1">
+                  {liveAnalysis.feedback.map((item, index) => (
+                    <li key={index} className="text-sm text-gray-600 flex items-start">
+                      <span className="text-blue-500 mr-2">•</span>
+                      {item}
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            </div>
+          )}
+
           {loading && (
             <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
               <div className="text-center">
@@ -753,9 +882,10 @@ export default function VoiceAssistant() {
 }"""
 }
 
-# Write module components
-for filepath, content in module_components.items():
-    with open(filepath, 'w') as f:
-        f.write(content)
+# Write module components (unchanged files are skipped)
+from orbitgen.emit import emit
+
+if __name__ == '__main__':
+    emit(module_components)
 
-print("✅ Created main module components (Dashboard, Resume, Code IDE, Voice)")
\ No newline at end of file
+    print("✅ Created main module components (Dashboard, Resume, Code IDE, Voice)")
\ No newline at end of file
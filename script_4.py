@@ -4,6 +4,8 @@ remaining_components = {
     "components/modules/DocumentDesigner.js": """'use client'
 import { useState } from 'react'
 import { DocumentIcon, DownloadIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { runJob } from '@/lib/functions'
 
 const templates = [
   { id: 'report', name: 'Business Report', description: 'Professional business report template' },
@@ -12,6 +14,7 @@ const templates = [
 ]
 
 export default function DocumentDesigner() {
+  const { user } = useAuth()
   const [activeTab, setActiveTab] = useState('create')
   const [selectedTemplate, setSelectedTemplate] = useState('report')
   const [loading, setLoading] = useState(false)
@@ -22,31 +25,28 @@ export default function DocumentDesigner() {
     documentType: 'report'
   })
   const [generatedContent, setGeneratedContent] = useState('')
+  const [jobStatus, setJobStatus] = useState(null)
 
   const handleGenerate = async (e) => {
     e.preventDefault()
     setLoading(true)
-    
-    // Simulate AI generation
-    setTimeout(() => {
-      setGeneratedContent(`# ${formData.title}
 
-## Executive Summary
-This document provides a comprehensive overview of ${formData.topic}.
-
-## Introduction
-[AI-generated introduction based on your outline]
-
-## Main Content
-${formData.outline.split('\\n').map(point => point.trim() ? `### ${point}\\n[Generated content for ${point}]` : '').join('\\n\\n')}
-
-## Conclusion
-[AI-generated conclusion summarizing key points]
-
-## Recommendations
-[AI-generated recommendations based on the content]`)
+    // Runs as a background job; the preview fills in when the job completes
+    try {
+      const result = await runJob('generateDocument', {
+        topic: formData.topic,
+        documentType: formData.documentType,
+        outline: formData.outline,
+        userId: user?.uid
+      }, { onStatus: setJobStatus })
+      setGeneratedContent(result.content)
+    } catch (error) {
+      console.error('Document generation error:', error)
+      alert('Failed to generate document. Please try again.')
+    } finally {
+      setJobStatus(null)
       setLoading(false)
-    }, 2000)
+    }
   }
 
   return (
@@ -134,7 +134,7 @@ ${formData.outline.split('\\n').map(point => point.trim() ? `### ${point}\\n[Gen
                     disabled={loading}
                     className="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50"
                   >
-                    {loading ? 'Generating Document...' : 'Generate with AI'}
+                    {loading ? (jobStatus === 'queued' ? 'Queued...' : 'Generating Document...') : 'Generate with AI'}
                   </button>
                 </form>
               </div>
@@ -187,8 +187,10 @@ ${formData.outline.split('\\n').map(point => point.trim() ? `### ${point}\\n[Gen
 
     "components/modules/InvoiceGenerator.js": """'use client'
 import { useState } from 'react'
+import { downloadPdf } from '@/lib/functions'
 
 export default function InvoiceGenerator() {
+  const [exporting, setExporting] = useState(false)
   const [formData, setFormData] = useState({
     companyName: '',
     companyAddress: '',
@@ -232,8 +234,16 @@ export default function InvoiceGenerator() {
     return formData.items.reduce((total, item) => total + item.amount, 0).toFixed(2)
   }
 
-  const generateInvoice = () => {
-    alert('Invoice PDF would be generated and downloadable')
+  const generateInvoice = async () => {
+    setExporting(true)
+    try {
+      await downloadPdf('invoice', formData)
+    } catch (error) {
+      console.error('Invoice export error:', error)
+      alert('Failed to generate invoice PDF. Please try again.')
+    } finally {
+      setExporting(false)
+    }
   }
 
   return (
@@ -399,9 +409,10 @@ export default function InvoiceGenerator() {
           <div className="flex justify-center">
             <button
               onClick={generateInvoice}
-              className="bg-green-600 text-white px-8 py-3 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500"
+              disabled={exporting}
+              className="bg-green-600 text-white px-8 py-3 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500 disabled:opacity-50"
             >
-              Generate Invoice PDF
+              {exporting ? 'Generating PDF...' : 'Generate Invoice PDF'}
             </button>
           </div>
         </div>
@@ -461,16 +472,116 @@ export default function PortfolioGenerator() {
 }""",
 
     "components/modules/PresentationDesigner.js": """'use client'
+import { useState } from 'react'
+import { PresentationChartBarIcon } from '@heroicons/react/24/outline'
+import { useAuth } from '@/contexts/AuthContext'
+import { runJob } from '@/lib/functions'
+
 export default function PresentationDesigner() {
+  const { user } = useAuth()
+  const [loading, setLoading] = useState(false)
+  const [jobStatus, setJobStatus] = useState(null)
+  const [formData, setFormData] = useState({
+    topic: '',
+    audience: 'students',
+    slideCount: 5
+  })
+  const [slides, setSlides] = useState([])
+
+  const handleGenerate = async (e) => {
+    e.preventDefault()
+    setLoading(true)
+
+    // Runs as a background job; slides appear when the job completes
+    try {
+      const result = await runJob('generatePresentation', {
+        ...formData,
+        userId: user?.uid
+      }, { onStatus: setJobStatus })
+      setSlides(result.slides)
+    } catch (error) {
+      console.error('Presentation generation error:', error)
+      alert('Failed to generate presentation. Please try again.')
+    } finally {
+      setJobStatus(null)
+      setLoading(false)
+    }
+  }
+
   return (
     <div className="max-w-4xl mx-auto fade-in">
       <div className="mb-8">
         <h1 className="text-3xl font-bold text-gray-900">Presentation Designer</h1>
         <p className="mt-2 text-gray-600">Create engaging presentations with AI</p>
       </div>
+
       <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
-        <p className="text-gray-600">Presentation designer interface coming soon...</p>
+        <form onSubmit={handleGenerate} className="grid grid-cols-1 md:grid-cols-3 gap-4">
+          <div className="md:col-span-3">
+            <label className="block text-sm font-medium text-gray-700">Topic</label>
+            <input
+              type="text"
+              value={formData.topic}
+              onChange={(e) => setFormData({...formData, topic: e.target.value})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+              required
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700">Audience</label>
+            <input
+              type="text"
+              value={formData.audience}
+              onChange={(e) => setFormData({...formData, audience: e.target.value})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700">Slides</label>
+            <input
+              type="number"
+              min={1}
+              max={20}
+              value={formData.slideCount}
+              onChange={(e) => setFormData({...formData, slideCount: Number(e.target.value)})}
+              className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+            />
+          </div>
+
+          <div className="flex items-end">
+            <button
+              type="submit"
+              disabled={loading}
+              className="w-full bg-blue-600 text-white py-2 px-4 rounded-md hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 disabled:opacity-50"
+            >
+              {loading ? (jobStatus === 'queued' ? 'Queued...' : 'Generating Slides...') : 'Generate with AI'}
+            </button>
+          </div>
+        </form>
       </div>
+
+      {slides.length > 0 ? (
+        <div className="mt-6 grid grid-cols-1 md:grid-cols-2 gap-4">
+          {slides.map((slide, index) => (
+            <div key={index} className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
+              <p className="text-xs text-gray-500 mb-1">Slide {index + 1}</p>
+              <h3 className="text-lg font-semibold text-gray-900 mb-3">{slide.title}</h3>
+              <ul className="list-disc list-inside space-y-1 text-sm text-gray-700">
+                {slide.content.map((point, i) => (
+                  <li key={i}>{point}</li>
+                ))}
+              </ul>
+            </div>
+          ))}
+        </div>
+      ) : (
+        <div className="mt-6 text-center text-gray-500">
+          <PresentationChartBarIcon className="w-12 h-12 mx-auto text-gray-300 mb-2" />
+          <p>Generated slides will appear here...</p>
+        </div>
+      )}
     </div>
   )
 }""",
@@ -491,24 +602,119 @@ export default function ChatRooms() {
 }""",
 
     "components/modules/AIChat.js": """'use client'
+import { useEffect, useRef, useState } from 'react'
+import { PaperAirplaneIcon } from '@heroicons/react/24/outline'
+import { streamFunction } from '@/lib/functions'
+
 export default function AIChat() {
+  const [messages, setMessages] = useState([])
+  const [input, setInput] = useState('')
+  const [streaming, setStreaming] = useState(false)
+  const controllerRef = useRef(null)
+  const endRef = useRef(null)
+
+  useEffect(() => {
+    endRef.current?.scrollIntoView({ behavior: 'smooth' })
+  }, [messages])
+
+  useEffect(() => () => controllerRef.current?.abort(), [])
+
+  // Replace the text of the last (assistant) message
+  const updateReply = (update) => {
+    setMessages(prev => [...prev.slice(0, -1), { ...prev[prev.length - 1], ...update(prev[prev.length - 1]) }])
+  }
+
+  const handleSend = async (e) => {
+    e.preventDefault()
+    const message = input.trim()
+    if (!message || streaming) return
+
+    setInput('')
+    setStreaming(true)
+    setMessages(prev => [...prev, { role: 'user', text: message }, { role: 'assistant', text: '' }])
+
+    const controller = new AbortController()
+    controllerRef.current = controller
+    const started = performance.now()
+    let firstToken = true
+
+    try {
+      await streamFunction('chatWithAIStream', { message, context: 'AI Assistant chat' }, {
+        signal: controller.signal,
+        onEvent: (event) => {
+          if (event.token) {
+            if (firstToken) {
+              firstToken = false
+              console.debug('AI chat time to first token (ms):', Math.round(performance.now() - started))
+            }
+            updateReply(reply => ({ text: reply.text + event.token }))
+          } else if (event.done) {
+            updateReply(() => ({ text: event.response }))
+          }
+        }
+      })
+    } catch (error) {
+      if (error.name !== 'AbortError') {
+        console.error('AI chat error:', error)
+        updateReply(() => ({ text: 'Sorry, something went wrong. Please try again.' }))
+      }
+    } finally {
+      setStreaming(false)
+    }
+  }
+
   return (
     <div className="max-w-4xl mx-auto fade-in">
       <div className="mb-8">
         <h1 className="text-3xl font-bold text-gray-900">AI Assistant</h1>
         <p className="mt-2 text-gray-600">Get help from your personal AI</p>
       </div>
-      <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-6">
-        <p className="text-gray-600">AI chat interface coming soon...</p>
+
+      <div className="bg-white rounded-lg shadow-sm border border-gray-200 flex flex-col h-[32rem]">
+        <div className="flex-1 overflow-y-auto p-6 space-y-4">
+          {messages.length === 0 && (
+            <p className="text-gray-600">Ask about resumes, coding, presentations or anything you are studying.</p>
+          )}
+          {messages.map((msg, index) => (
+            <div key={index} className={`flex ${msg.role === 'user' ? 'justify-end' : 'justify-start'}`}>
+              <div
+                className={`max-w-[80%] rounded-lg px-4 py-2 text-sm whitespace-pre-wrap ${
+                  msg.role === 'user' ? 'bg-blue-600 text-white' : 'bg-gray-100 text-gray-900'
+                }`}
+              >
+                {msg.text || (streaming && index === messages.length - 1 ? '…' : '')}
+              </div>
+            </div>
+          ))}
+          <div ref={endRef} />
+        </div>
+
+        <form onSubmit={handleSend} className="border-t border-gray-200 p-4 flex space-x-3">
+          <input
+            type="text"
+            value={input}
+            onChange={(e) => setInput(e.target.value)}
+            placeholder="Type your message..."
+            className="flex-1 rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500"
+          />
+          <button
+            type="submit"
+            disabled={streaming || !input.trim()}
+            className="inline-flex items-center px-4 py-2 border border-transparent text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 disabled:opacity-50"
+          >
+            <PaperAirplaneIcon className="h-4 w-4" />
+          </button>
+        </form>
       </div>
     </div>
   )
 }""",
 }
 
-# Write remaining components
-for filepath, content in remaining_components.items():
-    with open(filepath, 'w') as f:
-        f.write(content)
+# Write remaining components (unchanged files are skipped)
+from orbitgen.emit import emit
+
+if __name__ == '__main__':
+    emit(remaining_components)
 
-print("✅ Created remaining module components and UI utilities")
\ No newline at end of file
+    print("✅ Created remaining module components and UI utilities")
\ No newline at end of file
@@ -27,7 +27,7 @@ describe('Authentication', () => {
       </MockAuthProvider>
     )
     
-    expect(screen.getByText('ORBIT AI')).toBeInTheDocument()
+    expect(screen.getByText('{{ project_name }}')).toBeInTheDocument()
     expect(screen.getByText('Continue with Google')).toBeInTheDocument()
   })
 
@@ -73,6 +73,888 @@ describe('Dashboard', () => {
   })
 })""",
 
+    "tests/inference.test.js": """/**
+ * @jest-environment node
+ */
+import { fixCode, chatWithAI } from '../functions/index'
+
+const GENERATION = 'Declare the variable with let before using it.'
+
+// The Functions dependencies are installed in functions/, not at the root
+jest.mock('firebase-functions', () => ({
+  config: () => ({}),
+  runWith: () => ({ https: { onRequest: (handler) => handler } }),
+  firestore: { document: () => ({ onCreate: (handler) => handler }) },
+}), { virtual: true })
+jest.mock('cors', () => () => (req, res, next) => next(), { virtual: true })
+
+// Upstream answers like the inference API does for a single input
+const mockPost = jest.fn()
+jest.mock('../functions/inference/httpClient', () => ({
+  createInferenceClient: () => ({ post: (...args) => mockPost(...args) }),
+}))
+
+function invoke(handler, body) {
+  return new Promise((resolve) => {
+    const res = {
+      statusCode: 200,
+      status(code) {
+        res.statusCode = code
+        return res
+      },
+      json: (payload) => resolve({ status: res.statusCode, body: payload }),
+    }
+    handler({ method: 'POST', body }, res)
+  })
+}
+
+describe('Inference responses', () => {
+  beforeEach(() => {
+    mockPost.mockClear()
+    mockPost.mockImplementation((url, payload) => Promise.resolve({
+      data: Array.isArray(payload.inputs)
+        ? payload.inputs.map(() => [{ generated_text: GENERATION }])
+        : [{ generated_text: GENERATION }],
+    }))
+  })
+
+  test('chatWithAI answers with the generated text, not the fallback', async () => {
+    const { status, body } = await invoke(chatWithAI, { message: 'Why does my loop never end?' })
+
+    expect(status).toBe(200)
+    expect(body.response).toBe(GENERATION)
+    expect(mockPost).toHaveBeenCalledTimes(1)
+  })
+
+  test('fixCode returns the generated fix', async () => {
+    const { body } = await invoke(fixCode, {
+      code: 'x = 1', language: 'javascript', error: 'ReferenceError: x is not defined',
+    })
+
+    expect(body.fixedCode).toBe(GENERATION)
+    expect(body.explanation).toBe('AI suggested fix based on the error.')
+  })
+
+  test('concurrent prompts batched into one call each get their generation', async () => {
+    const replies = await Promise.all(['one', 'two', 'three'].map((topic) =>
+      invoke(chatWithAI, { message: `Explain ${topic}` })))
+
+    expect(mockPost).toHaveBeenCalledTimes(1)
+    replies.forEach(({ body }) => expect(body.response).toBe(GENERATION))
+  })
+})
+""",
+
+    "tests/pagePool.test.js": """/**
+ * @jest-environment node
+ */
+import { EventEmitter } from 'events'
+import { createPagePool } from '../functions/pdf/pagePool'
+
+// Stand-in for a puppeteer browser that counts the pages alive at once
+function fakeLauncher() {
+  const launcher = { browsers: [], live: 0, maxLive: 0 }
+  launcher.launch = async () => {
+    const browser = new EventEmitter()
+    browser.pages = []
+    browser.newPage = async () => {
+      const page = { closed: false, isClosed: () => page.closed }
+      page.close = async () => {
+        if (!page.closed) {
+          page.closed = true
+          launcher.live -= 1
+        }
+      }
+      browser.pages.push(page)
+      launcher.live += 1
+      launcher.maxLive = Math.max(launcher.maxLive, launcher.live)
+      return page
+    }
+    browser.crash = () => {
+      browser.pages.filter((page) => !page.closed).forEach((page) => page.close())
+      browser.emit('disconnected')
+    }
+    launcher.browsers.push(browser)
+    return browser
+  }
+  return launcher
+}
+
+function deferred() {
+  let resolve
+  const promise = new Promise((done) => { resolve = done })
+  return { promise, resolve }
+}
+
+const tick = () => new Promise((resolve) => setImmediate(resolve))
+
+describe('Page pool', () => {
+  test('never opens more than size pages after the browser disconnects mid-render', async () => {
+    const launcher = fakeLauncher()
+    const pool = createPagePool({ launch: launcher.launch, size: 2 })
+
+    // Two renders hold both pages, a third sits idle-less in the queue
+    const gates = [deferred(), deferred()]
+    const held = gates.map((gate) => pool.withPage(() => gate.promise))
+    await tick()
+    launcher.browsers[0].crash()
+    gates.forEach((gate) => gate.resolve())
+    await Promise.all(held)
+    expect(pool.stats().open).toBe(0)
+
+    launcher.maxLive = launcher.live
+    await Promise.all(Array.from({ length: 10 }, () =>
+      pool.withPage(async () => { await tick() })))
+
+    expect(launcher.browsers).toHaveLength(2)
+    expect(launcher.maxLive).toBeLessThanOrEqual(2)
+    expect(pool.stats().open).toBe(2)
+    expect(pool.stats().idle).toBe(2)
+  })
+
+  test('idle pages that died with the browser are not counted as open', async () => {
+    const launcher = fakeLauncher()
+    const pool = createPagePool({ launch: launcher.launch, size: 3 })
+    await Promise.all([1, 2, 3].map(() => pool.withPage(async () => { await tick() })))
+    expect(pool.stats().idle).toBe(3)
+
+    launcher.browsers[0].crash()
+    expect(pool.stats().open).toBe(0)
+    await pool.withPage(async () => {})
+    expect(pool.stats().open).toBe(1)
+  })
+
+  test('waiters get released pages in arrival order', async () => {
+    const launcher = fakeLauncher()
+    const pool = createPagePool({ launch: launcher.launch, size: 1 })
+    const order = []
+
+    const first = deferred()
+    const holder = pool.withPage(() => first.promise)
+    await tick()
+    const waiting = ['a', 'b', 'c'].map((name) => pool.withPage(async () => { order.push(name) }))
+    await tick()
+    first.resolve()
+
+    await Promise.all([holder, ...waiting])
+    expect(order).toEqual(['a', 'b', 'c'])
+    expect(launcher.browsers[0].pages).toHaveLength(1)
+  })
+
+  test('a caller arriving during a release queues behind the waiters', async () => {
+    const launcher = fakeLauncher()
+    const pool = createPagePool({ launch: launcher.launch, size: 1 })
+    const order = []
+    let late = null
+
+    const holder = pool.withPage(async (page) => {
+      // Closing the broken page lets a new request in before the waiter resumes
+      const close = page.close
+      page.close = () => {
+        late = pool.withPage(async () => { order.push('late') })
+        return close()
+      }
+      await tick()
+      throw new Error('render timed out')
+    })
+    const waiting = pool.withPage(async () => { order.push('waiter') })
+
+    await expect(holder).rejects.toThrow('render timed out')
+    await Promise.all([waiting, late])
+    expect(order).toEqual(['waiter', 'late'])
+    expect(launcher.maxLive).toBe(1)
+  })
+
+  test('a broken page is replaced for the next waiter', async () => {
+    const launcher = fakeLauncher()
+    const pool = createPagePool({ launch: launcher.launch, size: 1 })
+    const failing = pool.withPage(async () => {
+      await tick()
+      throw new Error('render timed out')
+    })
+    const waiting = pool.withPage(async (page) => page)
+
+    await expect(failing).rejects.toThrow('render timed out')
+    const page = await waiting
+    expect(page.isClosed()).toBe(false)
+    expect(pool.stats().open).toBe(1)
+    expect(launcher.maxLive).toBe(1)
+  })
+})
+""",
+
+    "tests/batchWriter.test.js": """/**
+ * @jest-environment node
+ */
+import { BatchWriter } from '../functions/batchWriter'
+
+// Firestore stand-in: `failures` decides per commit whether it throws
+function fakeFirestore({ failures = () => false, deadLetterFails = false } = {}) {
+  const db = { commits: [], documents: new Map(), deadLetters: [] }
+  db.batch = () => {
+    const writes = []
+    return {
+      set: (ref, data) => writes.push([ref, data]),
+      commit: async () => {
+        db.commits.push(writes.map(([ref]) => ref.path))
+        if (failures(writes)) {
+          throw new Error('DEADLINE_EXCEEDED')
+        }
+        writes.forEach(([ref, data]) => db.documents.set(ref.path, data))
+      },
+    }
+  }
+  db.collection = (name) => ({
+    add: async (data) => {
+      if (deadLetterFails) {
+        throw new Error('PERMISSION_DENIED')
+      }
+      db.deadLetters.push({ collection: name, ...data })
+    },
+  })
+  return db
+}
+
+const ref = (id) => ({ id, path: `documents/${id}` })
+const options = { maxBatchSize: 10, flushIntervalMs: 5, baseRetryMs: 1, maxAttempts: 3 }
+
+describe('BatchWriter', () => {
+  let error
+  beforeEach(() => {
+    error = jest.spyOn(console, 'error').mockImplementation(() => {})
+  })
+  afterEach(() => error.mockRestore())
+
+  test('commits writes queued together in one batch', async () => {
+    const db = fakeFirestore()
+    const writer = new BatchWriter({ firestore: db, ...options })
+
+    const results = await Promise.all(['a', 'b', 'c'].map((id) => writer.set(ref(id), { id })))
+
+    expect(results).toEqual([1, 2, 3].map(() => ({ ok: true, attempts: 1 })))
+    expect(db.commits).toEqual([['documents/a', 'documents/b', 'documents/c']])
+    expect(writer.stats()).toMatchObject({ queued: 3, written: 3, batches: 1, pending: 0 })
+  })
+
+  test('retries a failed batch document by document', async () => {
+    // The shared batch fails, then "bad" fails once more on its own
+    let badFailures = 0
+    const db = fakeFirestore({
+      failures: (writes) => writes.length > 1 || (writes[0][0].id === 'bad' && ++badFailures < 2),
+    })
+    const writer = new BatchWriter({ firestore: db, ...options })
+
+    const results = await Promise.all(['good', 'bad'].map((id) => writer.set(ref(id), { id })))
+
+    expect(results).toEqual([{ ok: true, attempts: 2 }, { ok: true, attempts: 3 }])
+    expect(db.commits.slice(1).every((paths) => paths.length === 1)).toBe(true)
+    expect([...db.documents.keys()].sort()).toEqual(['documents/bad', 'documents/good'])
+    expect(writer.stats().retries).toBe(3)
+  })
+
+  test('dead-letters a write that keeps failing', async () => {
+    const db = fakeFirestore({ failures: () => true })
+    const writer = new BatchWriter({ firestore: db, ...options })
+
+    const result = await writer.set(ref('doomed'), { title: 'Essay' })
+
+    expect(result).toEqual({ ok: false, attempts: 3 })
+    expect(db.deadLetters).toHaveLength(1)
+    expect(db.deadLetters[0]).toMatchObject({
+      collection: 'failedWrites', path: 'documents/doomed', data: { title: 'Essay' }, attempts: 3,
+    })
+    expect(writer.stats()).toMatchObject({ deadLettered: 1, lost: 0, written: 0 })
+  })
+
+  test('counts a write as lost when the dead-letter write fails too', async () => {
+    const db = fakeFirestore({ failures: () => true, deadLetterFails: true })
+    const writer = new BatchWriter({ firestore: db, ...options })
+
+    expect(await writer.set(ref('doomed'), {})).toEqual({ ok: false, attempts: 3 })
+    expect(writer.stats()).toMatchObject({ deadLettered: 0, lost: 1 })
+  })
+
+  test('wait gives up after its timeout while the write carries on', async () => {
+    const warn = jest.spyOn(console, 'warn').mockImplementation(() => {})
+    const db = fakeFirestore()
+    const writer = new BatchWriter({ firestore: db, ...options, flushIntervalMs: 50 })
+
+    const written = writer.set(ref('slow'), {})
+    expect(await writer.wait(written, 5)).toEqual({ ok: false, timedOut: true })
+    expect(await writer.wait(written, 1000)).toEqual({ ok: true, attempts: 1 })
+    expect(writer.stats().timedOut).toBe(1)
+    warn.mockRestore()
+  })
+})
+""",
+
+    "tests/speech.test.js": """/**
+ * @jest-environment node
+ */
+import { analyzeVoice, analyzeVoiceSegment } from '../functions/index'
+import { SpeechAnalyzer, summarize } from '../functions/speech/analyzer'
+import { scanTranscript } from '../functions/speech/fillers'
+
+jest.mock('firebase-functions', () => ({
+  config: () => ({}),
+  runWith: () => ({ https: { onRequest: (handler) => handler } }),
+  firestore: { document: () => ({ onCreate: (handler) => handler }) },
+}), { virtual: true })
+jest.mock('cors', () => () => (req, res, next) => next(), { virtual: true })
+
+// Firestore stand-in keeping documents in a map by path
+const mockDocuments = new Map()
+jest.mock('firebase-admin', () => {
+  let nextId = 0
+  const doc = (collection, id = `doc-${++nextId}`) => ({
+    id,
+    path: `${collection}/${id}`,
+    get: async () => ({ data: () => mockDocuments.get(`${collection}/${id}`) }),
+  })
+  const db = {
+    collection: (name) => ({ doc: (id) => doc(name, id), add: async () => {} }),
+    batch: () => {
+      const writes = []
+      return {
+        set: (ref, data) => writes.push([ref, data]),
+        commit: async () => writes.forEach(([ref, data]) => mockDocuments.set(ref.path, data)),
+      }
+    },
+    runTransaction: (update) => update({
+      get: (ref) => ref.get(),
+      set: (ref, data) => mockDocuments.set(ref.path, data),
+    }),
+  }
+  const firestore = () => db
+  firestore.FieldValue = { serverTimestamp: () => 'now' }
+  return { initializeApp: () => {}, firestore }
+}, { virtual: true })
+
+function invoke(handler, body) {
+  return new Promise((resolve) => {
+    const res = {
+      statusCode: 200,
+      status(code) {
+        res.statusCode = code
+        return res
+      },
+      json: (payload) => resolve({ status: res.statusCode, body: payload }),
+    }
+    handler({ method: 'POST', body }, res)
+  })
+}
+
+const TRANSCRIPT = 'So um I think, you know, the demo went well. Uh, like, actually it did! ' +
+  'You know what I mean? Um so yes. You know'
+
+describe('SpeechAnalyzer', () => {
+  test('fed word by word, it counts what scanTranscript counts for the whole transcript', () => {
+    const expected = summarize(scanTranscript(TRANSCRIPT), 60)
+    const analyzer = new SpeechAnalyzer()
+    TRANSCRIPT.split(' ').forEach((piece, i) => analyzer.push(piece, i))
+
+    expect(analyzer.analysis(60)).toEqual(expected)
+  })
+
+  test('a filler split across results ("you" | "know") is counted once', () => {
+    const analyzer = new SpeechAnalyzer().push('I mean, you', 1).push('know, it works.', 2)
+
+    expect(analyzer.analysis(2).fillerWords).toBe(scanTranscript('I mean, you know, it works.').fillers)
+    expect(analyzer.analysis(2).fillerWords).toBe(1)
+  })
+
+  test('state stored between requests resumes the same counts', () => {
+    const first = new SpeechAnalyzer().push('um so the plan is', 5)
+    const resumed = new SpeechAnalyzer(JSON.parse(JSON.stringify(first.state))).push('like, ready.', 10)
+
+    expect(resumed.analysis(10)).toEqual(summarize(scanTranscript('um so the plan is like, ready.'), 10))
+  })
+})
+
+describe('analyzeVoice', () => {
+  const userId = 'user-1'
+
+  let sessions = 0
+  const newSessionId = () => `session-${++sessions}-0123456789abcdef`
+
+  async function liveSession() {
+    const sessionId = newSessionId()
+    const { body } = await invoke(analyzeVoiceSegment, {
+      sessionId, userId, text: 'Um so the first part.', sequence: 1, offsetSeconds: 5,
+    })
+    expect(body.sessionId).toBe(sessionId)
+    return sessionId
+  }
+
+  test('a retried first segment reuses the session document and is counted once', async () => {
+    const sessionId = newSessionId()
+    const segment = { sessionId, userId, text: 'Um so hello.', sequence: 1, offsetSeconds: 3 }
+    const before = mockDocuments.size
+    await invoke(analyzeVoiceSegment, segment)
+    const { body } = await invoke(analyzeVoiceSegment, segment)
+
+    expect(mockDocuments.size).toBe(before + 1)
+    expect(body.sessionId).toBe(sessionId)
+    expect(body.analysis.totalWords).toBe(3)
+    expect(body.analysis.fillerWords).toBe(2)
+  })
+
+  test('a segment without a usable session ID is rejected', async () => {
+    for (const sessionId of [undefined, null, 'short', 'a/b/c/0123456789abcdef']) {
+      const { status } = await invoke(analyzeVoiceSegment, {
+        sessionId, userId, text: 'hello', sequence: 1, offsetSeconds: 1,
+      })
+      expect(status).toBe(400)
+    }
+  })
+
+  test('an incomplete session whose segments never arrived is stored under its own ID', async () => {
+    const sessionId = newSessionId()
+    const { body } = await invoke(analyzeVoice, {
+      sessionId, userId, incomplete: true, transcript: 'Um hello there.', duration: 4,
+    })
+
+    expect(body.sessionId).toBe(sessionId)
+    expect(mockDocuments.get(`voiceSessions/${sessionId}`).transcript).toBe('Um hello there.')
+  })
+
+  test('finalizes a live session from its running counts', async () => {
+    const sessionId = await liveSession()
+    const { body } = await invoke(analyzeVoice, {
+      sessionId, userId, transcript: 'Um so the first part.', duration: 10,
+    })
+
+    expect(body.sessionId).toBe(sessionId)
+    expect(body.analysis).toEqual(summarize(scanTranscript('Um so the first part.'), 10))
+  })
+
+  test('analyzes the full transcript of an incomplete session and replaces its counts', async () => {
+    const sessionId = await liveSession()
+    // The second segment never reached the server
+    const transcript = 'Um so the first part. Uh, like, the second part you know.'
+    const { body } = await invoke(analyzeVoice, {
+      sessionId, userId, incomplete: true, transcript, duration: 10,
+    })
+
+    expect(body.sessionId).toBe(sessionId)
+    expect(body.analysis).toEqual(summarize(scanTranscript(transcript), 10))
+    expect(body.analysis.fillerWords).toBe(5)
+    expect(mockDocuments.get(`voiceSessions/${sessionId}`).live).toBeUndefined()
+  })
+
+  test('a session of another user is not touched', async () => {
+    const sessionId = await liveSession()
+    const { body } = await invoke(analyzeVoice, {
+      sessionId, userId: 'user-2', transcript: 'Hello there.', duration: 10,
+    })
+
+    expect(body.sessionId).not.toBe(sessionId)
+    expect(mockDocuments.get(`voiceSessions/${sessionId}`).live).toBeDefined()
+  })
+})
+""",
+
+    "tests/microBatcher.test.js": """/**
+ * @jest-environment node
+ */
+import { createMicroBatcher } from '../functions/inference/microBatcher'
+
+const MODEL = 'microsoft/DialoGPT-large'
+const shared = { parameters: { max_length: 300 } }
+
+describe('createMicroBatcher', () => {
+  let warn
+  beforeEach(() => {
+    warn = jest.spyOn(console, 'warn').mockImplementation(() => {})
+  })
+  afterEach(() => warn.mockRestore())
+
+  test('concurrent inputs go up as one inputs array and come back in the single-input shape', async () => {
+    const send = jest.fn((model, payload) => Promise.resolve(
+      payload.inputs.map((input) => [{ generated_text: `re: ${input}` }])))
+    const batcher = createMicroBatcher({ send, maxBatchSize: 8, maxDelayMs: 5 })
+
+    const results = await Promise.all(['a', 'b', 'c'].map((inputs) =>
+      batcher.submit(MODEL, { ...shared, inputs }, 'chat')))
+
+    expect(send).toHaveBeenCalledTimes(1)
+    expect(send).toHaveBeenCalledWith(MODEL, { ...shared, inputs: ['a', 'b', 'c'] }, 'chat')
+    expect(results).toEqual([
+      [{ generated_text: 're: a' }], [{ generated_text: 're: b' }], [{ generated_text: 're: c' }],
+    ])
+  })
+
+  test('a model that answers one object per input is wrapped like a single call', async () => {
+    const send = jest.fn((model, payload) => Promise.resolve(
+      payload.inputs.map((input) => ({ generated_text: input.toUpperCase() }))))
+    const batcher = createMicroBatcher({ send, maxDelayMs: 5 })
+
+    const results = await Promise.all(['x', 'y'].map((inputs) => batcher.submit(MODEL, { inputs }, 'chat')))
+
+    expect(results).toEqual([[{ generated_text: 'X' }], [{ generated_text: 'Y' }]])
+  })
+
+  test('a batch of one is sent as a plain single-input call', async () => {
+    const send = jest.fn(() => Promise.resolve([{ generated_text: 'only' }]))
+    const batcher = createMicroBatcher({ send, maxDelayMs: 5 })
+
+    await expect(batcher.submit(MODEL, { ...shared, inputs: 'solo' }, 'chat'))
+      .resolves.toEqual([{ generated_text: 'only' }])
+    expect(send).toHaveBeenCalledWith(MODEL, { ...shared, inputs: 'solo' }, 'chat')
+  })
+
+  test('an answer that does not match the inputs falls back to one call each', async () => {
+    const send = jest.fn((model, payload) => Promise.resolve(Array.isArray(payload.inputs)
+      ? [{ generated_text: 'one answer for everyone' }]
+      : [{ generated_text: `single ${payload.inputs}` }]))
+    const batcher = createMicroBatcher({ send, maxDelayMs: 5 })
+
+    const results = await Promise.all(['a', 'b'].map((inputs) => batcher.submit(MODEL, { inputs }, 'chat')))
+
+    expect(results).toEqual([[{ generated_text: 'single a' }], [{ generated_text: 'single b' }]])
+    expect(send).toHaveBeenCalledTimes(3)
+    expect(batcher.stats().unbatched).toBe(2)
+    expect(warn).toHaveBeenCalled()
+  })
+
+  test('an unavailable model or a failed call reaches every caller in the batch', async () => {
+    const unavailable = createMicroBatcher({ send: () => Promise.resolve(null), maxDelayMs: 5 })
+    await expect(Promise.all(['a', 'b'].map((inputs) => unavailable.submit(MODEL, { inputs }, 'chat'))))
+      .resolves.toEqual([null, null])
+
+    const failing = createMicroBatcher({ send: () => Promise.reject(new Error('ECONNRESET')), maxDelayMs: 5 })
+    const outcomes = await Promise.all(['a', 'b'].map((inputs) =>
+      failing.submit(MODEL, { inputs }, 'chat').catch((error) => error.message)))
+    expect(outcomes).toEqual(['ECONNRESET', 'ECONNRESET'])
+  })
+
+  test('calls with different parameters or array inputs are not mixed', async () => {
+    const send = jest.fn((model, payload) => Promise.resolve(Array.isArray(payload.inputs)
+      ? payload.inputs.map(() => [{ generated_text: 'batched' }])
+      : [{ generated_text: 'single' }]))
+    const batcher = createMicroBatcher({ send, maxBatchSize: 2, maxDelayMs: 5 })
+
+    await Promise.all([
+      batcher.submit(MODEL, { inputs: 'a', parameters: { max_length: 100 } }, 'chat'),
+      batcher.submit(MODEL, { inputs: 'b', parameters: { max_length: 200 } }, 'chat'),
+      batcher.submit(MODEL, { inputs: ['c', 'd'] }, 'chat'),
+    ])
+
+    expect(send).toHaveBeenCalledTimes(3)
+    expect(batcher.stats().batches).toBe(2)
+  })
+})
+""",
+
+    "tests/circuitBreaker.test.js": """/**
+ * @jest-environment node
+ */
+import { chatWithAI, chatWithAIStream } from '../functions/index'
+import { CircuitBreaker } from '../functions/inference/retryPolicy'
+
+jest.mock('firebase-functions', () => ({
+  config: () => ({}),
+  runWith: () => ({ https: { onRequest: (handler) => handler } }),
+  firestore: { document: () => ({ onCreate: (handler) => handler }) },
+}), { virtual: true })
+jest.mock('cors', () => () => (req, res, next) => next(), { virtual: true })
+
+const mockPost = jest.fn()
+const mockStream = jest.fn()
+jest.mock('../functions/inference/httpClient', () => ({
+  createInferenceClient: () => ({
+    post: (...args) => mockPost(...args),
+    stream: (...args) => mockStream(...args),
+  }),
+}))
+
+describe('CircuitBreaker', () => {
+  let now
+  let clock
+  beforeEach(() => {
+    now = 1000000
+    clock = jest.spyOn(Date, 'now').mockImplementation(() => now)
+  })
+  afterEach(() => clock.mockRestore())
+
+  function open(breaker) {
+    for (let i = 0; i < breaker.failureThreshold; i++) {
+      expect(breaker.allowRequest()).toBe(true)
+      breaker.recordFailure()
+    }
+    expect(breaker.state).toBe('open')
+  }
+
+  test('opens after consecutive failures and short-circuits until the cooldown ends', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 3, cooldownMs: 1000 })
+    open(breaker)
+
+    expect(breaker.allowRequest()).toBe(false)
+    expect(breaker.allowRequest()).toBe(false)
+    expect(breaker.stats().shortCircuited).toBe(2)
+
+    now += 1000
+    expect(breaker.state).toBe('half-open')
+  })
+
+  test('half-open lets exactly one probe through', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 2, cooldownMs: 1000 })
+    open(breaker)
+    now += 1000
+
+    expect(breaker.allowRequest()).toBe(true)
+    expect(breaker.allowRequest()).toBe(false)
+    expect(breaker.allowRequest()).toBe(false)
+  })
+
+  test('a successful probe closes the circuit', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 2, cooldownMs: 1000 })
+    open(breaker)
+    now += 1000
+    breaker.allowRequest()
+    breaker.recordSuccess()
+
+    expect(breaker.state).toBe('closed')
+    expect(breaker.allowRequest()).toBe(true)
+    expect(breaker.allowRequest()).toBe(true)
+  })
+
+  test('a failed probe opens the circuit for another cooldown', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 2, cooldownMs: 1000 })
+    open(breaker)
+    now += 1000
+    breaker.allowRequest()
+    breaker.recordFailure()
+
+    expect(breaker.state).toBe('open')
+    expect(breaker.allowRequest()).toBe(false)
+    now += 999
+    expect(breaker.allowRequest()).toBe(false)
+    now += 1
+    expect(breaker.allowRequest()).toBe(true)
+  })
+
+  test('a loading model opens the circuit for its estimated load time', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 5, cooldownMs: 30000 })
+    expect(breaker.allowRequest()).toBe(true)
+    breaker.recordColdModel(2000)
+
+    expect(breaker.state).toBe('open')
+    now += 2000
+    expect(breaker.allowRequest()).toBe(true)
+    expect(breaker.allowRequest()).toBe(false)
+    breaker.recordSuccess()
+    expect(breaker.stats()).toEqual({ state: 'closed', openUntil: null, failures: 0, shortCircuited: 1 })
+  })
+
+  test('a probe ended by releaseProbe lets the next one through', () => {
+    const breaker = new CircuitBreaker({ failureThreshold: 1, cooldownMs: 1000 })
+    open(breaker)
+    now += 1000
+
+    expect(breaker.allowRequest()).toBe(true)
+    breaker.releaseProbe()
+    expect(breaker.allowRequest()).toBe(true)
+  })
+})
+
+// The breaker as the handlers drive it: every way a half-open probe can end
+// must leave the breaker able to probe again
+describe('Half-open probes through the handlers', () => {
+  const rateLimited = () => Object.assign(new Error('Request failed with status code 429'), {
+    response: { status: 429, headers: { 'retry-after': '30' }, data: {} },
+  })
+  let now
+  let clock
+  let calls = 0
+  const silenced = []
+
+  function invoke(handler, body, onClose) {
+    return new Promise((resolve) => {
+      const res = {
+        statusCode: 200,
+        status(code) {
+          res.statusCode = code
+          return res
+        },
+        json: (payload) => resolve({ status: res.statusCode, body: payload }),
+        set: () => {},
+        flushHeaders: () => {},
+        write: () => true,
+        end: () => resolve({ status: res.statusCode }),
+        on: (event, listener) => event === 'close' && onClose && onClose(listener),
+      }
+      handler({ method: 'POST', body }, res)
+    })
+  }
+
+  // Each message is new, so no response cache or in-flight call answers it
+  const chat = () => invoke(chatWithAI, { message: `question ${++calls}` })
+
+  async function halfOpen() {
+    mockPost.mockImplementation(() => Promise.reject(Object.assign(new Error('boom'), {
+      response: { status: 500 },
+    })))
+    for (let i = 0; i < 5; i++) {
+      await chat()
+    }
+    mockPost.mockClear()
+    await chat()
+    expect(mockPost).toHaveBeenCalledTimes(0)
+    now += 30000
+  }
+
+  async function expectProbeAllowed() {
+    mockPost.mockClear()
+    mockPost.mockImplementation(() => Promise.resolve({ data: [{ generated_text: 'back' }] }))
+    const { body } = await chat()
+    expect(mockPost).toHaveBeenCalledTimes(1)
+    expect(body.response).toBe('back')
+  }
+
+  beforeEach(() => {
+    now = 5000000
+    clock = jest.spyOn(Date, 'now').mockImplementation(() => now)
+    silenced.push(...['log', 'warn', 'error'].map((level) =>
+      jest.spyOn(console, level).mockImplementation(() => {})))
+    mockStream.mockClear()
+  })
+  afterEach(() => {
+    clock.mockRestore()
+    silenced.splice(0).forEach((spy) => spy.mockRestore())
+  })
+
+  test('a probe that gives up on a 429 reopens the circuit until Retry-After', async () => {
+    await halfOpen()
+    mockPost.mockImplementation(() => Promise.reject(rateLimited()))
+    await chat()
+    expect(mockPost).toHaveBeenCalledTimes(1)
+
+    now += 31000
+    await expectProbeAllowed()
+  })
+
+  test('a streamed probe answered with 429 reopens the circuit until Retry-After', async () => {
+    await halfOpen()
+    mockStream.mockImplementation(() => Promise.reject(rateLimited()))
+    await invoke(chatWithAIStream, { message: 'stream me' })
+    expect(mockStream).toHaveBeenCalledTimes(1)
+
+    now += 31000
+    await expectProbeAllowed()
+  })
+
+  test('a streamed probe aborted by the client lets the next probe through', async () => {
+    await halfOpen()
+    let close
+    mockStream.mockImplementation(() => {
+      close()
+      return Promise.reject(new Error('canceled'))
+    })
+    const done = invoke(chatWithAIStream, { message: 'going away' }, (listener) => { close = listener })
+    await new Promise((resolve) => setTimeout(resolve, 50))
+    expect(mockStream).toHaveBeenCalledTimes(1)
+    done.catch(() => {})
+
+    await expectProbeAllowed()
+  })
+})
+""",
+
+    "tests/renderPdf.test.js": """/**
+ * @jest-environment node
+ */
+import { renderPdf } from '../functions/index'
+import { TEMPLATES } from '../functions/pdf/templates'
+
+jest.mock('firebase-functions', () => ({
+  config: () => ({}),
+  runWith: () => ({ https: { onRequest: (handler) => handler } }),
+  firestore: { document: () => ({ onCreate: (handler) => handler }) },
+}), { virtual: true })
+jest.mock('cors', () => () => (req, res, next) => next(), { virtual: true })
+
+// No browser: the renderer hands back the body it was asked to print
+const mockRender = jest.fn()
+jest.mock('../functions/pdf/renderer', () => ({
+  createPdfRenderer: () => ({
+    templates: ['invoice', 'resume-professional', 'resume-creative', 'resume-academic'],
+    render: (...args) => mockRender(...args),
+  }),
+}))
+
+function invoke(body) {
+  return new Promise((resolve) => {
+    const res = {
+      statusCode: 200,
+      status(code) {
+        res.statusCode = code
+        return res
+      },
+      set: () => {},
+      json: (payload) => resolve({ status: res.statusCode, body: payload }),
+      send: (payload) => resolve({ status: res.statusCode, body: payload }),
+    }
+    renderPdf({ method: 'POST', body }, res)
+  })
+}
+
+describe('renderPdf', () => {
+  let error
+  beforeEach(() => {
+    error = jest.spyOn(console, 'error').mockImplementation(() => {})
+    mockRender.mockClear()
+    mockRender.mockImplementation((template, data) => Promise.resolve({
+      pdf: Buffer.from(TEMPLATES[template].body(data)),
+      filename: TEMPLATES[template].filename(data),
+    }))
+  })
+  afterEach(() => error.mockRestore())
+
+  test('renders well-formed resume data', async () => {
+    const { status, body } = await invoke({
+      template: 'resume-professional',
+      data: {
+        name: 'Ada',
+        experience: [{ title: 'Engineer', company: 'ACME', period: '2020-2024' }],
+        skills: ['JavaScript', 'Python'],
+      },
+    })
+
+    expect(status).toBe(200)
+    expect(body.toString()).toContain('<span>Python</span>')
+  })
+
+  test('answers 400 for list fields that are not arrays of the right entries', async () => {
+    const cases = [
+      [{ skills: 'JavaScript' }, 'skills must be an array of strings'],
+      [{ experience: { title: 'Engineer' } }, 'experience must be an array of objects'],
+      [{ education: ['MIT'] }, 'education must be an array of objects'],
+      [{ projects: 'Orbit' }, 'projects must be an array of objects'],
+      [{ skills: [{ name: 'JS' }] }, 'skills must be an array of strings'],
+    ]
+    for (const [data, message] of cases) {
+      const { status, body } = await invoke({ template: 'resume-creative', data })
+      expect(status).toBe(400)
+      expect(body.error).toBe(message)
+    }
+
+    const invoice = await invoke({ template: 'invoice', data: { items: 'one desk' } })
+    expect(invoice.status).toBe(400)
+    expect((await invoke({ template: 'invoice', data: 'not an object' })).status).toBe(400)
+    expect(mockRender).toHaveBeenCalledTimes(0)
+  })
+
+  test('templates skip list fields that are not arrays', () => {
+    const data = { name: 'Ada', skills: 'JavaScript', experience: { title: 'x' }, items: 'desk' }
+
+    expect(() => TEMPLATES['resume-academic'].body(data)).not.toThrow()
+    expect(TEMPLATES['resume-academic'].body(data)).not.toContain('<span>')
+    expect(TEMPLATES.invoice.body(data)).toContain('$0.00')
+  })
+})
+""",
+
     "playwright.config.js": """import { defineConfig, devices } from '@playwright/test';
 
 export default defineConfig({
@@ -113,7 +995,7 @@ test.describe('ORBIT AI E2E Flow', () => {
     await page.goto('/');
     
     // Should show login page
-    await expect(page.getByText('ORBIT AI')).toBeVisible();
+    await expect(page.getByText('{{ project_name }}')).toBeVisible();
     await expect(page.getByText('Continue with Google')).toBeVisible();
     
     // Mock login (in real test, would use test auth)
@@ -213,7 +1095,7 @@ jobs:
       with:
         repoToken: ${{ secrets.GITHUB_TOKEN }}
         firebaseServiceAccount: ${{ secrets.FIREBASE_SERVICE_ACCOUNT }}
-        projectId: orbit-ai-e7b03
+        projectId: {{ firebase_project_id }}
         channelId: live""",
 
     # Jest configuration
@@ -291,7 +1173,18 @@ This directory contains Firebase Functions for ORBIT AI's server-side operations
 - `generatePresentation` - Generates presentation slides
 - `fixCode` - Provides AI-powered code fixes
 - `chatWithAI` - AI chatbot responses
+- `chatWithAIStream` - Same chatbot, streamed token by token as server-sent events
 - `analyzeVoice` - Voice analysis and feedback
+- `analyzeVoiceSegment` - Running analysis of a live voice session, one recognition result at a time
+
+### Documents
+- `renderPdf` - Renders the invoice and resume templates to PDF
+
+### Background Jobs
+- `runGenerationJob` - Firestore-triggered worker for async `generateDocument` / `generatePresentation` requests
+
+### Operations
+- `inferenceStats` - Per-instance inference counters (cache hits/misses and coalesced calls per endpoint, connection reuse, circuit breakers, batch size and queueing delay, streaming time-to-first-token)
 
 ## Setup
 
@@ -314,11 +1207,79 @@ This directory contains Firebase Functions for ORBIT AI's server-side operations
 ## Environment Variables
 
 - `HF_API_KEY` - Hugging Face API key for AI processing
+- `HF_BASE_URL` - Inference API base URL (default `https://api-inference.huggingface.co/models`); point it at the local stand-in for load tests
+- `HF_CACHE_MAX_ENTRIES` - In-memory response cache size (default 500)
+- `HF_MAX_SOCKETS` - Maximum concurrent keep-alive connections to the inference API per host (default 50)
+- `HF_MAX_FREE_SOCKETS` - Idle connections kept open for reuse (default 10)
+- `PDF_POOL_SIZE` - Browser pages kept warm for PDF rendering, and the most renders run at once (default 4)
+- `PERSIST_BATCH_SIZE` - Queued Firestore writes that trigger an immediate batch commit (default 100)
+- `PERSIST_FLUSH_MS` - Longest a queued Firestore write waits before it is committed (default 20, or 200 with `PERSIST_AFTER_RESPONSE`)
+- `PERSIST_WAIT_MS` - Longest a handler waits for its Firestore write (default 10000)
+- `PERSIST_AFTER_RESPONSE` - Set to `true` to answer before the write is committed; only with CPU allocated outside requests
+- `GENERATION_JOBS` - `local` runs async generation jobs in the requesting instance instead of the Firestore trigger (emulator without Firestore triggers)
+- `FUNCTIONS_LAYOUT` - `router` deploys a single `api` function instead of one function per route (see below)
+- `HF_BATCH_WINDOW_MS` - How long a prompt waits for others to batch with (default 20)
+- `HF_BATCH_MAX_SIZE` - Prompts per batched inference call; `1` disables batching (default 8)
+- `HF_CACHE_FIRESTORE` - Set to `true` to share cached responses between instances through the `inferenceCache` collection
+
+## PDF Rendering
+
+`renderPdf` takes `{"template": "...", "data": {...}}` and answers with the PDF as a download. Templates are `invoice`, `resume-professional`, `resume-creative` and `resume-academic` (`pdf/templates.js`). `experience`, `education`, `projects` and `items` must be arrays of objects and `skills` an array of strings; other shapes are answered with 400. Each template is compiled once into a static HTML shell plus a body renderer. Renders run on a pool of at most `PDF_POOL_SIZE` puppeteer pages (`pdf/pagePool.js`). Pages stay warm between requests and keep their template's shell loaded, so a repeat render only swaps the body. Extra requests wait for a free page. Render latency and failures per template, plus pool usage, are reported under `pdf` by `inferenceStats`. The function is deployed with 2GB of memory, and `.puppeteerrc.cjs` keeps the browser download inside the deployed source.
+
+## Persistence
+
+Generation handlers and `analyzeVoice` allocate the document ID up front and queue the write on a shared `BatchWriter` (`batchWriter.js`). The writer commits queued writes in batches of up to `PERSIST_BATCH_SIZE` or every `PERSIST_FLUSH_MS`, so concurrent requests share commits. A failed batch is retried document by document with backoff. Writes that still fail are stored in the `failedWrites` collection with their path, data and error, and are counted under `persistence` by `inferenceStats`.
+
+A handler answers once its write is committed or dead-lettered, waiting at most `PERSIST_WAIT_MS`; waits that run out are counted as `timedOut`. With `PERSIST_AFTER_RESPONSE=true` the handler answers first and waits afterwards. Only use that with CPU allocated outside requests (or min instances): a throttled or reclaimed instance loses the writes still queued. `runGenerationJob` always waits for its write before finishing.
+
+## Async Generation Jobs
+
+`generateDocument` and `generatePresentation` accept `"async": true` in the request body. The function then only creates a `generationJobs/{jobId}` document and answers `202` with `{jobId, status: "queued"}`. `runGenerationJob` claims the job (`queued` → `running`), runs the same generation and writes `status: "done"` with `result` (the synchronous response body) or `status: "failed"` with `error`. Clients subscribe to the job document; see `runJob` in `lib/functions.js`.
+
+## Deployment Layouts
+
+By default every route is deployed as its own function, each with its own instances and cold starts. With `FUNCTIONS_LAYOUT=router` (for example in `functions/.env`) a single `api` function serves the same handlers through Express at `/api/<name>`, e.g. `/api/generateResume`, so one warm pool serves all routes.
+
+In both layouts dependencies load on first use: `firebase-admin` with the first route that writes to Firestore, `axios` with the first inference call, and heavy packages through `lazyRequire` in `lazy.js`. Compare the layouts with:
+
+```bash
+npm run bench:cold-start -- --runs 20 --route inferenceStats
+```
+
+## Speech Analysis
+
+`analyzeVoice` counts words, fillers and sentences with `speech/fillers.js`. Fillers are defined once in `FILLER_WORDS`; multi-word fillers such as "you know" are compiled into a word trie, and punctuation next to a word ("um,") does not stop it from matching. A transcript is tokenized once and scanned in a single pass, so the cost grows with the transcript length, not the length of the filler list. Compare it with the previous per-token scan on 1-hour transcripts:
+
+```bash
+npm run bench:fillers -- --transcripts 20 --extra-fillers 100
+```
+
+During a recording, the Voice Assistant posts each final recognition result to `analyzeVoiceSegment` with the session ID, a sequence number and its offset in seconds. The client generates the session ID (`crypto.randomUUID()`) when the recording starts, so a retried first segment writes to the same document; requests without a valid ID are answered with 400. `speech/analyzer.js` keeps the session's running counts on the `voiceSessions` document: words, fillers, sentence ends and the words spoken in the last 30 seconds. Each segment costs O(new text), and a retried segment is not counted twice. The response carries the analysis so far plus `currentWpm` for live feedback. When the recording stops, `analyzeVoice` with the same `sessionId` finalizes the analysis from those counts instead of analyzing the transcript again. A segment that fails is retried with the same sequence number; if it still fails, the client sends `incomplete: true` with the final transcript, and `analyzeVoice` analyzes it in full and replaces the partial counts. If the browser ends recognition by itself during a recording, the Voice Assistant restarts it, or finishes the session when the error cannot be recovered from.
+
+Stored analyses are not updated when the feedback thresholds or `FILLER_WORDS` change; re-score them with `python -m rescore` from the project root (see the main README).
+
+## Response Caching
+
+Identical inference calls (same model and payload) are answered from an LRU cache with per-endpoint TTLs, defined in `inference/responseCache.js`. Only successful upstream responses are cached.
+
+Concurrent identical calls that miss the cache are coalesced onto a single in-flight upstream request (`inference/singleFlight.js`); the `coalesced` counter reports the upstream calls saved.
+
+## Micro-batching
+
+Cache misses are queued per model, endpoint and generation parameters by `inference/microBatcher.js`. A queue is flushed as one call with an `inputs` array once it holds `HF_BATCH_MAX_SIZE` prompts or `HF_BATCH_WINDOW_MS` after its first prompt, and each caller gets back the output for its own input. If the model does not answer per input, the prompts are sent one by one. Batch sizes and queueing delays are reported as histograms by `inferenceStats`.
+
+## Streaming Chat
+
+`chatWithAIStream` takes the same body as `chatWithAI` and answers with `text/event-stream`. Each event's `data` is JSON: `{"token": "..."}` as the model generates, then `{"done": true, "response": "...", "timestamp": "..."}` with the full text. When the model is cold or unavailable the fallback answer is sent as a single token. Time to first token and total stream time are logged per request (`HF stream`) and reported as histograms by `inferenceStats`.
+
+The web app consumes it through `streamFunction` in `lib/functions.js`; set `NEXT_PUBLIC_FUNCTIONS_URL` to point it at the emulator.
 
 ## Rate Limiting
 
 Functions implement basic rate limiting and request queuing to handle Hugging Face API limits.
 
+Model-loading (503) and rate-limit (429) responses are retried after the delay the API asks for (`estimated_time` or `Retry-After`), otherwise with jittered exponential backoff, within a per-endpoint deadline. A per-model circuit breaker (`inference/retryPolicy.js`) stays open while a model is known to be cold, and the generation handlers answer with their fallback content immediately instead of waiting.
+
 ## Error Handling
 
 All functions include comprehensive error handling with fallback responses when AI services are unavailable.
@@ -449,14 +1410,16 @@ Please be respectful and inclusive in all interactions.
 # Create directories and files
 import os
 
+from orbitgen.emit import emit
+
 # Create additional directories
 additional_dirs = ['tests', 'e2e', '.github/workflows', 'docs']
-for directory in additional_dirs:
-    os.makedirs(directory, exist_ok=True)
 
-# Write final files
-for filepath, content in final_files.items():
-    with open(filepath, 'w') as f:
-        f.write(content)
+if __name__ == '__main__':
+    for directory in additional_dirs:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write final files (unchanged files are skipped)
+    emit(final_files)
 
-print("✅ Created test files, workflows, and documentation")
\ No newline at end of file
+    print("✅ Created test files, workflows, and documentation")
\ No newline at end of file
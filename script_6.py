@@ -243,66 +243,84 @@ For questions or issues with this codebase, please refer to:
 - Firebase Function documentation
 """
 
-with open('PROJECT-SUMMARY.md', 'w') as f:
-    f.write(summary_content)
+summary_files = {
+    "PROJECT-SUMMARY.md": summary_content,
+}
 
 # Create a final file listing for easy reference
 import os
 import json
 
+from orbitgen.emit import INDEX_NAME, emit
+from orbitgen.manifest import CACHE_NAME, load_previous, published, save_cache, scan
+
+MANIFEST_NAME = 'project-manifest.json'
+
 def get_all_files(directory='.'):
     """Get all files in the project recursively"""
-    all_files = []
-    for root, dirs, files in os.walk(directory):
-        # Skip node_modules and hidden directories
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
-        for file in files:
-            if not file.startswith('.') and not file.endswith('.pyc'):
-                file_path = os.path.join(root, file)
-                all_files.append(file_path.replace('./', ''))
-    return sorted(all_files)
-
-project_files = get_all_files()
-
-file_manifest = {
-    "project_name": "ORBIT AI",
-    "description": "All-in-One Student Productivity & Skill Ecosystem",
-    "total_files": len(project_files),
-    "files": project_files,
-    "key_technologies": [
-        "Next.js 14",
-        "React 18", 
-        "Tailwind CSS",
-        "Firebase (Auth, Firestore, Storage, Functions)",
-        "Hugging Face API",
-        "Monaco Editor",
-        "Web Speech API",
-        "Jest & Playwright Testing"
-    ],
-    "main_features": [
-        "Google OAuth Authentication",
-        "AI Resume Builder", 
-        "Document Designer",
-        "Code IDE with AI Fixes",
-        "Voice Assistant",
-        "Real-time Chat",
-        "Invoice Generator",
-        "Portfolio Generator"
-    ]
-}
-
-with open('project-manifest.json', 'w') as f:
-    json.dump(file_manifest, f, indent=2)
-
-print(f"✅ ORBIT AI Complete Project Created!")
-print(f"📁 Total Files: {len(project_files)}")
-print(f"📋 Project Summary: PROJECT-SUMMARY.md")
-print(f"📝 File Manifest: project-manifest.json")
-print(f"📖 Full Documentation: README-comprehensive.md")
-print("\n🚀 Ready for deployment and demonstration!")
-print("\n🌟 Key deliverables:")
-print("- Complete Next.js web application") 
-print("- Firebase backend with AI integration")
-print("- Comprehensive testing suite")
-print("- Production deployment configuration")
-print("- Full documentation and setup guides")
\ No newline at end of file
+    return list(scan(directory, hash_files=False))
+
+def build_manifest(project_files, file_details=None):
+    """Project manifest listing every generated file"""
+    manifest = {
+        "project_name": "ORBIT AI",
+        "description": "All-in-One Student Productivity & Skill Ecosystem",
+        "total_files": len(project_files),
+        "files": project_files,
+        "key_technologies": [
+            "Next.js 14",
+            "React 18", 
+            "Tailwind CSS",
+            "Firebase (Auth, Firestore, Storage, Functions)",
+            "Hugging Face API",
+            "Monaco Editor",
+            "Web Speech API",
+            "Jest & Playwright Testing"
+        ],
+        "main_features": [
+            "Google OAuth Authentication",
+            "AI Resume Builder", 
+            "Document Designer",
+            "Code IDE with AI Fixes",
+            "Voice Assistant",
+            "Real-time Chat",
+            "Invoice Generator",
+            "Portfolio Generator"
+        ]
+    }
+    if file_details is not None:
+        # size and BLAKE2b per file
+        manifest["file_details"] = file_details
+    return manifest
+
+def write_manifest(target='.', store=None):
+    """Walk ``target`` and emit its project-manifest.json"""
+    cache_path = os.path.join(target, CACHE_NAME)
+    file_details = scan(target, load_previous(cache_path))
+    # The manifest does not list itself or the generator's bookkeeping, so
+    # an unchanged tree yields the same manifest and nothing is rewritten
+    for name in (MANIFEST_NAME, INDEX_NAME, CACHE_NAME):
+        file_details.pop(name, None)
+    project_files = list(file_details)
+    # inode and mtime only serve the next scan, so they stay in the cache
+    save_cache(cache_path, file_details)
+    emit({MANIFEST_NAME: build_manifest(project_files, published(file_details))}, target, store=store)
+    return project_files
+
+if __name__ == '__main__':
+    emit(summary_files)
+
+    project_files = write_manifest()
+
+    print(f"✅ ORBIT AI Complete Project Created!")
+    print(f"📁 Total Files: {len(project_files)}")
+    print(f"📋 Project Summary: PROJECT-SUMMARY.md")
+    print(f"📝 File Manifest: project-manifest.json")
+    print(f"📖 Full Documentation: README-comprehensive.md")
+    print("\n🚀 Ready for deployment and demonstration!")
+    print("\n🌟 Key deliverables:")
+    print("- Complete Next.js web application") 
+    print("- Firebase backend with AI integration")
+    print("- Comprehensive testing suite")
+    print("- Production deployment configuration")
+    print("- Full documentation and setup guides")
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""The inference stand-in and the load harness driven against it"""
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from loadtest import harness, hfstub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = 'demo-orbit'
+GENERATION_ENDPOINTS = [name for name, (_, is_fallback) in harness.ENDPOINTS.items() if is_fallback]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+@pytest.fixture
+def hfstub_url():
+    port = free_port()
+    stub = subprocess.Popen([sys.executable, '-m', 'loadtest', 'hfstub', '--port', str(port),
+                             '--latency', 'fixed:20', '--token-rate', '0'], cwd=ROOT)
+    try:
+        wait_for_port(port)
+        yield f'http://127.0.0.1:{port}/models'
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+async def exchange(stub, raw):
+    """Send raw bytes to an in-process stub -> (status line, headers, body)"""
+    server = await asyncio.start_server(stub.handle_connection, '127.0.0.1', 0)
+    async with server:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status, *lines = head.decode().split('\r\n')
+    return status, dict(line.lower().split(': ', 1) for line in lines), json.loads(body)
+
+
+def post(payload):
+    body = json.dumps(payload).encode()
+    return (f'POST /models/demo HTTP/1.1\r\nContent-Length: {len(body)}\r\n'
+            f'Connection: close\r\n\r\n').encode() + body
+
+
+def test_hfstub_answers_malformed_requests_with_400():
+    stub = hfstub.StubServer(lambda: 0, 0)
+    status, _, body = asyncio.run(exchange(stub, b'GARBAGE\r\n\r\n'))
+    assert status == 'HTTP/1.1 400 Bad Request'
+    assert 'error' in body
+    assert stub.counters['status'] == {'400': 1}
+
+
+def test_hfstub_rate_limit_phase_answers_429_with_retry_after():
+    stub = hfstub.StubServer(lambda: 0, 0, rate_limits=[hfstub.parse_phase('0:60:7')])
+    status, headers, _ = asyncio.run(exchange(stub, post({'inputs': 'hello'})))
+    assert status == 'HTTP/1.1 429 Too Many Requests'
+    assert headers['retry-after'] == '7'
+
+
+def test_hfstub_answers_a_single_input_with_a_generation_list():
+    stub = hfstub.StubServer(lambda: 0, 0)
+    _, _, body = asyncio.run(exchange(stub, post({'inputs': 'hello', 'parameters': {'max_new_tokens': 3}})))
+    assert isinstance(body, list) and body[0]['generated_text'].startswith('hello')
+
+
+def test_fallback_slos_skip_endpoints_without_fallback():
+    results = {'chatWithAI': {'fallback_rate': 0.0}, 'analyzeVoice': {'fallback_rate': None}}
+    assert harness.check_slos(results, harness.parse_slos(['*.fallback_rate=0.05'])) == []
+    with pytest.raises(SystemExit):
+        harness.parse_slos(['analyzeVoice.fallback_rate=0.05'])
+
+
+@pytest.mark.skipif(not (shutil.which('firebase') and shutil.which('npm')),
+                    reason='needs the Firebase CLI and npm to run the functions emulator')
+def test_harness_against_hfstub(tmp_path, hfstub_url):
+    from orbitgen import generate
+
+    tree = tmp_path / 'tree'
+    generate(str(tree))
+    subprocess.run(['npm', 'install', '--no-audit', '--no-fund'], cwd=tree / 'functions', check=True,
+                   env={**os.environ, 'PUPPETEER_SKIP_DOWNLOAD': 'true'})
+    # The functions emulator loads .env.local next to index.js
+    (tree / 'functions' / '.env.local').write_text(f'HF_BASE_URL={hfstub_url}\n')
+
+    out = tmp_path / 'results.json'
+    run = [sys.executable, '-m', 'loadtest', 'run', '--base-url', f'http://127.0.0.1:5001/{PROJECT}/us-central1',
+           '--rate', '2', '--duration', '5', '--out', str(out)]
+    subprocess.run(['firebase', 'emulators:exec', '--only', 'functions,firestore', '--project', PROJECT,
+                    subprocess.list2cmdline(run)],
+                   cwd=tree, env={**os.environ, 'PYTHONPATH': ROOT}, check=True, timeout=600)
+
+    results = json.loads(out.read_text())['results']
+    for name in GENERATION_ENDPOINTS:
+        assert results[name]['completed'] > 0, name
+        assert results[name]['fallback_rate'] < 1, name
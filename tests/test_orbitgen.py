@@ -0,0 +1,251 @@
+"""The generator: emission, templates, tenants, the blob store and the watcher"""
+import errno
+import io
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from orbitgen import blobs, manifest
+from orbitgen.archive import FORMATS, MANIFEST_NAME, archive_entries, write_archive
+from orbitgen.emit import digest, file_digest, render
+from orbitgen.manifest import CACHE_NAME, load_previous, published, save_cache, scan
+from orbitgen.plan import GENERATORS, SCRIPTS_DIR, Plan, generate_all
+from orbitgen.templates import TemplateCache, render_text, resolve
+from orbitgen.tenants import SharedRender, generate_tenants
+from orbitgen.watch import Watcher
+
+
+def test_watcher_initial_creates_empty_directories_and_digests_what_it_wrote(tmp_path):
+    watcher = Watcher(str(tmp_path))
+    result = watcher.initial()
+
+    assert result.written
+    for directory in ('hooks', 'utils', 'docs', 'e2e', 'tests'):
+        assert (tmp_path / directory).is_dir()
+    # Later scripts win where two generate the same path
+    written = {}
+    for digests in watcher.rendered.values():
+        written.update(digests)
+    assert {relpath: digest((tmp_path / relpath).read_bytes()) for relpath in written} == written
+
+    assert watcher.refresh('script_5') == ([], [])
+
+
+def test_manifest_publishes_size_and_digest_and_caches_the_rest(tmp_path):
+    generate_all(str(tmp_path))
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    cache = json.loads((tmp_path / CACHE_NAME).read_text())
+    assert manifest['file_details']
+    assert {tuple(sorted(record)) for record in manifest['file_details'].values()} == {('blake2b', 'size')}
+    assert all({'inode', 'mtime_ns'} <= set(record) for record in cache['file_details'].values())
+    assert published(cache['file_details']) == manifest['file_details']
+
+
+def test_manifest_cache_reuses_digests_of_unchanged_files(tmp_path, monkeypatch):
+    hashed = []
+
+    def counting_digest(path):
+        hashed.append(os.path.relpath(path, tmp_path))
+        return file_digest(path)
+
+    monkeypatch.setattr(manifest, 'file_digest', counting_digest)
+    (tmp_path / 'sub').mkdir()
+    for relpath in ('a.txt', 'b.txt', 'sub/c.txt'):
+        (tmp_path / relpath).write_text(f'{relpath}\n')
+    cache_path = str(tmp_path / CACHE_NAME)
+
+    first = scan(str(tmp_path), load_previous(cache_path))
+    save_cache(cache_path, first)
+    assert sorted(hashed) == ['a.txt', 'b.txt', os.path.join('sub', 'c.txt')]
+
+    hashed.clear()
+    changed = tmp_path / 'sub' / 'c.txt'
+    stat = changed.stat()
+    # Same size, so only the mtime gives the change away
+    changed.write_text('sub/C.txt\n')
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = scan(str(tmp_path), load_previous(cache_path))
+
+    assert hashed == [os.path.join('sub', 'c.txt')]
+    assert second['sub/c.txt']['blake2b'] == file_digest(str(changed)) != first['sub/c.txt']['blake2b']
+    assert {p: second[p]['blake2b'] for p in ('a.txt', 'b.txt')} == {p: first[p]['blake2b'] for p in ('a.txt', 'b.txt')}
+
+
+def test_second_generate_writes_nothing(tmp_path):
+    generate_all(str(tmp_path))
+    before = {path: path.stat().st_mtime_ns for path in tmp_path.rglob('*') if path.is_file()}
+
+    result = generate_all(str(tmp_path))
+
+    assert result.written == []
+    assert {path: path.stat().st_mtime_ns for path in tmp_path.rglob('*') if path.is_file()} == before
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert MANIFEST_NAME not in manifest['files']
+
+
+def test_archive_manifest_matches_the_generated_one(tmp_path):
+    generate_all(str(tmp_path))
+
+    archived = archive_entries(Plan.collect())[MANIFEST_NAME]
+    assert json.loads(archived) == json.loads((tmp_path / MANIFEST_NAME).read_text())
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_archives_are_byte_identical_across_builds_and_source_mtimes(tmp_path, monkeypatch, fmt):
+    monkeypatch.delenv('SOURCE_DATE_EPOCH', raising=False)
+    scripts = tmp_path / 'scripts'
+    scripts.mkdir()
+    for name, _ in GENERATORS:
+        shutil.copy2(os.path.join(SCRIPTS_DIR, f'{name}.py'), scripts / f'{name}.py')
+
+    def build():
+        buffer = io.BytesIO()
+        write_archive(Plan.collect(str(scripts)), buffer, fmt, str(scripts))
+        return buffer.getvalue()
+
+    first = build()
+    assert build() == first
+    for path in scripts.iterdir():
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 86_400 * 10**9))
+    # A day later on the wall clock too
+    now = time.time() + 86_400
+    monkeypatch.setattr(time, 'time', lambda: now)
+    assert build() == first
+
+
+def test_only_declared_parameters_are_placeholders():
+    source = 'const m = "{{ hf_model }}"; <div style={{ width }} />; {{hf_model}}'
+    rendered = render_text(source, resolve({'hf_model': 'org/model'}))
+    assert rendered == 'const m = "org/model"; <div style={{ width }} />; org/model'
+
+
+def test_dict_entries_escape_values_as_json():
+    value = 'Q "quoted" \\ back\\slash\nnew line </script>'
+    entry = {'name': '{{ project_name }}', 'nested': ['{{ project_name }} app']}
+    data = json.loads(render(entry, {**resolve(), 'project_name': value}))
+    assert data == {'name': value, 'nested': [f'{value} app']}
+
+
+@pytest.mark.parametrize('name, value', [
+    ('project_name', "Ada's App"),
+    ('project_name', 'Say "hi"'),
+    ('project_name', 'back\\slash'),
+    ('project_name', 'two\nlines'),
+    ('project_name', '{oops}'),
+    ('firebase_project_id', 'demo: evil'),
+    ('firebase_project_id', 'demo\nrun: rm'),
+    ('package_name', 'Orbit AI'),
+    ('hf_model', "org/model'); process.exit(1); ('"),
+    ('chat_max_tokens', '300; evil()'),
+])
+def test_values_that_would_break_text_entries_are_rejected(name, value):
+    with pytest.raises(ValueError, match=f'invalid {name}'):
+        resolve({name: value})
+
+
+def test_plain_values_are_substituted_into_text_entries():
+    values = resolve({'project_name': 'Orbit Labs 2', 'firebase_project_id': 'demo-orbit'})
+    assert render("title: '{{ project_name }}'", values) == b"title: 'Orbit Labs 2'"
+    assert values['firebase_storage_bucket'] == 'demo-orbit.firebasestorage.app'
+
+
+def test_parameters_are_validated_and_derived():
+    with pytest.raises(ValueError, match='unknown template parameters'):
+        resolve({'no_such_parameter': 'x'})
+    values = resolve({'firebase_project_id': 'demo-app'})
+    assert values['firebase_auth_domain'] == 'demo-app.firebaseapp.com'
+    assert resolve({'firebase_project_id': 'demo-app', 'firebase_auth_domain': 'a.example'})[
+        'firebase_auth_domain'] == 'a.example'
+
+
+def test_compiled_templates_survive_the_disk_cache(tmp_path):
+    source = 'name: {{ package_name }}, style={{ width }}'
+    cache = TemplateCache(str(tmp_path))
+    template = cache.get(source)
+    cache.save()
+
+    reloaded = TemplateCache(str(tmp_path)).get(source)
+    assert (reloaded.literals, reloaded.names) == (template.literals, template.names)
+    assert reloaded.render(resolve()) == 'name: orbit-ai, style={{ width }}'
+
+
+def test_tenants_get_their_own_parameters_and_share_everything_else(tmp_path):
+    tenants = [{'name': 'alpha', 'firebase_project_id': 'tenant-alpha'},
+               {'name': 'beta', 'firebase_project_id': 'tenant-beta'}]
+    results, _ = generate_tenants(tenants, str(tmp_path), processes=2)
+
+    assert set(results) == {'alpha', 'beta'}
+    for tenant in tenants:
+        tree = tmp_path / tenant['name']
+        project_id = tenant['firebase_project_id']
+        assert f'projectId: {project_id}\n' in (tree / '.github/workflows/deploy.yml').read_text()
+        env = (tree / '.env.example').read_text()
+        assert f'NEXT_PUBLIC_FIREBASE_PROJECT_ID={project_id}\n' in env
+        assert f'NEXT_PUBLIC_FIREBASE_AUTH_DOMAIN={project_id}.firebaseapp.com' in env
+
+    shared = SharedRender(Plan.collect())
+    assert shared.files and shared.templates
+    for relpath, data in shared.files.items():
+        assert (tmp_path / 'alpha' / relpath).read_bytes() == data
+        assert (tmp_path / 'beta' / relpath).read_bytes() == data
+    differing = {relpath for relpath in shared.templates
+                 if (tmp_path / 'alpha' / relpath).read_bytes() != (tmp_path / 'beta' / relpath).read_bytes()}
+    assert {'.env.example', '.github/workflows/deploy.yml'} <= differing
+
+
+def _no_reflink(src, dst):
+    raise OSError(errno.EOPNOTSUPP, 'no reflink')
+
+
+def test_blob_store_stores_shared_content_once_and_hardlinks_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobs, 'reflink', _no_reflink)
+    store = blobs.BlobStore(str(tmp_path / 'store'))
+    data = b'shared body\n'
+    value = digest(data)
+    first, second = tmp_path / 'a.txt', tmp_path / 'b.txt'
+
+    assert store.materialize(value, data, str(first)) == 'hardlink'
+    assert store.materialize(value, data, str(second)) == 'hardlink'
+
+    assert [path.name for path in (tmp_path / 'store').rglob('*') if path.is_file()] == [value]
+    assert store.stats == {'blobs_written': 1, 'reflink': 0, 'hardlink': 2, 'copy': 0}
+    blob = os.stat(store.blob_path(value))
+    assert first.stat().st_ino == second.stat().st_ino == blob.st_ino
+    assert blob.st_nlink == 3
+    assert first.read_bytes() == second.read_bytes() == data
+
+
+def test_blob_store_falls_back_to_copies_when_links_fail(tmp_path, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, 'cross-device link')
+
+    monkeypatch.setattr(blobs, 'reflink', _no_reflink)
+    monkeypatch.setattr(os, 'link', cross_device)
+    store = blobs.BlobStore(str(tmp_path / 'store'))
+    data = b'copied body\n'
+    value = digest(data)
+
+    for name in ('a.txt', 'b.txt'):
+        assert store.materialize(value, data, str(tmp_path / name)) == 'copy'
+        assert (tmp_path / name).read_bytes() == data
+        assert (tmp_path / name).stat().st_ino != os.stat(store.blob_path(value)).st_ino
+
+    assert store.stats == {'blobs_written': 1, 'reflink': 0, 'hardlink': 0, 'copy': 2}
+    assert store._unsupported == {'reflink', 'hardlink'}
+    assert not list(tmp_path.glob('*.orbit-tmp'))
+    # Copies do not pin their blob
+    assert store.prune() == 1
+
+
+def test_blob_store_in_hardlink_mode_does_not_fall_back(tmp_path, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, 'cross-device link')
+
+    monkeypatch.setattr(os, 'link', cross_device)
+    store = blobs.BlobStore(str(tmp_path / 'store'), mode='hardlink')
+    with pytest.raises(OSError):
+        store.materialize(digest(b'x'), b'x', str(tmp_path / 'x.txt'))
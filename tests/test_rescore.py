@@ -0,0 +1,81 @@
+"""Re-scoring: the JSON Lines store"""
+import json
+
+import pytest
+
+from rescore import scoring
+from rescore.pipeline import rescore
+from rescore.store import JsonlStore, decode_fields, encode_value
+
+TRANSCRIPT = 'So um I think, you know, the results were like really good. Actually yes!'
+
+
+def rest_document(name, transcript, duration, analysis=None):
+    fields = {'transcript': transcript, 'duration': duration}
+    if analysis is not None:
+        fields['analysis'] = analysis
+    return {'name': name, 'fields': encode_value(fields)['mapValue']['fields']}
+
+
+def test_rest_values_round_trip():
+    value = {'wpm': 120, 'ratio': 2.5, 'feedback': ['a', 'b'], 'live': None, 'done': True,
+             'nested': {'count': 3}}
+    assert decode_fields(encode_value(value)['mapValue']['fields']) == value
+
+
+def test_jsonl_round_trip_keys_each_line_like_its_input(tmp_path):
+    source = tmp_path / 'voiceSessions.jsonl'
+    output = tmp_path / 'rescored.jsonl'
+    current = scoring.score_python([TRANSCRIPT], [30])[0]
+    lines = [
+        {'id': 'a', 'transcript': TRANSCRIPT, 'duration': 20},
+        rest_document('projects/demo/databases/(default)/documents/voiceSessions/b', TRANSCRIPT, 40),
+        {'id': 'c', 'transcript': TRANSCRIPT, 'duration': 30, 'analysis': current},
+        {'id': 'd', 'duration': 30},
+        {'id': 'e', 'transcript': TRANSCRIPT, 'duration': 60},
+    ]
+    source.write_text('\n'.join(json.dumps(line) for line in lines) + '\n\n')
+
+    store = JsonlStore(str(source), str(output))
+    try:
+        result = rescore(store, processes=1, progress=False)
+    finally:
+        store.close()
+
+    assert (result.sessions, result.changed, result.written) == (4, 3, 3)
+    written = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [{key for key in line if key != 'analysis'} for line in written] == [{'id'}, {'name'}, {'id'}]
+    assert [line.get('id') or line['name'].rsplit('/', 1)[-1] for line in written] == ['a', 'b', 'e']
+    expected = scoring.score_python([TRANSCRIPT] * 3, [20, 40, 60])
+    assert [line['analysis'] for line in written] == expected
+
+
+PARITY_TRANSCRIPTS = [
+    TRANSCRIPT,
+    '',
+    '...!?',
+    'Um, um... UM! so so you know you know know',
+    "I'm like, y'know, it’s actually fine. Don't um-stop. Uh_huh so_so",
+    'Café naïve résumé, um, déjà vu? Like… 東京 uh 123 so.',
+    'you\nknow\tum\r\nlike',
+    'So',
+]
+
+
+@pytest.mark.skipif(not scoring.HAVE_NUMPY, reason='NumPy is not installed')
+@pytest.mark.parametrize('fillers', [scoring.FILLER_WORDS, ('you know', 'know you', 'um um', 'so')])
+def test_numpy_scorer_matches_python_scorer(fillers):
+    durations = [60, 0, 1, 7.5, 30, 45, 2, 3]
+    matcher = scoring.FillerMatcher(fillers)
+    thresholds = scoring.Thresholds(90, 150, 3)
+    assert (scoring.score_numpy(PARITY_TRANSCRIPTS, durations, thresholds, matcher)
+            == scoring.score_python(PARITY_TRANSCRIPTS, durations, thresholds, matcher))
+
+
+def test_python_scorer_counts_like_scan_transcript():
+    # (totalWords, fillerWords, avgWordsPerSentence) of summarize(scanTranscript(text)) in functions/speech/
+    expected = [(14, 5, 5), (0, 0, 0), (0, 0, 0), (10, 7, 3), (13, 6, 4), (11, 4, 4), (4, 3, 4), (1, 1, 1)]
+    analyses = scoring.score_python(PARITY_TRANSCRIPTS, [30] * len(PARITY_TRANSCRIPTS))
+    assert [(a['totalWords'], a['fillerWords'], a['avgWordsPerSentence']) for a in analyses] == expected
+    assert analyses[0]['wpm'] == 28
+    assert scoring.js_round(2.5) == 3 and scoring.js_round(-2.5) == -2